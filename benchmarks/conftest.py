@@ -0,0 +1,61 @@
+# -------------------------------- Imports -------------------------------- #
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager  # noqa: E402
+from generate_data import write_tasks, write_users  # noqa: E402
+from settings import (BENCH_LOGIN_USERS, BENCH_SKEW,  # noqa: E402
+                      BENCH_TASKS, BENCH_USERS)
+
+# -------------------------------- Fixtures ------------------------------- #
+
+
+@pytest.fixture(scope="session")
+def data_directory(tmp_path_factory):
+    """
+    Writes the synthetic user.txt and tasks.txt once per session.
+    """
+    directory = tmp_path_factory.mktemp("data")
+    write_users(str(directory / "user.txt"), BENCH_USERS)
+    write_tasks(str(directory / "tasks.txt"), BENCH_TASKS, BENCH_USERS,
+                BENCH_SKEW)
+    return directory
+
+
+@pytest.fixture
+def dataset(data_directory, tmp_path):
+    """
+    Copies the synthetic files into a fresh directory for a benchmark,
+    so that benchmarks which edit the tasks do not affect each other, and
+    returns the paths of the users and tasks files.
+    """
+    paths = {}
+    for name in ("user.txt", "tasks.txt"):
+        (tmp_path / name).write_bytes((data_directory / name).read_bytes())
+        paths[name] = str(tmp_path / name)
+    yield paths
+    # Drop the stores of the files so that memory is not held across
+    # benchmarks
+    task_manager.task_stores.pop(paths["tasks.txt"], None)
+    task_manager.report_states.pop(paths["tasks.txt"], None)
+    task_manager.storages.pop(("text", paths["tasks.txt"]), None)
+    task_manager.user_stores.pop(paths["user.txt"], None)
+
+
+@pytest.fixture(scope="session")
+def login_users(tmp_path_factory):
+    """
+    Writes a user.txt of BENCH_LOGIN_USERS users once per session, with
+    the passwords hashed at the lowest cost so that writing it is quick,
+    and returns its path.
+    """
+    path = str(tmp_path_factory.mktemp("login") / "user.txt")
+    write_users(path, BENCH_LOGIN_USERS)
+    task_manager.hash_passwords(path, iterations=1)
+    task_manager.user_stores.pop(path, None)
+    return path
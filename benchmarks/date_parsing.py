@@ -0,0 +1,78 @@
+# -------------------------------- Imports -------------------------------- #
+import os
+import random
+import sys
+import timeit
+from datetime import datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_manager import MONTH_NAMES, date_ordinal  # noqa: E402
+
+# ------------------------------- Functions ------------------------------- #
+
+
+def synthetic_dates(count: int, distinct: int = 1000):
+    """
+    A function that returns count dates in the {dd mon yyyy} format,
+    drawn from a smaller number of distinct dates as in tasks.txt.
+
+    Args:
+        count(int): The number of dates to create
+        distinct(int): The number of distinct dates to draw from
+
+    Returns:
+        dates(list): The dates as strings
+    """
+    rng = random.Random(0)
+    pool = [f"{rng.randint(1, 28):02d} {rng.choice(MONTH_NAMES)} "
+            f"{rng.randint(2019, 2030)}" for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def strptime_path(dates: list):
+    """
+    Parses every date the way task_overview used to.
+    """
+    for date_string in dates:
+        dt.strptime(date_string, '%d %b %Y').date()
+
+
+def uncached_path(dates: list):
+    """
+    Parses every date with the hand-rolled parser only.
+    """
+    parse = date_ordinal.__wrapped__
+    for date_string in dates:
+        parse(date_string)
+
+
+def cached_path(dates: list):
+    """
+    Parses every date through the memoized date_ordinal, starting from
+    an empty cache.
+    """
+    date_ordinal.cache_clear()
+    for date_string in dates:
+        date_ordinal(date_string)
+
+
+def main():
+    """
+    Prints the time each parsing path takes for the same dates.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dates = synthetic_dates(count)
+    print(f"Parsing {count} dates:")
+    baseline = None
+    for name, path in (("strptime", strptime_path),
+                       ("hand-rolled", uncached_path),
+                       ("cached", cached_path)):
+        seconds = min(timeit.repeat(lambda: path(dates), number=1, repeat=5))
+        baseline = baseline or seconds
+        print(f"{name:<12}{seconds * 1000:>10.1f} ms"
+              f"{baseline / seconds:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
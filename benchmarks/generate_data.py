@@ -0,0 +1,132 @@
+# -------------------------------- Imports -------------------------------- #
+import argparse
+import os
+import random
+import sys
+from datetime import date
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_manager import FORMAT_HEADER, date_text  # noqa: E402
+
+# ------------------------------- Functions ------------------------------- #
+
+# Tasks are written in chunks of this many lines
+CHUNK_SIZE = 10_000
+# Assignment dates are spread over the days from FIRST_DAY
+FIRST_DAY = date(2019, 1, 1).toordinal()
+DAYS = 8 * 365
+
+
+def user_names(count: int):
+    """
+    A function that returns the names of count synthetic users, with
+    admin as the first user as in user.txt.
+
+    Args:
+        count(int): The number of users
+
+    Returns:
+        names(list): The user names
+    """
+    return ["admin"] + [f"user{number}" for number in range(1, count)]
+
+
+def write_users(path: str, count: int):
+    """
+    A function that writes count synthetic users to path in the format
+    of user.txt.
+
+    Args:
+        path(str): The file to write the users to
+        count(int): The number of users
+    """
+    lines = [f"{name}, password{number}"
+             for number, name in enumerate(user_names(count))]
+    with open(path, mode="w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+
+
+def task_lines(count: int, users: int, skew: float = 1.0, seed: int = 0):
+    """
+    A generator that yields count synthetic task lines in the format of
+    tasks.txt. Tasks are assigned to users with a Zipf-like skew: the
+    user ranked r gets a share proportional to 1 / r ** skew, so a skew
+    of 0 spreads the tasks evenly and higher skews pile them onto the
+    first few users.
+
+    Args:
+        count(int): The number of task lines
+        users(int): The number of users to assign the tasks to
+        skew(float): How unevenly the tasks are assigned
+        seed(int): The seed of the random numbers, so that the same
+        arguments always give the same tasks
+
+    Yields:
+        line(str): A task line, starting with the newline that ends the
+        line before it
+    """
+    rng = random.Random(seed)
+    names = user_names(users)
+    cum_weights = list(accumulate(1 / rank ** skew
+                                  for rank in range(1, users + 1)))
+    for start in range(0, count, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, count - start)
+        assignees = rng.choices(names, cum_weights=cum_weights, k=size)
+        for task_id, user in enumerate(assignees, start):
+            assigned = FIRST_DAY + rng.randrange(DAYS)
+            due = assigned + rng.randrange(1, 180)
+            completed = "Yes" if rng.random() < 0.4 else "No"
+            yield (f"\n{user}, Task {task_id}, Description of task "
+                   f"{task_id}, {date_text(assigned)}, {date_text(due)}, "
+                   f"{completed}, {task_id}")
+
+
+def write_tasks(path: str, count: int, users: int, skew: float = 1.0,
+                seed: int = 0):
+    """
+    A function that writes count synthetic tasks to path in the format
+    of tasks.txt, under its format header, a chunk of lines at a time.
+
+    Args:
+        path(str): The file to write the tasks to
+        count(int): The number of tasks
+        users(int): The number of users to assign the tasks to
+        skew(float): How unevenly the tasks are assigned
+        seed(int): The seed of the random numbers
+    """
+    lines = task_lines(count, users, skew, seed)
+    with open(path, mode="w", encoding="utf-8") as file:
+        file.write(FORMAT_HEADER)
+        while True:
+            chunk = [line for _, line in zip(range(CHUNK_SIZE), lines)]
+            if not chunk:
+                break
+            file.writelines(chunk)
+
+
+def main():
+    """
+    Writes a synthetic user.txt and tasks.txt at the requested scale.
+    """
+    parser = argparse.ArgumentParser(
+        description="Write synthetic user.txt and tasks.txt files.")
+    parser.add_argument("directory", help="where to write the files")
+    parser.add_argument("--tasks", type=int, default=100_000,
+                        help="number of tasks (default 100000)")
+    parser.add_argument("--users", type=int, default=1_000,
+                        help="number of users (default 1000)")
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="Zipf skew of the assignments (default 1.0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    write_users(os.path.join(args.directory, "user.txt"), args.users)
+    write_tasks(os.path.join(args.directory, "tasks.txt"), args.tasks,
+                args.users, args.skew, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Load generator for the task manager server: many clients connect at the
+same time, log in as different users and send a mix of view, add and
+edit requests, after which the throughput and latency percentiles of the
+replies are printed. Run it against a running server:
+
+    python task_manager.py serve --socket /tmp/tasks.sock
+    python benchmarks/load_client.py --socket /tmp/tasks.sock --users 10
+
+or without --socket and --port to serve synthetic data for the run:
+
+    python benchmarks/load_client.py --clients 200 --requests 100
+"""
+# -------------------------------- Imports -------------------------------- #
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager  # noqa: E402
+from generate_data import user_names, write_tasks, write_users  # noqa: E402
+
+# ------------------------------- Functions ------------------------------- #
+
+# The share of each kind of request sent after logging in
+REQUEST_MIX = {"view_my": 0.6, "add_task": 0.2, "edit": 0.2}
+# Longest reply line a client reads, as view_my can return many tasks
+CLIENT_LINE_LIMIT = 1 << 26
+
+
+async def client(number: int, users: int, requests: int, latencies: list,
+                 path: str = None, host: str = task_manager.SERVER_HOST,
+                 port: int = task_manager.SERVER_PORT):
+    """
+    Runs one client: it logs in as one of the synthetic users and sends
+    requests one at a time, adding the latency of each to latencies.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(
+            path, limit=CLIENT_LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(
+            host, port, limit=CLIENT_LINE_LIMIT)
+    rng = random.Random(number)
+    index = number % users
+    username = user_names(users)[index]
+
+    async def send(request: dict):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not reply["ok"]:
+            raise RuntimeError(f"{request['op']} failed: {reply['error']}")
+        return reply["result"]
+
+    await send({"op": "login", "username": username,
+                "password": f"password{index}"})
+    open_tasks = [task["task_id"] for task in
+                  (await send({"op": "view_my"}))["tasks"]
+                  if task["task_comp"] == "No"]
+    for operation in rng.choices(list(REQUEST_MIX), list(REQUEST_MIX.values()),
+                                 k=requests):
+        if operation == "add_task":
+            result = await send({"op": "add_task", "user": username,
+                                 "task": f"Load {number}",
+                                 "task_description": "Added under load",
+                                 "due_date": "01 Jan 2030"})
+            open_tasks.append(result["task_id"])
+        elif operation == "edit" and open_tasks:
+            await send({"op": "edit", "task_id": rng.choice(open_tasks),
+                        "changes": {"due_date": "31 Dec 2099"}})
+        else:
+            await send({"op": "view_my"})
+    writer.close()
+    await writer.wait_closed()
+
+
+async def generate_load(clients: int, users: int, requests: int,
+                        path: str = None,
+                        host: str = task_manager.SERVER_HOST,
+                        port: int = task_manager.SERVER_PORT):
+    """
+    Runs clients clients at the same time and returns the latency of
+    every request and how long they all took.
+    """
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number, users, requests, latencies, path,
+                                  host, port)
+                           for number in range(clients)))
+    seconds = time.perf_counter() - start
+
+    return latencies, seconds
+
+
+def run_load(clients: int, users: int, requests: int, path: str = None,
+             host: str = task_manager.SERVER_HOST,
+             port: int = task_manager.SERVER_PORT):
+    """
+    Runs the load against a server and summarises it.
+
+    Returns:
+        result(dict): The number of requests, the time they took, the
+        resulting throughput in requests per second and the median and
+        99th percentile latencies in seconds
+    """
+    latencies, seconds = asyncio.run(
+        generate_load(clients, users, requests, path, host, port))
+    percentiles = statistics.quantiles(latencies, n=100)
+
+    result = {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "throughput": len(latencies) / seconds,
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+    }
+
+    return result
+
+
+def start_server(tasks_filename: str, users_filename: str, path: str,
+                 timeout: float = 30):
+    """
+    Starts a server of tasks_filename on the Unix socket path in another
+    process and waits until it listens.
+
+    Returns:
+        server(multiprocessing.Process): The process of the server
+    """
+    server = multiprocessing.Process(
+        target=task_manager.run_server,
+        args=(tasks_filename, users_filename),
+        kwargs={"path": path}, daemon=True)
+    server.start()
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if not server.is_alive() or time.monotonic() > deadline:
+            server.terminate()
+            raise RuntimeError("The server did not start")
+        time.sleep(0.01)
+
+    return server
+
+
+def main():
+    """
+    Runs the load generator and prints its throughput and latencies.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run many clients against the task manager server.")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50,
+                        help="requests per client (default 50)")
+    parser.add_argument("--users", type=int, default=100,
+                        help="number of synthetic users the clients log "
+                             "in as (default 100)")
+    parser.add_argument("--tasks", type=int, default=100_000,
+                        help="number of synthetic tasks served when no "
+                             "server is given (default 100000)")
+    parser.add_argument("--socket", help="Unix socket of a running server")
+    parser.add_argument("--host", default=task_manager.SERVER_HOST)
+    parser.add_argument("--port", type=int,
+                        help="TCP port of a running server")
+    args = parser.parse_args()
+
+    if args.socket or args.port:
+        result = run_load(args.clients, args.users, args.requests,
+                          args.socket, args.host,
+                          args.port or task_manager.SERVER_PORT)
+    else:
+        directory = tempfile.mkdtemp()
+        try:
+            tasks_filename = os.path.join(directory, "tasks.txt")
+            users_filename = os.path.join(directory, "user.txt")
+            path = os.path.join(directory, "tasks.sock")
+            write_users(users_filename, args.users)
+            write_tasks(tasks_filename, args.tasks, args.users)
+            server = start_server(tasks_filename, users_filename, path)
+            try:
+                result = run_load(args.clients, args.users, args.requests,
+                                  path)
+            finally:
+                server.terminate()
+                server.join()
+        finally:
+            shutil.rmtree(directory)
+    print(f"{result['requests']} requests by {args.clients} clients in "
+          f"{result['seconds']:.2f}s: {result['throughput']:.0f} "
+          f"requests/s, p50 {result['p50'] * 1000:.2f}ms, "
+          f"p99 {result['p99'] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+The scale of the synthetic data set of the benchmarks, shared by the
+fixtures in conftest.py and the benchmarks in test_benchmarks.py. It can
+be raised with environment variables, e.g. BENCH_TASKS=10000000
+BENCH_USERS=100000 for a full-size run.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+
+# ------------------------------- Settings -------------------------------- #
+
+# The number of tasks and users of the synthetic data set, and the skew of
+# the tasks per user
+BENCH_TASKS = int(os.environ.get("BENCH_TASKS", 10_000))
+BENCH_USERS = int(os.environ.get("BENCH_USERS", 100))
+BENCH_SKEW = float(os.environ.get("BENCH_SKEW", 1.0))
+# The number of users of the login benchmarks
+BENCH_LOGIN_USERS = int(os.environ.get("BENCH_LOGIN_USERS", 100_000))
@@ -0,0 +1,136 @@
+"""
+Stress test of concurrent access to one tasks.txt: several writer
+processes add tasks and edit the same tasks from a stale listing at the
+same time, after which every add and every edit must be found in the
+file. Run it directly to measure throughput at a larger scale:
+
+    python benchmarks/stress_concurrency.py --processes 12 --operations 200
+"""
+# -------------------------------- Imports -------------------------------- #
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager  # noqa: E402
+from generate_data import write_tasks, write_users  # noqa: E402
+
+# ------------------------------- Functions ------------------------------- #
+
+# The due date every task edited by a due date writer is moved to
+STRESS_DUE_DATE = "31 Dec 2099"
+
+
+def writer(filename: str, number: int, operations: int, listing: list,
+           version: int):
+    """
+    Runs one writer process. Writers take turns at three kinds of work:
+    adding tasks, marking tasks complete and moving their due date. Each
+    pair of editing writers shares a slice of the listing, so every task
+    in it is edited by two processes at once.
+    """
+    kind = number % 3
+    if kind == 0:
+        for operation in range(operations):
+            task_manager.append_new_task(
+                filename, f"admin, Stress {number} {operation}, Added by "
+                          f"writer {number}, 01 Jan 2030, 02 Jan 2030, No")
+        return
+    pair = number // 3
+    for listed in listing[pair * operations:(pair + 1) * operations]:
+        edit = dict(listed)
+        if kind == 1:
+            edit["task_comp"] = "Yes"
+        else:
+            edit["due_date"] = STRESS_DUE_DATE
+        task_manager.edit_overwrite(filename, edit, listed, version)
+
+
+def run_stress(filename: str, processes: int, operations: int):
+    """
+    Runs processes writers of operations each against filename at the
+    same time and checks that no task and no edit was lost.
+
+    Returns:
+        result(dict): The number of operations, the time they took and
+        the resulting throughput in operations per second
+    """
+    storage = task_manager.get_storage(filename)
+    listing = [task.fields() for task in storage.tasks()]
+    version = storage.version()
+    pairs = -(-processes // 3)
+    if len(listing) < pairs * operations:
+        raise ValueError("Too few tasks for the editing writers")
+    workers = [multiprocessing.Process(
+                   target=writer,
+                   args=(filename, number, operations, listing, version))
+               for number in range(processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    tasks = {task.task_id: task for task in task_manager.iter_tasks(filename)}
+    adders = [number for number in range(processes) if number % 3 == 0]
+    added = {task.task for task in tasks.values()
+             if task.task.startswith("Stress ")}
+    assert len(tasks) == len(listing) + len(adders) * operations
+    assert added == {f"Stress {number} {operation}" for number in adders
+                     for operation in range(operations)}
+    for number in range(processes):
+        if number % 3 == 0:
+            continue
+        pair = number // 3
+        for listed in listing[pair * operations:(pair + 1) * operations]:
+            task = tasks[int(listed["task_id"])]
+            if number % 3 == 1:
+                assert task.complete, f"Lost completion of {task.task_id}"
+            else:
+                assert task.get_field("due_date") == STRESS_DUE_DATE, \
+                    f"Lost due date of {task.task_id}"
+
+    result = {
+        "operations": processes * operations,
+        "seconds": seconds,
+        "throughput": processes * operations / seconds,
+    }
+
+    return result
+
+
+def main():
+    """
+    Runs the stress test on synthetic data and prints its throughput.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run concurrent writers against one tasks.txt.")
+    parser.add_argument("--processes", type=int, default=6)
+    parser.add_argument("--operations", type=int, default=100,
+                        help="operations per writer (default 100)")
+    parser.add_argument("--tasks", type=int, default=10_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, "tasks.txt")
+        write_users(os.path.join(directory, "user.txt"), 10)
+        write_tasks(filename, args.tasks, 10)
+        result = run_stress(filename, args.processes, args.operations)
+    finally:
+        shutil.rmtree(directory)
+    print(f"{result['operations']} operations by {args.processes} "
+          f"processes in {result['seconds']:.2f}s: "
+          f"{result['throughput']:.0f} operations/s, none lost")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# -------------------------------- Imports -------------------------------- #
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_data import task_lines  # noqa: E402
+from task_manager import parse_task, task_dct  # noqa: E402
+
+# ------------------------------- Functions ------------------------------- #
+
+
+def measure(build, lines: list):
+    """
+    A function that returns the memory held by the records that build
+    creates from lines.
+
+    Args:
+        build(function): Creates a list of records from lines
+        lines(list): The task lines
+
+    Returns:
+        size(int): The memory held by the records, in bytes
+    """
+    tracemalloc.start()
+    records = build(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def dict_records(lines: list):
+    """
+    Builds one task_dct dictionary of strings per line.
+    """
+    return [task_dct(*line.strip().split(", ")) for line in lines]
+
+
+def task_records(lines: list):
+    """
+    Builds one slotted Task record per line.
+    """
+    return [parse_task(line, position) for position, line in
+            enumerate(lines)]
+
+
+def main():
+    """
+    Prints the memory used by each record representation.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lines = list(task_lines(count, users=100))
+    print(f"Memory held by {count} tasks:")
+    baseline = None
+    for name, build in (("dict", dict_records), ("Task", task_records)):
+        size = measure(build, lines)
+        baseline = baseline or size
+        print(f"{name:<6}{size / 2**20:>10.1f} MB"
+              f"{size / count:>10.0f} bytes/task"
+              f"{size / baseline:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+"""
+Benchmarks of the task manager's menu actions on synthetic data, run with
+pytest-benchmark:
+
+    python -m pytest benchmarks --benchmark-autosave
+
+Each run is saved as JSON under .benchmarks/, named after the current
+commit, so that runs of different commits can be compared with:
+
+    pytest-benchmark compare --group-by=name
+
+The scale of the data set is set with the BENCH_TASKS, BENCH_USERS and
+BENCH_SKEW environment variables (see settings.py).
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+from itertools import repeat
+
+import pytest
+
+import task_manager
+from load_client import run_load, start_server
+from settings import BENCH_LOGIN_USERS, BENCH_TASKS, BENCH_USERS
+from stress_concurrency import run_stress
+
+pytest.importorskip("pytest_benchmark")
+
+# ------------------------------- Benchmarks ------------------------------ #
+
+
+def test_user_authentication(benchmark, dataset):
+    # Drop the store before each round so that the file is read in full
+    path = dataset["user.txt"]
+
+    def drop_store():
+        task_manager.user_stores.pop(path, None)
+
+    users = benchmark.pedantic(task_manager.user_authentication,
+                               args=(path,), setup=drop_store, rounds=20)
+    assert len(users) == BENCH_USERS
+
+
+def test_task_store_load(benchmark, dataset):
+    store = task_manager.TaskStore(dataset["tasks.txt"])
+    store.load()
+    snapshot = task_manager.snapshot_filename(dataset["tasks.txt"])
+
+    def remove_snapshot():
+        # Parse the text file on every round rather than the snapshot
+        os.remove(snapshot)
+
+    benchmark.pedantic(store.load, setup=remove_snapshot, rounds=5)
+    assert len(store.tasks) == BENCH_TASKS
+
+
+def test_snapshot_load(benchmark, dataset):
+    # The first load parses the file and writes the snapshot
+    task_manager.TaskStore(dataset["tasks.txt"]).load()
+    store = task_manager.TaskStore(dataset["tasks.txt"])
+    benchmark(store.load)
+    assert len(store.tasks) == BENCH_TASKS
+
+
+@pytest.mark.parametrize("parser", ["split", "split_fields", "escaped"])
+def test_split_lines(benchmark, dataset, parser):
+    # The plain split the legacy format was read with, against
+    # split_fields on the same lines, which hold no escapes, and on lines
+    # with an escaped comma in every description
+    with open(dataset["tasks.txt"], encoding="utf-8") as file:
+        lines = [line.strip() for line in file
+                 if line.strip() not in ("", task_manager.FORMAT_HEADER)]
+    if parser == "escaped":
+        lines = [line.replace("Description of", "Description\\, of")
+                 for line in lines]
+
+    def split_lines():
+        if parser == "split":
+            return list(map(str.split, lines, repeat(", ")))
+        return list(map(task_manager.split_fields, lines))
+
+    fields = benchmark(split_lines)
+    assert len(fields) == BENCH_TASKS
+    assert all(len(values) == 7 for values in fields)
+
+
+def test_view_all(benchmark, dataset):
+    task_manager.get_store(dataset["tasks.txt"])
+
+    def view_all():
+        return sum(1 for _ in task_manager.view_all(dataset["tasks.txt"]))
+
+    assert benchmark(view_all) == BENCH_TASKS
+
+
+def test_view_my(benchmark, dataset):
+    task_manager.get_store(dataset["tasks.txt"])
+
+    def view_my():
+        return sum(1 for _ in task_manager.view_my(dataset["tasks.txt"],
+                                                   "admin"))
+
+    assert benchmark(view_my) > 0
+
+
+@pytest.mark.parametrize("page", ["first", "last"])
+def test_view_page(benchmark, dataset, page):
+    # The last page of the tasks sorted by due date costs about as much as
+    # the first, as the pages before it are skipped in the due date index
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename)
+    offset = 0 if page == "first" else BENCH_TASKS - 10
+
+    def view_page():
+        return sum(1 for _ in task_manager.view_all(
+            filename, {"sort_by_due": True}, offset, 10))
+
+    assert benchmark(view_page) == 10
+
+
+def test_view_filtered(benchmark, dataset):
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename)
+    filters = {"completed": False, "due_from": "01 Jan 2025",
+               "due_to": "31 Dec 2025", "sort_by_due": True}
+    page, _ = benchmark(task_manager.query_tasks, filename, offset=100,
+                        limit=10, **filters)
+    assert len(page) == 10
+    assert all(not task.complete for task in page)
+
+
+def test_overdue_last_page(benchmark, dataset):
+    # The overdue tasks are a range of the due index, so the last page is
+    # sliced out of it without looking at the tasks before it
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename)
+    overdue, _ = task_manager.overdue_tasks(filename)
+    page, next_offset = benchmark(task_manager.overdue_tasks, filename,
+                                  offset=len(overdue) - 10, limit=10)
+    assert page == overdue[-10:]
+    assert next_offset is None
+
+
+def test_due_counts(benchmark, dataset):
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename)
+    counts = benchmark(task_manager.due_counts, filename, 7)
+    overdue, _ = task_manager.overdue_tasks(filename)
+    assert sum(count[0] for count in counts.values()) == len(overdue)
+
+
+@pytest.mark.parametrize("search", ["description 99", "task 1"])
+def test_search(benchmark, dataset, search):
+    # A selective prefix and a prefix shared by many task ids, both looked
+    # up in the search index, which is built before the benchmark
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename).load_search_index()
+    page, _ = benchmark(task_manager.query_tasks, filename, search=search,
+                        limit=10)
+    words = task_manager.search_words(search)
+    assert len(page) == 10
+    assert all(task_manager.search_matches(task, words) for task in page)
+
+
+@pytest.mark.parametrize("source", ["tasks", "file"])
+def test_search_index_load(benchmark, dataset, source):
+    # Building the search index from the tasks on first use, against
+    # reading it back from the file written when the store is compacted
+    store = task_manager.get_store(dataset["tasks.txt"])
+    if source == "file":
+        task_manager.write_search_index(store.filename,
+                                        store.load_search_index())
+
+    def load():
+        store.search_index = None
+        return store.load_search_index()
+
+    assert benchmark(load).count == BENCH_TASKS
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_instrumentation(benchmark, dataset, monkeypatch, enabled):
+    # The cost of the timing decorators, off and on, on a cheap action
+    filename = dataset["tasks.txt"]
+    task_manager.get_store(filename)
+    monkeypatch.setattr(task_manager, "instrumentation",
+                        task_manager.Instrumentation(enabled))
+    page, _ = benchmark(task_manager.query_tasks, filename, limit=10)
+    assert len(page) == 10
+    assert bool(task_manager.instrumentation.timings) == enabled
+
+
+def test_task_list_dct(benchmark, dataset):
+    task_manager.get_store(dataset["tasks.txt"])
+    tasks = benchmark(task_manager.task_list_dct, dataset["tasks.txt"])
+    assert len(tasks) == BENCH_TASKS
+
+
+def test_edit_overwrite(benchmark, dataset):
+    filename = dataset["tasks.txt"]
+    edit = task_manager.user_tasks(filename, "admin")[0]
+    assignees = ["admin", "user1"]
+
+    def edit_overwrite():
+        # Reassign the task back and forth so every edit changes it
+        assignees.reverse()
+        edit["user"] = assignees[0]
+        task_manager.edit_overwrite(filename, edit)
+
+    benchmark(edit_overwrite)
+    task = task_manager.get_store(filename).get(int(edit["task_id"]))
+    assert task.user == edit["user"]
+
+
+def test_statistics(benchmark, dataset, capsys):
+    task_manager.get_store(dataset["tasks.txt"])
+    benchmark(task_manager.statistics, dataset["user.txt"],
+              dataset["tasks.txt"])
+    assert f"{BENCH_TASKS}" in capsys.readouterr().out
+
+
+def test_generate_report(benchmark, dataset):
+    users = task_manager.user_authentication(dataset["user.txt"])
+    task_manager.get_store(dataset["tasks.txt"])
+    benchmark(task_manager.generate_report, dataset["tasks.txt"], users)
+    report = task_manager.get_report_state(dataset["tasks.txt"]).report
+    assert report["total"] == BENCH_TASKS
+
+
+def test_refresh_report(benchmark, dataset):
+    users = task_manager.user_authentication(dataset["user.txt"])
+    task_manager.generate_report(dataset["tasks.txt"], users)
+    benchmark(task_manager.refresh_report, dataset["tasks.txt"], users)
+
+
+@pytest.fixture
+def database(dataset):
+    """
+    Imports the synthetic files into an SQLite database next to them and
+    returns its storage.
+    """
+    filename = task_manager.database_filename(dataset["tasks.txt"])
+    task_manager.import_database(dataset["tasks.txt"], dataset["user.txt"],
+                                 filename)
+    storage = task_manager.SQLiteStorage(filename)
+    yield storage
+    storage.close()
+
+
+def test_import_database(benchmark, dataset):
+    filename = task_manager.database_filename(dataset["tasks.txt"])
+    total_tasks = benchmark(task_manager.import_database,
+                            dataset["tasks.txt"], dataset["user.txt"],
+                            filename)
+    assert total_tasks == BENCH_TASKS
+
+
+def test_sqlite_user_tasks(benchmark, database):
+    def user_tasks():
+        return sum(1 for _ in database.user_tasks("admin"))
+
+    assert benchmark(user_tasks) > 0
+
+
+def test_sqlite_view_page(benchmark, database):
+    page, _ = benchmark(database.query, sort_by_due=True,
+                        offset=BENCH_TASKS - 10, limit=10)
+    assert len(page) == 10
+
+
+def test_sqlite_search(benchmark, database):
+    page, _ = benchmark(database.query, words=["description", "99"],
+                        limit=10)
+    assert len(page) == 10
+
+
+def test_sqlite_edit(benchmark, database):
+    task = next(iter(database.user_tasks("admin")))
+    assignees = ["admin", "user1"]
+
+    def edit():
+        assignees.reverse()
+        database.edit(task.task_id, {"user": assignees[0]})
+
+    benchmark(edit)
+    assert database.get(task.task_id).user == assignees[0]
+
+
+def test_sqlite_report(benchmark, database):
+    report = benchmark(database.report)
+    assert report["total"] == BENCH_TASKS
+
+
+@pytest.fixture
+def sharded(dataset):
+    """
+    Splits the synthetic tasks into shards next to them and returns their
+    storage.
+    """
+    storage = task_manager.ShardedStorage(dataset["tasks.txt"])
+    yield storage
+    for shard in storage.shards:
+        task_manager.task_stores.pop(shard.filename, None)
+        task_manager.report_states.pop(shard.filename, None)
+
+
+def test_sharded_user_tasks(benchmark, sharded):
+    # Only the shard of the user is loaded and refreshed
+    tasks = benchmark(lambda: list(sharded.user_tasks("admin")))
+    assert tasks and all(task.user == "admin" for task in tasks)
+    loaded = [shard.filename for shard in sharded.shards
+              if shard.filename in task_manager.task_stores]
+    assert len(loaded) == 1
+
+
+def other_shard_user(sharded):
+    """
+    Returns a user whose tasks are in another shard than those of admin.
+    """
+    shards = len(sharded.shards)
+    return next(f"user{number}" for number in range(1, BENCH_USERS)
+                if task_manager.shard_number(f"user{number}", shards)
+                != task_manager.shard_number("admin", shards))
+
+
+def test_sharded_move(benchmark, sharded):
+    # Reassigning a task back and forth between users of two shards. Each
+    # move appends the task to one shard and journals its removal from
+    # the other, but a shard is compacted first if the task's removal
+    # from it is still in its journal
+    task = next(iter(sharded.user_tasks("admin")))
+    assignees = ["admin", other_shard_user(sharded)]
+
+    def move():
+        assignees.reverse()
+        sharded.edit(task.task_id, {"user": assignees[0]})
+
+    benchmark(move)
+    assert sharded.get(task.task_id).user == assignees[0]
+
+
+def test_sharded_move_once(benchmark, sharded):
+    # Reassigning a different task to a user of another shard each time,
+    # which rewrites neither shard
+    tasks = iter(list(sharded.user_tasks("admin")))
+    other = other_shard_user(sharded)
+    moved = []
+
+    def move():
+        moved.append(next(tasks).task_id)
+        sharded.edit(moved[-1], {"user": other})
+
+    benchmark.pedantic(move, rounds=20)
+    assert all(sharded.get(task_id).user == other for task_id in moved)
+
+
+def test_sharded_report(benchmark, sharded):
+    report = benchmark(sharded.report)
+    assert report["total"] == BENCH_TASKS
+
+
+def test_scan_count(benchmark, dataset):
+    total_tasks = benchmark(task_manager.scan_count, dataset["tasks.txt"])
+    assert total_tasks == BENCH_TASKS
+
+
+def test_scan_user_tasks(benchmark, dataset):
+    tasks = benchmark(task_manager.scan_user_tasks, dataset["tasks.txt"],
+                      "admin")
+    assert tasks and all(task.user == "admin" for task in tasks)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4, 8])
+def test_parallel_report(benchmark, dataset, workers):
+    # Compare the rows of the workers values to see how counting the
+    # reports scales across cores. Loading the store first gives the
+    # generated tasks the ids that the workers need
+    task_manager.get_store(dataset["tasks.txt"])
+    report = benchmark(task_manager.parallel_report_counters,
+                       dataset["tasks.txt"], workers)
+    assert report["total"] == BENCH_TASKS
+
+
+def test_concurrent_writers(benchmark, dataset):
+    # Raises if any task or edit made by the writers was lost
+    result = benchmark.pedantic(run_stress,
+                                args=(dataset["tasks.txt"], 6, 30),
+                                rounds=1)
+    benchmark.extra_info["throughput"] = result["throughput"]
+
+
+def test_import_tasks(benchmark, dataset, tmp_path):
+    # The source of an import is in the format of the original tasks.txt,
+    # without the task ids
+    source = tmp_path / "import.txt"
+    with open(dataset["tasks.txt"], encoding="utf-8") as file:
+        source.write_text("".join(line.rsplit(", ", 1)[0] + "\n"
+                                  for line in file), encoding="utf-8")
+    users = task_manager.user_authentication(dataset["user.txt"])
+    total_tasks = benchmark.pedantic(
+        task_manager.import_tasks,
+        args=(dataset["tasks.txt"], str(source), users), rounds=3)
+    assert total_tasks == BENCH_TASKS
+
+
+@pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+def test_export_import_tasks(benchmark, dataset, tmp_path, file_format):
+    # Every round exports the dataset and imports it into an empty file
+    destination = str(tmp_path / f"export.{file_format}")
+    imported = tmp_path / "imported.txt"
+    users = task_manager.user_authentication(dataset["user.txt"])
+
+    def setup():
+        imported.write_text("", encoding="utf-8")
+        task_manager.task_stores.pop(str(imported), None)
+
+    def round_trip():
+        task_manager.export_tasks(dataset["tasks.txt"], destination)
+        return task_manager.import_tasks(str(imported), destination, users)
+
+    total_tasks = benchmark.pedantic(round_trip, setup=setup, rounds=3)
+    assert total_tasks == BENCH_TASKS
+
+
+def test_user_store_load(benchmark, login_users):
+    store = benchmark.pedantic(
+        lambda: task_manager.UserStore(login_users).refresh(), rounds=5)
+    assert len(store.users) == BENCH_LOGIN_USERS
+
+
+def test_register_user(benchmark, login_users, tmp_path, monkeypatch):
+    # Registering reads back only the appended line, so its cost does not
+    # grow with the number of users. The hash is kept cheap to show that.
+    path = tmp_path / "user.txt"
+    path.write_bytes(open(login_users, "rb").read())
+    monkeypatch.setattr(task_manager, "KDF_ITERATIONS", 1)
+    store = task_manager.UserStore(str(path)).refresh()
+    names = (f"new{number}" for number in range(10_000))
+    benchmark(lambda: store.register(next(names), "password"))
+    assert len(store.users) > BENCH_LOGIN_USERS
+    assert store.users == task_manager.UserStore(str(path)).refresh().users
+
+
+@pytest.fixture
+def login_store(login_users):
+    """
+    Returns the store of the login users, with admin given a password
+    hashed at the configured cost.
+    """
+    store = task_manager.UserStore(login_users).refresh()
+    store.users["admin"] = task_manager.hash_password("password0")
+    return store
+
+
+def test_login_cold(benchmark, login_store):
+    # Clear the cache before each round so that every login is hashed
+    verified = benchmark.pedantic(
+        login_store.verify, args=("admin", "password0"),
+        setup=task_manager.verified_passwords.clear, rounds=3)
+    assert verified
+
+
+def test_login_cached(benchmark, login_store):
+    assert login_store.verify("admin", "password0")
+    verified = benchmark(login_store.verify, "admin", "password0")
+    assert verified
+    assert not login_store.verify("admin", "wrong")
+
+
+def test_server_load(benchmark, dataset, tmp_path):
+    # Clients log in as the synthetic users and send a mix of requests
+    path = str(tmp_path / "tasks.sock")
+    server = start_server(dataset["tasks.txt"], dataset["user.txt"], path)
+    try:
+        result = benchmark.pedantic(run_load,
+                                    args=(50, BENCH_USERS, 20, path),
+                                    rounds=1)
+    finally:
+        server.terminate()
+        server.join()
+    assert result["requests"] == 50 * 22
+    benchmark.extra_info["throughput"] = result["throughput"]
+    benchmark.extra_info["p99"] = result["p99"]
@@ -1,787 +1,6467 @@
-# -------------------------------- Imports -------------------------------- #
-import os
-from datetime import datetime as dt
-
-# ----------------------------- User-Functions ---------------------------- #
-
-
-def menu():
-    """
-    A function that returns the menu options when the username is not
-    admin.
-    """
-    print('\nPlease select from the following options:')
-    print('r - register user')
-    print('a - add task')
-    print('va - view all tasks')
-    print('vm - view my tasks')
-    print('e - exit')
-
-
-def admin_menu():
-    """
-    A function that returns the menu options when the username is
-    admin.
-    """
-    print('\nPlease select from the following options:')
-    print('r - register user')
-    print('a - add task')
-    print('va - view all tasks')
-    print('vm - view my tasks')
-    print('ds - display statistics')
-    print('gr - generate reports')
-    print('vr - view reports')
-    print('e - exit')
-
-
-def edit_menu():
-    """
-    A function that returns this menu options when the user chooses
-    to edit a task.
-
-    returns:
-        edit(str): Returns the input from the user as a variable
-    """
-    print("e - To mark the task as complete")
-    print("a - To change who the task is assigned to")
-    edit = input("d - To edit the due date of the task: ")
-
-    return edit
-
-
-def path_directory(filename: str):
-    """
-    A function that finds the filepath on a system depending on where
-    this file is on the system, and takes in the filename as an input,
-    to create the filepath to the file.
-
-    Args:
-        filename(str): The name of the desired .txt file as a string
-
-    Returns:
-        filepath(str): The filepath to the program and file
-    """
-    dirname = os.path.dirname((__file__))
-    file_path = os.path.join(dirname, filename)
-
-    return file_path
-
-
-def read_file(filename: str, mode: str):
-    """
-    A function that takes in a .txt file and reads and returns its
-    contents, using the read method or the read and write method,
-    depending on the mode input.
-
-    Args:
-        filename(str): The name of the desired .txt file as a string
-        mode(str): The mode which the file is read
-
-    Returns:
-        content(list): Returns the contents of a file as a nested list
-        with each new line being represented as a seperated list
-        element when "r+" mode is selected, or returns the file as
-        single string if "r" mode is selected. Error message is
-        returned if mode selected is neither "r" or "r+"
-    """
-    file_path = path_directory(filename)
-    with open(file=file_path, mode=mode, encoding="utf-8") as file:
-        if mode == "r+":
-            content = file.readlines()
-        elif mode == "r":
-            content = file.read()
-        else:
-            raise ValueError("mode needs to be 'r' or 'r+'")
-
-    return content
-
-
-def user_authentication(filename: str):
-    """
-    A function that creates a dictionary of the users and their
-    passwords from a .txt file containing the users and their passwords
-    on each line
-
-    Args:
-        filename(str): a .txt file as a string
-
-    Returns:
-        user_password_dict(dict): a dict with the key value
-        representing the user and the value representing the
-        password of that user
-    """
-    file_content = read_file(filename, "r+")
-    user_password_dict = {}
-    for element in file_content:
-        # Remove any whitespace and unpack values from file line
-        username, password = element.strip().split(", ")
-        # Append to dictionary
-        user_password_dict.update({username: password})
-
-    return user_password_dict
-
-
-def write_file(filename: str, mode: str, content: str):
-    """
-    A function that opens a filename an adds specified content onto
-    what is already on the .txt, or creates a new .txt file if it does
-    not exist.
-
-    Args:
-        filename(str): a .txt file of to write to
-        mode(str): the method with which the file will be written in
-        content(str): the content to write to the file.
-    """
-    file_path = path_directory(filename)
-    with open(file=file_path, mode=mode, encoding="utf-8") as file:
-        file.write(content)
-
-
-def new_user(filename: str):
-    """
-    A function that allows for the admin to register a new user, if the
-    user is not on the database already.
-
-    Args:
-        filename(str): a .txt file which new user will be written into
-    """
-    while True:
-        print("\nPlease provide the new username to", end=" ")
-        new_username = input("be registered: ").lower()
-        if new_username in users.keys():
-            print("User is already registered.")
-            break
-        else:
-            while True:
-                print("Please provide password for,", end=" ")
-                new_password = input(f'{new_username.title()}: ')
-                password_confirmation = input("Please confirm password: ")
-                if new_password == password_confirmation:
-                    write_file(filename, "a+",
-                               f"\n{new_username}, {new_password}")
-                    print(f"\n{new_username.title()} has been ", end=" ")
-                    print("successfully added to database.\n")
-                    break
-                else:
-                    print("\nPassword and confirmation", end=" ")
-                    print("password do not match.")
-            break
-
-
-def add_task():
-    """
-    A  function that stores the inputs of a user about the tasks
-    assigned to another authorised user, and returns the input
-    information in a readable string format.
-
-    Returns:
-        content(str): Returns formatted string
-    """
-    while True:
-        taskee = input("\nUsername to assign task to: ")
-        # checks using membership operator whether the taskee is in the
-        # users list of keys
-        if taskee in users.keys():
-            break
-        else:
-            print("User has not been register.", end=" ")
-            print("Please assign tasks to registered users only.\n")
-
-    while True:
-        print("Provide short description of task", end=" ")
-        task_description = input('(<255 characters): ')
-        if len(task_description) < 255:
-            break
-        else:
-            print("You have exceeded the limit,", end=" ")
-            print("please provide a shorter description", end=" ")
-            print("of less than 255 characters\n")
-
-    while True:
-        print("Due date of the task in {dd mon yyyy} format", end=" ")
-        due_date = input("(mon is months abbreviated name): ").strip().title()
-        try:
-            # strptime() method of datetime module to ensure correct
-            # format provided. Returns value error if wrong format
-            # provided
-            due_date_check = dt.strptime(due_date, '%d %b %Y').date()
-            break
-        except ValueError:
-            print("You did not provide the correct format.\n")
-
-    # # Use the date portion of the datetime object
-    assignment_date = dt.today().date()
-    assignment_date = dt.strftime(assignment_date, '%d %b %Y')
-    task_completion = "No"
-    task_title = input("Provide the title of the task: ")
-    content = (f"\n{taskee}, {task_title}, {task_description}, "
-               f"{assignment_date}, {due_date}, {task_completion}")
-    print(f"\nTask successfully assigned to {taskee.title()}")
-    return content
-
-
-def view_all(filename: str):
-    """
-    A function that splits each line in filename by the comma and
-    stores each split into its own variable and stores those variables
-    into a readable format, which is returned when the function is
-    called
-
-    Args:
-        filename(str): a .txt file where data will be read into from
-
-    Returns:
-        view_all_tasks(str): Formatted string of all the tasks assigned
-        on the database
-    """
-    view_all_tasks = ""
-    file_content = read_file(filename, "r+")
-    for line in file_content:
-        # Split each line from the file_contents at the comma
-        line_content = line.split(',')
-        # Use splat operator to pass list elements to each argument
-        view = f"{'-'*165}{view_format(*line_content)}\n{'-'*165}\n"
-        view_all_tasks = view_all_tasks + view
-
-    return view_all_tasks
-
-
-def view_my(filename: str):
-    """
-    A function that splits each line in filename by the comma and
-    stores each split into its own variable and stores those variables
-    into a readable format. If the 'user' variable is the same as the
-    username, the other variables related to that 'user' will then be
-    stored as a variable which is returned when the function is
-    called
-
-    Args:
-        filename(str): a .txt file where data will be read from
-
-    Returns:
-        view_my_tasks(str): A formatted string of all the tasks of the
-        user that is logged in.
-    """
-    view_my_tasks = ""
-    file_contents = read_file(filename, "r+")
-    counter = 1
-    for line in file_contents:
-        # Split each line from the file_contents at the comma
-        data = line.split(',')
-        # Remove any whitespace
-        if data[0].strip() == username:
-            # Use splat operator to pass list elements to each argument
-            view = f"{'-'*165}\n{counter}.{view_format(*data)}\n{'-'*165}\n"
-            view_my_tasks = view_my_tasks + view
-            counter += 1
-
-        else:
-            pass
-
-    return view_my_tasks
-
-
-def user_tasks(filename: str):
-    """
-    A function that is responsible for reading in a file and retrieving
-    all the tasks assigned to the user currently logged onto the system
-    , and storing the task information as a dictionary. Each task dict
-    is then stored in a list.
-
-    Args:
-        filename(str): the filename that is to be read.
-
-    Return:
-        user_tasks_list(list): A list of dictionaries, each
-        representing a task assigned to the user logged into the system
-    """
-    file_contents = read_file(filename, "r+")
-    user_tasks_list = []
-    for line in file_contents:
-        # Split each line from the file_contents at the comma
-        data = line.split(', ')
-        # Remove any whitespace
-        if data[0].strip() == username:
-            user_task = task_dct(*data)
-            user_tasks_list.append(user_task)
-        else:
-            pass
-
-    return user_tasks_list
-
-
-def view_format(user: str, task: str, task_description: str,
-                date_assign: str, due_date: str, task_comp: str):
-    """
-    A function that is responsible for returning the desired formatting
-    of the provided arguments
-
-    Args:
-        user(str): User that the task is assigned to
-        task(str): Task that is assigned to the user
-        task_description(str): Description of the task that is assigned
-        date_assign(str): Date the task is assigned on
-        due_date(str): Date the task is due on
-        task_comp(str): Whether the task is complete or not
-
-    Returns:
-        view(str): Formatted string of all the provided arguments
-    """
-    view = (
-        f"\nAssigned to:\t\t {user}"
-        f"\nTask:\t\t\t{task}"
-        f"\nTask description:\t{task_description}"
-        f"\nDate assigned:\t\t{date_assign}"
-        f"\nDue date:\t\t{due_date}"
-        f"\nTask Completed?\t\t{task_comp}"
-    )
-
-    return view
-
-
-def task_dct(user: str, task: str, task_description: str,
-             date_assign: str, due_date: str, task_comp: str):
-    """
-    A function that is responsible for returning a dictionary from the
-    provided arguments.
-
-    Args:
-        user(str): User that the task is assigned to
-        task(str): Task that is assigned to the user
-        task_description(str): Description of the task that is assigned
-        date_assign(str): Date the task is assigned on
-        due_date(str): Date the task is due on
-        task_comp(str): Whether the task is complete or not
-
-    Returns:
-        task(dict): a key:value dictionary of all the information of a
-        task
-    """
-    task = {
-        "user": user,
-        "task": task,
-        "task_description": task_description,
-        "date_assign": date_assign,
-        "due_date": due_date,
-        "task_comp": task_comp
-    }
-
-    return task
-
-
-def file_overwrite(filename: str, list_of_dct: list):
-    """
-    A function that is responsible for overwriting an existing filename
-
-    Args:
-        filename(str): A .txt file that will be overwritten
-        list_of_dct(str): A list of dictionaries that represent each
-        task in the filename with the changed values.
-    """
-    # Use the first dictionary in list_dct to overwrite
-    # current tasks.txt file
-    new_line = ", ".join(list_of_dct[0].values())
-    write_file(filename, "w+", f"{new_line}\n")
-    # Append the rest of the list_dct elements into the
-    # tasks.txt file
-    for dct in list_of_dct[1:]:
-        new_line = ", ".join(list(dct.values()))
-        write_file(filename, "a+", f"{new_line}\n")
-
-
-def edit_overwrite(edit: dict):
-    """
-    A function that is responsible for overwriting a task dictionary,
-    if the tasks description and the edited tasks description are the
-    same, that task dictionary's values are then replaced according to
-    the keyword arguments
-
-    Args:
-        edit(dict): a dict representing a task that has been edited
-    """
-    all_tasks_override = task_list_dct("tasks.txt")
-    # Loop through each dict in the list
-    for dct in all_tasks_override:
-        # if the "task_description" for the dictionary instance in the
-        # loop, and that of the edit passed to the function are the
-        # same, update the loop instance with the edit dictionary
-        if dct["task_description"] == edit["task_description"]:
-            dct.update(edit)
-    file_overwrite('tasks.txt', all_tasks_override)
-
-
-def statistics(user_filename: str, tasks_filename: str):
-    """
-    A function that summerises the total number of users and the total
-    number of tasks in the user_filename and tasks_filename, and prints
-    the information in a summerised format
-    """
-    users = user_authentication(user_filename)
-    # Counts the current total number of users in the user_filename
-    total_users = len(users.keys())
-    total_tasks = 0
-    file = read_file(tasks_filename, "r+")
-    # Use placeholder to iterate file
-    for _ in file:
-        total_tasks += 1
-
-    print("STATISTICS\n")
-    print(f"Total number of registered users:\t\t {total_users}")
-    print(f"Total number of tasks for all users:\t\t {total_tasks}\n")
-
-
-def task_list_dct(filename: str):
-    """
-    A function that is responsible for reading a file and storing each
-    line of its contents about a task as a dictionary that is then
-    appended to a list that represents the entire content of the read
-    file
-
-    Args:
-        filename(str): A .txt file that contains information about tasks
-        that will be read in
-
-    Returns:
-        list_dct(dict): A list containing dictionary elements which
-        represent a task.
-    """
-    # Stores each task as a dct in a list
-    list_dct = []
-    file_contents = read_file(filename, "r+")
-    for line in file_contents:
-        line_content = line.strip().split(', ')
-        # unpack the line_content into the args of the task_dct
-        # function
-        task = task_dct(*line_content)
-        list_dct.append(task)
-
-    return list_dct
-
-
-def task_overview(list_of_dct: list):
-    """
-    A function that is responsible for generating the task overview
-    details in a .txt file
-
-    Args:
-        list_of_dct(dict): A list of dictionaries containing
-        information about a task
-
-    Returns:
-        view(str): Returns the task overview information in a desired
-        format
-    """
-    total_num_tasks = len(list_of_dct)
-    # Use incremental operator to return total completed tasks
-    completed_tasks = 0
-    for dct in list_of_dct:
-        if dct["task_comp"] == "Yes":
-            completed_tasks += 1
-
-    # Use incremental operator to return total incomplete tasks
-    incompleted_tasks = 0
-    for dct in list_of_dct:
-        if dct["task_comp"] == "No":
-            incompleted_tasks += 1
-
-    # Use incremental operator to return total overdue tasks
-    overdue_tasks = 0
-    for dct in list_of_dct:
-        # Convert due_date to a datetime object
-        dct["due_date"] = dt.strptime(dct["due_date"], '%d %b %Y').date()
-        today = dt.today().date()
-
-        if (dct["task_comp"] == "No") & (dct["due_date"] < today):
-            overdue_tasks += 1
-
-    incomplete_pct = round((incompleted_tasks / total_num_tasks) * 100, 2)
-    overdue_pct = round((overdue_tasks / total_num_tasks) * 100, 2)
-
-    view = (
-        f"TASKS REPORT"
-        f"\n\nTotal tasks:                   {total_num_tasks}"
-        f"\nTotal Completed tasks:         {completed_tasks}"
-        f"\nTotal Incompleted tasks:       {incompleted_tasks}"
-        f"\nTotal Overdue tasks:           {overdue_tasks}"
-        f"\nIncomplete tasks percent(%):   {incomplete_pct}%"
-        f"\nOverdue tasks percent(%):      {overdue_pct}%\n"
-    )
-
-    write_file('task_overview.txt', 'w+', view.strip())
-
-
-def user_overview(user_dct: dict, list_of_dct: dict):
-    """
-    A function that is responsible for generating the user overview
-    details in a .txt file
-
-    Args:
-        list_of_dct(dict): A list of dictionaries containing
-        information about a task
-
-    Returns:
-        view(str): Returns the user overview information in a desired
-        format
-    """
-    total_num_tasks = len(list_of_dct)
-    user_tasks_total = []
-    # For each user in the database, do the following:
-    for user in user_dct.keys():
-        today = dt.today().date()
-        user_tasks_count = 0
-        overdue_tasks = float(0)
-        user_task_comp = float(0)
-        # Iterate through list_of_dct, which represents each task as a
-        # dictionary
-        for dct in list_of_dct:
-            overdue_mask = ((dct.get("user") == user)
-                            & (dct["task_comp"] == "No")
-                            & (dct["due_date"] < today))
-            completion_mask = ((dct.get("task_comp") == "Yes")
-                               & (dct.get("user") == user))
-            # When dct value is the same as user from user.keys() for
-            # that instance of the iteration
-            if dct.get("user") == user:
-                # Add one to the user_tasks_count for user
-                user_tasks_count += 1
-            # If overdue_mask conditions are met
-            if overdue_mask:
-                # Add one to the overdue_tasks for user
-                overdue_tasks += 1
-            # If completion_mask conditions are met
-            if completion_mask:
-                # Add one to the user_task_comp for user
-                user_task_comp += 1
-
-        try:
-            task_overdue_pct = round((overdue_tasks / user_tasks_count)
-                                     * 100, 2)
-        except ZeroDivisionError:
-            task_overdue_pct = round(0, 2)
-        try:
-            task_comp_pct = round((user_task_comp / user_tasks_count)
-                                  * 100, 2)
-        except ZeroDivisionError:
-            task_comp_pct = round(0, 2)
-        # Store the information as a dictionary and append to
-        # user_tasks_total
-        summary_dct = {
-            "user": user,
-            "total_tasks": user_tasks_count,
-            "overdue_pct": task_overdue_pct,
-            "complete_tasks": user_task_comp,
-            "tasks_comp_pct": task_comp_pct
-        }
-        user_tasks_total.append(summary_dct)
-    # For each users summary,
-    for user_summary in user_tasks_total:
-        pct_of_all_tasks = round((user_summary.get("total_tasks")
-                                 / total_num_tasks) * 100, 2)
-        # Store as key:value in user_summary dictionary
-        user_summary.update({"pct_of_tasks": round(pct_of_all_tasks, 2)})
-
-    for user_summary in user_tasks_total:
-        incomp_with_task = ((user_summary.get("tasks_comp_pct") == float(0))
-                            & (user_summary.get("total_tasks") > 0))
-        incomp_no_task = ((user_summary.get("tasks_comp_pct") == float(0))
-                          & (user_summary.get("total_tasks") == 0))
-        if incomp_with_task:
-            incom_pct = float(100)
-        elif incomp_no_task:
-            incom_pct = float(0)
-        else:
-            # If user_task_comp is not zero, execute this block of code
-            incom_pct = round(100 - user_summary.get("tasks_comp_pct"), 2)
-        # Store as key:value in user_summary dictionary
-        user_summary.update({"tasks_incom_pct": incom_pct})
-
-    all_views = []
-    for user_summary in user_tasks_total:
-        view = (
-            f"USER TASKS REPORT"
-            f"\n\nUser:                   {user_summary.get('user')}"
-            f"\nTotal tasks:            {user_summary.get('total_tasks')}"
-            f"\n% of all tasks:         {user_summary.get('pct_of_tasks')}%"
-            f"\n% of tasks completed:   {user_summary.get('tasks_comp_pct')}%"
-            f"\n% of tasks incomplete:  {user_summary.get('tasks_incom_pct')}%"
-            f"\n% of tasks overdue:     {user_summary.get('overdue_pct')}%"
-        )
-        all_views.append(view)
-
-    # Write over the existing file
-    write_file('user_overview.txt', 'w+', all_views[0].strip())
-    # Use for loop to append to the file
-    for view in all_views[1:]:
-        write_file('user_overview.txt', 'a+', f"\n\n{view.strip()}")
-
-
-def generate_report(filename: str):
-    """
-    A function that is responsible for producing the task over view
-    report and the user over view reports.
-    """
-    list_dct = task_list_dct(filename)
-    task_overview(list_dct)
-    user_overview(users, list_dct)
-
-# ---------------------------------- Login -------------------------------- #
-
-# store the user/password dictionary as users to be able to access the
-# users using the .keys() function, as well as the users passwords,
-# using the .values() function
-
-
-users = user_authentication("user.txt")
-while True:
-    # Use defensive means to ensure username is stored in lowercaps
-    username = input('Please provide username to login: ').lower()
-    # Check whether user input, "username" is in our users list
-    if username in users.keys():
-        print(f"Hello {username.title()}, please provide your", end=" ")
-        password_request = input("password: ")
-        # Use .get() function to access the values of the dictionary using
-        # key
-        if password_request == users.get(username):
-            print("Password correct!", end=" ")
-            print(f"Welcome back, {username.title()}!\n")
-            break
-        else:
-            print('\nOops, that doesnt seem right,', end=' ')
-            print("Let's try that again.")
-    else:
-        print('Username name on database. Please ensure', end=' ')
-        print('you are providing the correct login details\n')
-
-# ---------------------------------- Menu -------------------------------- #
-choice = 'x'
-while choice != 'e':
-    if username == 'admin':
-        admin_menu()
-    else:
-        menu()
-    choice = input('Selection: ')
-    if choice == 'r':
-        if username == 'admin':
-            new_user('user.txt')
-            users = user_authentication('user.txt')
-        else:
-            print('Only admin has the rights to register new users')
-    elif choice == 'a':
-        new_task = add_task()
-        write_file('tasks.txt', "a+", new_task)
-    elif choice == 'va':
-        all_tasks = view_all('tasks.txt')
-        print("\nTasks for all users:")
-        print(all_tasks)
-    elif choice == 'vm':
-        print(f"\nTasks for {username.title()}:\n")
-        my_tasks = view_my('tasks.txt')
-        print(my_tasks)
-
-        list_dct = user_tasks('tasks.txt')
-
-        while True:
-            try:
-                print("\nPlease provide the index of the task you'd", end=" ")
-                print("like to edit, or return", end=" ")
-                edit = int(input("-1 to go back to the previous menu: "))
-                if edit == -1:
-                    break
-                elif edit <= len(list_dct):
-                    # Subtract -1 from 'edit' to ignore zero-indexing
-                    _task = list_dct[edit - 1]
-                    # Remove blank spaces from values using dict
-                    # comprehension
-                    _task = {idx: value.strip()
-                             for idx, value in _task.items()}
-                    print("\nTASK SELECTED:")
-                    print(f"{view_format(**_task)}\n")
-                    # Strips any blank space from the input value
-                    selection = edit_menu().strip()
-                    if ((selection == "e")
-                            & (_task["task_comp"].strip() == "No")):
-                        _task["task_comp"] = "Yes"
-                        # Overwrite the changes
-                        edit_overwrite(_task)
-                        # Confirmation message to user
-                        print(f"\nTask: {_task['task']}", end=" ")
-                        print("has been successfully marked as", end=" ")
-                        print(f"complete for {_task['user'].title()}")
-                    elif ((selection == "a")
-                          & (_task["task_comp"].strip() == "No")):
-                        reassign = input("\nUser to reassign task to: ")
-                        if reassign not in users.keys():
-                            print("Please ensure that user you are", end=" ")
-                            print("reassigning task to, is a", end=" ")
-                            print("validated user on the database\n")
-                        else:
-                            _task["user"] = reassign
-                            # Overwrite the changes
-                            edit_overwrite(_task)
-                            print("Task successfully", end=" ")
-                            print(f"reassigned to {reassign.title()}")
-                    elif ((selection == "d")
-                          & (_task["task_comp"].strip() == "No")):
-                        while True:
-                            print("Provide the new due date for the", end=" ")
-                            # Store the first letter of the month as a capital
-                            reassign_date = input(
-                                "task (dd mon yyyy): ").title()
-                            try:
-                                # strptime() method of datetime module to
-                                # ensure correct format provided. Returns
-                                # value error if wrong format provided
-                                due_date_check = (
-                                    dt.strptime(reassign_date, '%d %b %Y')
-                                    .date())
-                                break
-                            except ValueError:
-                                print("Please provide the correct format.\n")
-                        _task["due_date"] = reassign_date
-                        # Overwrite the changes
-                        edit_overwrite(_task)
-                        # Confirmation message to user
-                        print(f"\nTask: {_task['task']} date", end=" ")
-                        print("has been successfully changed to", end=" ")
-                        print(f"{reassign_date} for {_task['user'].title()}")
-                    elif ((selection == "a")
-                          & (_task["task_comp"].strip() == "Yes")):
-                        print("\nOops! You cannot reassign a completed task!")
-                    else:
-                        print("\nInvalid Selection")
-                        print(my_tasks)
-                elif edit > len(list_dct):
-                    print("\nInput provided is invalid. Please ", end=" ")
-                    print("select a valid task number")
-                    print(my_tasks)
-            except ValueError:
-                print("Please ensure you have provided valid option\n")
-                print(my_tasks)
-    elif choice == 'ds':
-        print("\nSystem summative statistics:")
-        print('*'*165)
-        statistics('user.txt', 'tasks.txt')
-        print(f"{'*'*165}\n")
-    elif choice == 'gr':
-        generate_report("tasks.txt")
-        print("\nReport successfully generated!")
-    elif choice == 'vr':
-        print("\nTo view a report, please generate a report first.")
-        print("1 - To generate a report")
-        print("0 - To go back to the previous menu")
-        answer = input("Submission: ")
-        if answer == "1":
-            generate_report("tasks.txt")
-            t_overview = read_file("task_overview.txt", "r")
-            u_overview = read_file("user_overview.txt", "r")
-            print(f"\n{'*'*165}")
-            print(f"\n{t_overview}\n{'*'*165}\n{u_overview}")
-            print(f"\n{'*'*165}")
-        elif answer == "0":
-            break
-        else:
-            print("Please ensure valid option has been selected.")
-    elif choice == 'e':
-        print("\nGoodbye!")
-    else:
-        print("Please ensure to have made the correct input.")
+# -------------------------------- Imports -------------------------------- #
+import argparse
+import asyncio
+import atexit
+import cProfile
+import csv
+import gc
+import hashlib
+import heapq
+import hmac
+import json
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from datetime import datetime as dt
+from functools import lru_cache, wraps
+from itertools import chain, islice
+from operator import attrgetter, gt
+
+try:
+    import fcntl
+except ImportError:
+    # File locking is not available on Windows
+    fcntl = None
+
+# ------------------------------- Constants ------------------------------- #
+
+# The month abbreviations of the {dd mon yyyy} dates in tasks.txt
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_NUMBERS = {name: number for number, name in enumerate(MONTH_NAMES, 1)}
+# Number of distinct dates whose parsed and formatted forms are memoized
+DATE_CACHE_SIZE = 8192
+# A BatchWriter writes out what it holds once it has this many records or
+# characters, and syncs to disk according to TASK_MANAGER_FSYNC: after
+# every write out ("always"), once when done ("close") or never ("never")
+WRITE_FLUSH_RECORDS = 10_000
+WRITE_FLUSH_BYTES = 1 << 20
+FSYNC_POLICY = os.environ.get("TASK_MANAGER_FSYNC", "close")
+# Number of tasks shown on each page of the task views
+VIEW_PAGE_SIZE = 10
+# Number of days ahead that the tasks due soon are shown for by default
+DUE_SOON_DAYS = 7
+
+# ---------------------------- Instrumentation ---------------------------- #
+
+# Setting TASK_MANAGER_INSTRUMENT=1, or passing --instrument, times the
+# instrumented functions and prints a summary when the session ends
+INSTRUMENT = os.environ.get("TASK_MANAGER_INSTRUMENT") == "1"
+# Number of most recent calls of each function kept for its p95 time
+INSTRUMENT_SAMPLES = 10_000
+# The menu selection to run under cProfile, or under tracemalloc when
+# TASK_MANAGER_PROFILE_MEMORY=1, as set by --profile and --profile-memory
+PROFILE_ACTION = os.environ.get("TASK_MANAGER_PROFILE")
+PROFILE_MEMORY = os.environ.get("TASK_MANAGER_PROFILE_MEMORY") == "1"
+
+
+class Instrumentation:
+    """
+    A class that collects how long each instrumented function takes and
+    counters such as the bytes read and written and the lines parsed,
+    for a summary at the end of a session. Nothing is collected while it
+    is disabled, so the instrumented functions only pay for one check.
+
+    Attributes:
+        enabled(bool): Whether calls and counts are being collected
+        profile_action(str): The menu selection to profile, or None
+        profile_memory(bool): Whether to profile the memory allocated by
+        the action rather than the time spent in each function
+        timings(dict): The number of calls, total seconds and the most
+        recent durations of each function, by name
+        counters(dict): The total of each counter, by name
+    """
+
+    def __init__(self, enabled: bool = False, profile_action: str = None,
+                 profile_memory: bool = False):
+        self.enabled = enabled
+        self.profile_action = profile_action
+        self.profile_memory = profile_memory
+        self.timings = {}
+        self.counters = {}
+
+    def record(self, name: str, seconds: float):
+        """
+        Adds a call of name that took seconds.
+        """
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [
+                0, 0.0, deque(maxlen=INSTRUMENT_SAMPLES)]
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2].append(seconds)
+
+    def count(self, name: str, amount: int = 1):
+        """
+        Adds amount to the counter name, if enabled.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """
+        Returns the calls, total, mean and p95 time of each function,
+        slowest in total first, followed by the counters.
+        """
+        lines = [f"{'Function':<36}{'Calls':>8}{'Total ms':>12}"
+                 f"{'Mean ms':>11}{'p95 ms':>11}"]
+        for name, (calls, total, samples) in sorted(
+                self.timings.items(), key=lambda item: -item[1][1]):
+            ordered = sorted(samples)
+            # The nearest rank of the 95th percentile
+            p95 = ordered[-(-95 * len(ordered) // 100) - 1]
+            lines.append(f"{name:<36}{calls:>8}{total * 1000:>12.2f}"
+                         f"{total / calls * 1000:>11.3f}"
+                         f"{p95 * 1000:>11.3f}")
+        if self.counters:
+            lines.append(f"\n{'Counter':<36}{'Total':>12}")
+            for name, total in sorted(self.counters.items()):
+                lines.append(f"{name:<36}{total:>12}")
+
+        return "\n".join(lines) + "\n"
+
+
+instrumentation = Instrumentation(INSTRUMENT, PROFILE_ACTION, PROFILE_MEMORY)
+
+
+def instrumented(function):
+    """
+    A decorator that times every call of function, including coroutine
+    functions, while instrumentation is enabled.
+
+    Args:
+        function(function): The function to time
+
+    Returns:
+        wrapper(function): The function, timed
+    """
+    name = function.__qualname__
+    if asyncio.iscoroutinefunction(function):
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return await function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                instrumentation.record(name, time.perf_counter() - start)
+    else:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instrumentation.record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+# The cProfile profile of the menu action being profiled, which gathers
+# every time the action is run during the session
+profilers = {}
+
+
+@contextmanager
+def profiled(action: str):
+    """
+    A context manager that runs a menu action under cProfile, or under
+    tracemalloc when profile_memory is set, if it is the action being
+    profiled, and then writes the profile next to the program as
+    profile_<action>.prof, to be read with pstats, or the largest
+    allocations as memory_<action>.txt.
+
+    Args:
+        action(str): The menu selection being run
+    """
+    if action != instrumentation.profile_action:
+        yield
+        return
+    if instrumentation.profile_memory:
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            filename = path_directory(f"memory_{action}.txt")
+            with open(filename, mode="w", encoding="utf-8") as file:
+                file.write(f"Current {current} bytes, peak {peak} bytes\n")
+                for statistic in snapshot.statistics("lineno")[:30]:
+                    file.write(f"{statistic}\n")
+            print(f"Memory profile of {action} written to {filename}",
+                  file=sys.stderr)
+        return
+    profiler = profilers.setdefault(action, cProfile.Profile())
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        filename = path_directory(f"profile_{action}.prof")
+        profiler.dump_stats(filename)
+        print(f"Profile of {action} written to {filename}", file=sys.stderr)
+
+# ----------------------------- User-Functions ---------------------------- #
+
+
+def menu():
+    """
+    A function that returns the menu options when the username is not
+    admin.
+    """
+    print('\nPlease select from the following options:')
+    print('r - register user')
+    print('a - add task')
+    print('va - view all tasks')
+    print('vm - view my tasks')
+    print('st - search tasks')
+    print('od - view overdue tasks')
+    print('du - view tasks due soon')
+    print('e - exit')
+
+
+def admin_menu():
+    """
+    A function that returns the menu options when the username is
+    admin.
+    """
+    print('\nPlease select from the following options:')
+    print('r - register user')
+    print('a - add task')
+    print('va - view all tasks')
+    print('vm - view my tasks')
+    print('st - search tasks')
+    print('od - view overdue tasks')
+    print('du - view tasks due soon')
+    print('ds - display statistics')
+    print('gr - generate reports')
+    print('vr - view reports')
+    print('e - exit')
+
+
+def edit_menu():
+    """
+    A function that returns this menu options when the user chooses
+    to edit a task.
+
+    returns:
+        edit(str): Returns the input from the user as a variable
+    """
+    print("e - To mark the task as complete")
+    print("a - To change who the task is assigned to")
+    edit = input("d - To edit the due date of the task: ")
+
+    return edit
+
+
+def page_menu(offset: int, next_offset: int):
+    """
+    A function that returns the options of a page of tasks.
+
+    Args:
+        offset(int): The number of tasks before the page
+        next_offset(int): The offset of the next page, or None if the
+        page is the last one
+
+    returns:
+        choice(str): Returns the input from the user as a variable
+    """
+    if next_offset is not None:
+        print("n - To view the next page")
+    if offset > 0:
+        print("p - To view the previous page")
+    print("f - To filter and sort the tasks")
+    choice = input("-1 - To go back to the previous menu: ").strip()
+
+    return choice
+
+
+def filter_menu(users: dict, ask_user: bool = True):
+    """
+    A function that asks for the filters and sort order of a view of the
+    tasks, each of which can be skipped by pressing enter.
+
+    Args:
+        users(dict): The registered users, which tasks can be filtered by
+        ask_user(bool): Whether to ask for the user to filter by
+
+    Returns:
+        filters(dict): The filters and sort order, as taken by
+        query_tasks
+    """
+    filters = {}
+    print("\nPress enter to skip a filter.")
+    search = input("Only show tasks with words starting with: ").strip()
+    if search:
+        filters["search"] = search
+    if ask_user:
+        user = input("Only show the tasks of user: ").strip().lower()
+        if user in users.keys():
+            filters["user"] = user
+        elif user:
+            print("User has not been register, showing every user.")
+    print("Only show complete (c), incomplete (i)", end=" ")
+    state = input("or overdue (o) tasks: ").strip().lower()
+    if state == "c":
+        filters["completed"] = True
+    elif state == "i":
+        filters["completed"] = False
+    elif state == "o":
+        filters["overdue"] = True
+    for key, when in (("due_from", "on or after"),
+                      ("due_to", "on or before")):
+        while True:
+            due_date = input(f"Only show tasks due {when} "
+                             "(dd mon yyyy): ").strip().title()
+            if not due_date:
+                break
+            try:
+                # date_ordinal() ensures the correct format is provided.
+                # Returns value error if wrong format provided
+                date_ordinal(due_date)
+                filters[key] = due_date
+                break
+            except ValueError:
+                print("You did not provide the correct format.\n")
+    if input("Sort by due date (y/n): ").strip().lower() == "y":
+        filters["sort_by_due"] = True
+
+    return filters
+
+
+def path_directory(filename: str):
+    """
+    A function that finds the filepath on a system depending on where
+    this file is on the system, and takes in the filename as an input,
+    to create the filepath to the file.
+
+    Args:
+        filename(str): The name of the desired .txt file as a string
+
+    Returns:
+        filepath(str): The filepath to the program and file
+    """
+    dirname = os.path.dirname((__file__))
+    file_path = os.path.join(dirname, filename)
+
+    return file_path
+
+
+def sibling_filename(filename: str, name: str):
+    """
+    A function that returns the name of a file kept in the same
+    directory as filename, such as the reports of a tasks .txt file.
+
+    Args:
+        filename(str): The name of a .txt file as a string
+        name(str): The name of the file next to it
+
+    Returns:
+        sibling(str): The name of the file, in the directory of filename
+    """
+    sibling = os.path.join(os.path.dirname(filename), name)
+
+    return sibling
+
+
+@instrumented
+def read_file(filename: str, mode: str):
+    """
+    A function that takes in a .txt file and reads and returns its
+    contents, using the read method or the read and write method,
+    depending on the mode input.
+
+    Args:
+        filename(str): The name of the desired .txt file as a string
+        mode(str): The mode which the file is read
+
+    Returns:
+        content(list): Returns the contents of a file as a nested list
+        with each new line being represented as a seperated list
+        element when "r+" mode is selected, or returns the file as
+        single string if "r" mode is selected. Error message is
+        returned if mode selected is neither "r" or "r+"
+    """
+    file_path = path_directory(filename)
+    with open(file=file_path, mode=mode, encoding="utf-8") as file:
+        if mode == "r+":
+            content = file.readlines()
+        elif mode == "r":
+            content = file.read()
+        else:
+            raise ValueError("mode needs to be 'r' or 'r+'")
+        if instrumentation.enabled:
+            instrumentation.count("bytes_read", file.tell())
+
+    return content
+
+
+@instrumented
+def user_authentication(filename: str):
+    """
+    A function that returns a dictionary of the users and their
+    passwords, from a .txt file containing the users and their passwords
+    on each line, or from the users table of the SQLite backend. The
+    dictionary is that of the UserStore of filename, so it is loaded once
+    and kept up to date as users are registered.
+
+    Args:
+        filename(str): a .txt file as a string
+
+    Returns:
+        user_password_dict(dict): a dict with the key value
+        representing the user and the value representing the
+        stored password of that user
+    """
+    user_password_dict = get_user_store(filename).users
+
+    return user_password_dict
+
+
+@instrumented
+def write_file(filename: str, mode: str, content: str):
+    """
+    A function that opens a filename an adds specified content onto
+    what is already on the .txt, or creates a new .txt file if it does
+    not exist.
+
+    Args:
+        filename(str): a .txt file of to write to
+        mode(str): the method with which the file will be written in
+        content(str): the content to write to the file.
+    """
+    file_path = path_directory(filename)
+    with open(file=file_path, mode=mode, encoding="utf-8") as file:
+        file.write(content)
+    if instrumentation.enabled:
+        instrumentation.count("bytes_written", len(content.encode("utf-8")))
+
+
+class BatchWriter:
+    """
+    A class that collects the records written to a file and writes them
+    out with a single open and a few large sequential writes, flushing
+    whenever flush_records records or flush_bytes characters are held.
+    In "w" mode the records go to a temporary file which replaces
+    filename once they have all been written, so filename is never left
+    half written; in "a" mode they are appended to filename.
+
+    Attributes:
+        filename(str): The file the records are written to
+        mode(str): "w" to replace filename or "a" to append to it
+        flush_records(int): The number of records held before a flush
+        flush_bytes(int): The number of characters held before a flush
+        fsync(str): "always" to sync to disk after every flush, "close"
+        to sync once when done or "never"
+    """
+
+    def __init__(self, filename: str, mode: str = "w",
+                 flush_records: int = None, flush_bytes: int = None,
+                 fsync: str = None):
+        self.filename = filename
+        self.mode = mode
+        self.flush_records = flush_records or WRITE_FLUSH_RECORDS
+        self.flush_bytes = flush_bytes or WRITE_FLUSH_BYTES
+        self.fsync = fsync or FSYNC_POLICY
+        self._buffer = []
+        self._size = 0
+        self._file = None
+
+    def __enter__(self):
+        file_path = path_directory(self.filename)
+        if self.mode == "w":
+            file_path = f"{file_path}.tmp"
+        self._file = open(file=file_path, mode=self.mode, encoding="utf-8")
+        return self
+
+    def write(self, record: str):
+        """
+        Adds a record to the buffer, flushing it if it is full.
+        """
+        self._buffer.append(record)
+        self._size += len(record)
+        if (len(self._buffer) >= self.flush_records
+                or self._size >= self.flush_bytes):
+            self.flush()
+
+    @instrumented
+    def flush(self):
+        """
+        Writes the buffered records to the file in a single write.
+        """
+        if self._buffer:
+            content = "".join(self._buffer)
+            self._file.write(content)
+            if instrumentation.enabled:
+                instrumentation.count("bytes_written",
+                                      len(content.encode("utf-8")))
+            self._buffer = []
+            self._size = 0
+        if self.fsync == "always":
+            self._sync()
+
+    def _sync(self):
+        """
+        Makes sure what has been written is on disk.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self._file.close()
+            if self.mode == "w":
+                os.remove(self._file.name)
+            return
+        self.flush()
+        if self.fsync == "close":
+            self._sync()
+        self._file.close()
+        if self.mode == "w":
+            os.replace(self._file.name, path_directory(self.filename))
+
+
+def new_user(filename: str, users: dict):
+    """
+    A function that allows for the admin to register a new user, if the
+    user is not on the database already.
+
+    Args:
+        filename(str): a .txt file which new user will be written into
+        users(dict): The users that are already registered
+    """
+    while True:
+        print("\nPlease provide the new username to", end=" ")
+        new_username = input("be registered: ").lower()
+        if new_username in users.keys():
+            print("User is already registered.")
+            break
+        else:
+            while True:
+                print("Please provide password for,", end=" ")
+                new_password = input(f'{new_username.title()}: ')
+                password_confirmation = input("Please confirm password: ")
+                if new_password == password_confirmation:
+                    get_user_store(filename).register(new_username,
+                                                      new_password)
+                    print(f"\n{new_username.title()} has been ", end=" ")
+                    print("successfully added to database.\n")
+                    break
+                else:
+                    print("\nPassword and confirmation", end=" ")
+                    print("password do not match.")
+            break
+
+
+def add_task(users: dict):
+    """
+    A  function that stores the inputs of a user about the tasks
+    assigned to another authorised user, and returns the input
+    information in a readable string format.
+
+    Args:
+        users(dict): The registered users, which tasks can be assigned to
+
+    Returns:
+        content(str): Returns formatted string
+    """
+    while True:
+        taskee = input("\nUsername to assign task to: ")
+        # checks using membership operator whether the taskee is in the
+        # users list of keys
+        if taskee in users.keys():
+            break
+        else:
+            print("User has not been register.", end=" ")
+            print("Please assign tasks to registered users only.\n")
+
+    while True:
+        print("Provide short description of task", end=" ")
+        task_description = input('(<255 characters): ')
+        if len(task_description) < 255:
+            break
+        else:
+            print("You have exceeded the limit,", end=" ")
+            print("please provide a shorter description", end=" ")
+            print("of less than 255 characters\n")
+
+    while True:
+        print("Due date of the task in {dd mon yyyy} format", end=" ")
+        due_date = input("(mon is months abbreviated name): ").strip().title()
+        try:
+            # date_ordinal() ensures the correct format is provided.
+            # Returns value error if wrong format provided
+            date_ordinal(due_date)
+            break
+        except ValueError:
+            print("You did not provide the correct format.\n")
+
+    task_title = input("Provide the title of the task: ")
+    content = new_task_content(taskee, task_title, task_description,
+                               due_date)
+    print(f"\nTask successfully assigned to {taskee.title()}")
+    return content
+
+
+def new_task_content(taskee: str, task_title: str, task_description: str,
+                     due_date: str):
+    """
+    A function that formats a new task, assigned today and not yet
+    complete, as the line returned by add_task.
+
+    Args:
+        taskee(str): The user the task is assigned to
+        task_title(str): The title of the task
+        task_description(str): The description of the task
+        due_date(str): The due date in {dd mon yyyy} format
+
+    Returns:
+        content(str): Returns formatted string
+    """
+    # # Use the date portion of the datetime object
+    assignment_date = dt.today().date()
+    assignment_date = dt.strftime(assignment_date, '%d %b %Y')
+    task_completion = "No"
+    content = "\n" + join_fields((taskee, task_title, task_description,
+                                  assignment_date, due_date,
+                                  task_completion))
+
+    return content
+
+
+def view_all(filename: str, filters: dict = None, offset: int = 0,
+             limit: int = None):
+    """
+    A generator that takes each task of filename that passes filters
+    and yields it in a readable format, one task at a time, so that the
+    tasks can be printed as they are formatted rather than held as one
+    string
+
+    Args:
+        filename(str): a .txt file where data will be read into from
+        filters(dict): The filters and sort order, as taken by
+        query_tasks
+        offset(int): The number of tasks before the first one yielded
+        limit(int): The most tasks to yield, or None for all of them
+
+    Yields:
+        view(str): Formatted string of a task assigned on the database
+    """
+    page, _ = query_tasks(filename, offset=offset, limit=limit,
+                          **(filters or {}))
+    yield from task_views(page)
+
+
+def view_my(filename: str, username: str, filters: dict = None,
+            offset: int = 0, limit: int = None):
+    """
+    A generator that takes each task of filename that is assigned to
+    the user that is logged in and passes filters, and yields it in a
+    readable format, one task at a time, numbered from offset on
+
+    Args:
+        filename(str): a .txt file where data will be read from
+        username(str): The user that is logged in
+        filters(dict): The filters and sort order, as taken by
+        query_tasks
+        offset(int): The number of tasks before the first one yielded
+        limit(int): The most tasks to yield, or None for all of them
+
+    Yields:
+        view(str): A formatted string of a task of the user that is
+        logged in.
+    """
+    page, _ = query_tasks(filename, username, offset=offset, limit=limit,
+                          **(filters or {}))
+    yield from task_views(page, offset + 1)
+
+
+def task_views(tasks, number: int = None):
+    """
+    A generator that yields each task in a readable format, numbered
+    from number on when it is given.
+
+    Args:
+        tasks(iterable): The Task records to format
+        number(int): The number of the first task
+
+    Yields:
+        view(str): A formatted string of a task
+    """
+    for task in tasks:
+        # Use double splat operator to pass dict values to each argument
+        view = view_format(**task.fields())
+        if number is None:
+            yield f"{'-'*165}{view}\n{'-'*165}\n"
+        else:
+            yield f"{'-'*165}\n{number}.{view}\n{'-'*165}\n"
+            number += 1
+
+
+@instrumented
+def query_tasks(filename: str, user: str = None, completed: bool = None,
+                overdue: bool = False, due_from: str = None,
+                due_to: str = None, sort_by_due: bool = False,
+                offset: int = 0, limit: int = None, search: str = None):
+    """
+    A function that returns a page of the tasks of filename that pass
+    every filter given. The tasks are found through the indexes of the
+    storage, so the tasks before the page are never formatted and, where
+    an index covers the filters, not even looked at.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        user(str): Only tasks assigned to this user
+        completed(bool): Only complete (True) or incomplete (False) tasks
+        overdue(bool): Only incomplete tasks due before today
+        due_from(str): Only tasks due on or after this {dd mon yyyy} date
+        due_to(str): Only tasks due on or before this {dd mon yyyy} date
+        sort_by_due(bool): Sort by due date rather than file order
+        offset(int): The number of tasks before the page
+        limit(int): The number of tasks on the page, or None for all of
+        the rest
+        search(str): Only tasks with a word in their title or
+        description starting with each word of search
+
+    Returns:
+        page(list): The Task records on the page
+        next_offset(int): The offset of the next page, or None if this
+        is the last page
+    """
+    words = None
+    if search:
+        words = sorted(search_words(search))
+        # A search without a single word, such as one of punctuation
+        # only, matches no task rather than every task
+        if not words:
+            return [], None
+    due_from = None if due_from is None else date_ordinal(due_from)
+    due_to = None if due_to is None else date_ordinal(due_to)
+    if overdue:
+        if completed:
+            return [], None
+        completed = False
+        yesterday = today_ordinal() - 1
+        due_to = yesterday if due_to is None else min(due_to, yesterday)
+    page, next_offset = get_storage(filename).query(
+        user, completed, due_from, due_to, sort_by_due, offset, limit, words)
+
+    return page, next_offset
+
+
+@instrumented
+def overdue_tasks(filename: str, user: str = None, offset: int = 0,
+                  limit: int = None):
+    """
+    A function that returns a page of the incomplete tasks of filename
+    that were due before today, the most overdue first. The tasks are
+    found through the due index of the incomplete tasks.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        user(str): Only tasks assigned to this user, or None for every
+        user
+        offset(int): The number of tasks before the page
+        limit(int): The number of tasks on the page, or None for all of
+        the rest
+
+    Returns:
+        page(list): The Task records on the page
+        next_offset(int): The offset of the next page, or None if this
+        is the last page
+    """
+    page, next_offset = get_storage(filename).query(
+        user, False, None, today_ordinal() - 1, True, offset, limit)
+
+    return page, next_offset
+
+
+@instrumented
+def due_soon_tasks(filename: str, days: int, user: str = None,
+                   offset: int = 0, limit: int = None):
+    """
+    A function that returns a page of the incomplete tasks of filename
+    that are due from today up to days from today, the soonest due
+    first.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        days(int): The number of days ahead to include
+        user(str): Only tasks assigned to this user, or None for every
+        user
+        offset(int): The number of tasks before the page
+        limit(int): The number of tasks on the page, or None for all of
+        the rest
+
+    Returns:
+        page(list): The Task records on the page
+        next_offset(int): The offset of the next page, or None if this
+        is the last page
+    """
+    today = today_ordinal()
+    page, next_offset = get_storage(filename).query(
+        user, False, today, today + days, True, offset, limit)
+
+    return page, next_offset
+
+
+@instrumented
+def due_counts(filename: str, days: int):
+    """
+    A function that counts the overdue tasks and the tasks due up to
+    days from today of each user, from a single range of the due index.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        days(int): The number of days ahead that count as due soon
+
+    Returns:
+        counts(dict): The number of overdue tasks and of tasks due soon
+        of each user that has either
+    """
+    today = today_ordinal()
+    tasks, _ = get_storage(filename).query(None, False, None, today + days,
+                                           True)
+    counts = {}
+    for task in tasks:
+        counts.setdefault(task.user, [0, 0])[task.due >= today] += 1
+
+    return counts
+
+
+def print_views(views):
+    """
+    A function that writes each formatted view to the screen as soon as
+    it is produced, followed by a blank line.
+
+    Args:
+        views(iterable): The formatted strings to print
+    """
+    for view in views:
+        sys.stdout.write(view)
+    print()
+
+
+def user_tasks(filename: str, username: str):
+    """
+    A function that is responsible for retrieving all the tasks
+    assigned to the user currently logged onto the system, and storing
+    the task information as a dictionary. Each task dict is then stored
+    in a list.
+
+    Args:
+        filename(str): the filename that is to be read.
+        username(str): The user that is logged in
+
+    Return:
+        user_tasks_list(list): A list of dictionaries, each
+        representing a task assigned to the user logged into the system
+    """
+    # Edits are only applied to the store once they are written through
+    # edit_overwrite
+    user_tasks_list = [task.fields() for task in
+                       get_storage(filename).user_tasks(username)]
+
+    return user_tasks_list
+
+
+def view_format(user: str, task: str, task_description: str,
+                date_assign: str, due_date: str, task_comp: str,
+                task_id: str = None):
+    """
+    A function that is responsible for returning the desired formatting
+    of the provided arguments
+
+    Args:
+        user(str): User that the task is assigned to
+        task(str): Task that is assigned to the user
+        task_description(str): Description of the task that is assigned
+        date_assign(str): Date the task is assigned on
+        due_date(str): Date the task is due on
+        task_comp(str): Whether the task is complete or not
+        task_id(str): Stable id of the task, which is not displayed
+
+    Returns:
+        view(str): Formatted string of all the provided arguments
+    """
+    view = (
+        f"\nAssigned to:\t\t {user}"
+        f"\nTask:\t\t\t{task}"
+        f"\nTask description:\t{task_description}"
+        f"\nDate assigned:\t\t{date_assign}"
+        f"\nDue date:\t\t{due_date}"
+        f"\nTask Completed?\t\t{task_comp}"
+    )
+
+    return view
+
+
+def task_dct(user: str, task: str, task_description: str,
+             date_assign: str, due_date: str, task_comp: str,
+             task_id: str):
+    """
+    A function that is responsible for returning a dictionary from the
+    provided arguments.
+
+    Args:
+        user(str): User that the task is assigned to
+        task(str): Task that is assigned to the user
+        task_description(str): Description of the task that is assigned
+        date_assign(str): Date the task is assigned on
+        due_date(str): Date the task is due on
+        task_comp(str): Whether the task is complete or not
+        task_id(str): Stable id of the task
+
+    Returns:
+        task(dict): a key:value dictionary of all the information of a
+        task
+    """
+    task = {
+        "user": user,
+        "task": task,
+        "task_description": task_description,
+        "date_assign": date_assign,
+        "due_date": due_date,
+        "task_comp": task_comp,
+        "task_id": task_id
+    }
+
+    return task
+
+
+@instrumented
+def file_overwrite(filename: str, tasks):
+    """
+    A function that is responsible for overwriting an existing filename.
+    The tasks are written through a BatchWriter, in a few large writes
+    to a temporary file which then atomically replaces filename, so that
+    the file is never left half written. The file is written in the
+    current line format, with each line after the format header starting
+    with a newline, as appended lines do, so that none are left blank.
+
+    Args:
+        filename(str): A .txt file that will be overwritten
+        tasks(iterable): The Task records of every task in the filename
+        with the changed values.
+    """
+    note_rewrite(filename)
+    with BatchWriter(filename) as writer:
+        writer.write(FORMAT_HEADER)
+        for task in tasks:
+            writer.write(f"\n{task.line()}")
+
+
+def edit_overwrite(filename: str, edit: dict, listed: dict = None,
+                   version: int = None):
+    """
+    A function that is responsible for overwriting the task dictionary
+    with the same task id as the edited task, whose values are then
+    replaced according to the keyword arguments. The text backends
+    record each changed value as an entry in the journal of filename
+    rather than rewriting the whole file. If the tasks have been written
+    since version, when the task was listed, only the values changed
+    from listed are applied, so that newer changes are kept.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        edit(dict): a dict representing a task that has been edited
+        listed(dict): a dict representing the task as it was listed
+        version(int): The version of the tasks when they were listed
+
+    Returns:
+        version(int): The version of the tasks after the edit if the
+        listing was current, or otherwise the version it was taken at,
+        so that later edits from a stale listing are still rebased
+    """
+    storage = get_storage(filename)
+    current = version is None or storage.version() == version
+    storage.edit(int(edit["task_id"]), edit, listed, version)
+    if current:
+        version = storage.version()
+
+    return version
+
+
+def append_new_task(filename: str, content: str):
+    """
+    A function that is responsible for storing a new task returned by
+    add_task in filename, giving it the next free task id.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        content(str): The task line as returned by add_task
+    """
+    get_storage(filename).add(content)
+
+
+@instrumented
+def statistics(user_filename: str, tasks_filename: str):
+    """
+    A function that summerises the total number of users and the total
+    number of tasks in the user_filename and tasks_filename, and prints
+    the information in a summerised format
+    """
+    users = user_authentication(user_filename)
+    # Counts the current total number of users in the user_filename
+    total_users = len(users.keys())
+    # Counts the current total number of tasks in the storage backend
+    total_tasks = get_storage(tasks_filename).count()
+
+    print("STATISTICS\n")
+    print(f"Total number of registered users:\t\t {total_users}")
+    print(f"Total number of tasks for all users:\t\t {total_tasks}\n")
+
+
+@instrumented
+def task_list_dct(filename: str):
+    """
+    A function that is responsible for returning each task held in the
+    task store of a file as a dictionary that is then appended to a
+    list that represents the entire content of the read file
+
+    Args:
+        filename(str): A .txt file that contains information about tasks
+        that will be read in
+
+    Returns:
+        list_dct(dict): A list containing dictionary elements which
+        represent a task.
+    """
+    list_dct = [task.fields() for task in get_storage(filename).tasks()]
+
+    return list_dct
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def date_ordinal(date_string: str):
+    """
+    A function that converts a date in the {dd mon yyyy} format used in
+    tasks.txt to its proleptic Gregorian ordinal, which can be compared
+    and stored as a plain int. The dates in tasks.txt repeat a lot, so
+    the results are memoized, and dates in the exact format are split by
+    hand rather than through the much slower strptime(), which is only
+    used for anything else and to raise the error for invalid dates.
+
+    Args:
+        date_string(str): The date as a string
+
+    Returns:
+        ordinal(int): The ordinal of the date
+
+    Raises:
+        ValueError: If date_string is not a valid {dd mon yyyy} date
+    """
+    parts = date_string.split()
+    if len(parts) == 3:
+        day, month, year = parts
+        month_number = MONTH_NUMBERS.get(month)
+        if (month_number and len(day) <= 2 and day.isdigit()
+                and len(year) == 4 and year.isdigit()):
+            try:
+                return date(int(year), month_number, int(day)).toordinal()
+            except ValueError:
+                pass
+    ordinal = dt.strptime(date_string, '%d %b %Y').date().toordinal()
+
+    return ordinal
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def date_text(ordinal: int):
+    """
+    A function that converts a date ordinal back to the {dd mon yyyy}
+    format used in tasks.txt, memoizing the results.
+
+    Args:
+        ordinal(int): The ordinal of the date
+
+    Returns:
+        text(str): The date as a string
+    """
+    day = date.fromordinal(ordinal)
+    text = f"{day.day:02d} {MONTH_NAMES[day.month - 1]} {day.year:04d}"
+
+    return text
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def stored_date(date_string: str):
+    """
+    A function that converts a date as it is written in tasks.txt to its
+    ordinal, as date_ordinal() does, and also tells whether the text is
+    the one date_text() gives back for the ordinal. Dates typed in by
+    hand, such as "5 Oct 2030", are valid but not in that form, and have
+    to be kept as they were written when the task is written out again.
+
+    Args:
+        date_string(str): The date as a string
+
+    Returns:
+        ordinal(int): The ordinal of the date
+        canonical(bool): Whether date_string is the text of the ordinal
+    """
+    ordinal = date_ordinal(date_string)
+
+    return ordinal, date_text(ordinal) == date_string
+
+
+def today_ordinal():
+    """
+    A function that returns the ordinal of today's date, which callers
+    compute once per report or edit rather than once per task.
+
+    Returns:
+        ordinal(int): The ordinal of today's date
+    """
+    ordinal = dt.today().date().toordinal()
+
+    return ordinal
+
+
+@instrumented
+def report_counters(tasks, today: int):
+    """
+    A function that is responsible for counting, in a single pass over
+    the tasks, every total that the task overview and user overview
+    reports are made from.
+
+    Args:
+        tasks(iterable): The Task records of the tasks, which may
+        be streamed from a generator
+        today(int): The ordinal of the date tasks are overdue before
+
+    Returns:
+        report(dict): The total, completed, incompleted and overdue
+        task counts, and under "users" a [total, completed, overdue]
+        list of counts for each user that has been assigned a task
+    """
+    user_counts = {}
+    total_num_tasks = 0
+    completed_tasks = 0
+    incompleted_tasks = 0
+    overdue_tasks = 0
+    for task in tasks:
+        total_num_tasks += 1
+        counts = user_counts.get(task.user)
+        if counts is None:
+            counts = user_counts[task.user] = [0, 0, 0]
+        counts[0] += 1
+        if task.complete:
+            completed_tasks += 1
+            counts[1] += 1
+        else:
+            incompleted_tasks += 1
+            if task.due < today:
+                overdue_tasks += 1
+                counts[2] += 1
+
+    report = {
+        "total": total_num_tasks,
+        "completed": completed_tasks,
+        "incompleted": incompleted_tasks,
+        "overdue": overdue_tasks,
+        "users": user_counts
+    }
+
+    return report
+
+
+@instrumented
+def task_overview(report: dict, filename: str = 'task_overview.txt'):
+    """
+    A function that is responsible for generating the task overview
+    details in a .txt file
+
+    Args:
+        report(dict): The task counts returned by report_counters
+        filename(str): The .txt file the report is written to
+
+    Returns:
+        view(str): Returns the task overview information in a desired
+        format
+    """
+    total_num_tasks = report["total"]
+    incomplete_pct = round((report["incompleted"] / total_num_tasks) * 100, 2)
+    overdue_pct = round((report["overdue"] / total_num_tasks) * 100, 2)
+
+    view = (
+        f"TASKS REPORT"
+        f"\n\nTotal tasks:                   {total_num_tasks}"
+        f"\nTotal Completed tasks:         {report['completed']}"
+        f"\nTotal Incompleted tasks:       {report['incompleted']}"
+        f"\nTotal Overdue tasks:           {report['overdue']}"
+        f"\nIncomplete tasks percent(%):   {incomplete_pct}%"
+        f"\nOverdue tasks percent(%):      {overdue_pct}%\n"
+    )
+
+    write_file(filename, 'w+', view.strip())
+
+    return view
+
+
+def user_view(user: str, counts: list, total_num_tasks: int):
+    """
+    A function that is responsible for formatting the user overview
+    section of a single user
+
+    Args:
+        user(str): The user that the section is about
+        counts(list): The [total, completed, overdue] task counts of
+        the user
+        total_num_tasks(int): The total number of tasks of all users
+
+    Returns:
+        view(str): Returns the user overview information in a desired
+        format
+    """
+    user_tasks_count, user_task_comp, overdue_tasks = counts
+    # Users without tasks report 0 rather than 0.0 percent
+    try:
+        task_overdue_pct = round((overdue_tasks / user_tasks_count)
+                                 * 100, 2)
+    except ZeroDivisionError:
+        task_overdue_pct = round(0, 2)
+    try:
+        task_comp_pct = round((user_task_comp / user_tasks_count)
+                              * 100, 2)
+    except ZeroDivisionError:
+        task_comp_pct = round(0, 2)
+    pct_of_all_tasks = round((user_tasks_count / total_num_tasks) * 100, 2)
+
+    if (task_comp_pct == float(0)) & (user_tasks_count > 0):
+        incom_pct = float(100)
+    elif (task_comp_pct == float(0)) & (user_tasks_count == 0):
+        incom_pct = float(0)
+    else:
+        # If user_task_comp is not zero, execute this block of code
+        incom_pct = round(100 - task_comp_pct, 2)
+
+    view = (
+        f"USER TASKS REPORT"
+        f"\n\nUser:                   {user}"
+        f"\nTotal tasks:            {user_tasks_count}"
+        f"\n% of all tasks:         {pct_of_all_tasks}%"
+        f"\n% of tasks completed:   {task_comp_pct}%"
+        f"\n% of tasks incomplete:  {incom_pct}%"
+        f"\n% of tasks overdue:     {task_overdue_pct}%"
+    )
+
+    return view
+
+
+@instrumented
+def user_overview(user_dct: dict, report: dict,
+                  filename: str = 'user_overview.txt'):
+    """
+    A function that is responsible for generating the user overview
+    details in a .txt file, handing the section of each user to a
+    BatchWriter as soon as it is formatted
+
+    Args:
+        user_dct(dict): The registered users, in the order they are
+        reported in
+        report(dict): The task counts returned by report_counters
+        filename(str): The .txt file the report is written to
+    """
+    total_num_tasks = report["total"]
+    with BatchWriter(filename) as writer:
+        for position, user in enumerate(user_dct.keys()):
+            if position > 0:
+                # Separate each user's section with a blank line
+                writer.write("\n\n")
+            counts = report["users"].get(user, (0, 0, 0))
+            writer.write(user_view(user, counts, total_num_tasks))
+
+
+@instrumented
+def generate_report(filename: str, users: dict, workers: int = None):
+    """
+    A function that is responsible for producing the task over view
+    report and the user over view reports from a full count of the
+    tasks, which also resets the incrementally maintained report state.
+    When workers is given and the tasks are kept in filename itself, they
+    are instead counted straight from filename by that many worker
+    processes.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        users(dict): The registered users, which are reported on
+        workers(int): The number of worker processes to count with
+    """
+    if workers is None or BACKEND not in PARALLEL_BACKENDS:
+        report = get_storage(filename).report(rebuild=True)
+    else:
+        report = parallel_report_counters(filename, workers)
+    task_overview(report, sibling_filename(filename, 'task_overview.txt'))
+    user_overview(users, report,
+                  sibling_filename(filename, 'user_overview.txt'))
+
+
+@instrumented
+def refresh_report(filename: str, users: dict):
+    """
+    A function that is responsible for producing the task over view
+    report and the user over view reports from the incrementally
+    maintained report state, without counting the tasks again. Backends
+    without a report state count the tasks again.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        users(dict): The registered users, which are reported on
+    """
+    report = get_storage(filename).report()
+    task_overview(report, sibling_filename(filename, 'task_overview.txt'))
+    user_overview(users, report,
+                  sibling_filename(filename, 'user_overview.txt'))
+
+# ------------------------------- Task-Store ------------------------------ #
+
+# The journal operations and the task field each of them sets
+JOURNAL_OPERATIONS = {
+    "complete": "task_comp",
+    "reassign": "user",
+    "due_date": "due_date",
+}
+# The journal operation that takes a task out of the tasks file, as when
+# it is moved to another shard
+JOURNAL_REMOVE = "remove"
+# Number of journal entries after which the journal is folded back into
+# the tasks file
+JOURNAL_COMPACT_THRESHOLD = 1000
+# The task index starts with the modification time and size of the tasks
+# file it was built from, followed by one (offset, length) entry per task
+# id, so the entry of a task is found at a fixed position
+TASK_INDEX_HEADER = struct.Struct("<qq")
+TASK_INDEX_ENTRY = struct.Struct("<QI")
+# The lock file of the tasks holds the number of writes made to them and
+# the number of times the tasks file has been rewritten
+TASK_COUNTERS = struct.Struct("<QQ")
+# The snapshot starts with a magic number that also records the version
+# of the line format of the tasks file it was taken from and the byte
+# order its columns were written in, the task index header of that file,
+# the number of tasks, the sizes of the user name and text blocks, the
+# number of values of the text block that are escaped and the number of
+# tasks whose dates are not written in the {dd mon yyyy} form. It is
+# followed by one array per column, of the types below, the positions of
+# the escaped values and of those tasks, and then the two blocks
+SNAPSHOT_MAGIC = b"TASKSN4" + sys.byteorder[0].encode()
+SNAPSHOT_HEADER = struct.Struct("<8s16sQQQQQ")
+SNAPSHOT_COLUMNS = "qIBii"
+SNAPSHOT_ESCAPED = "I"
+SNAPSHOT_DATED = "I"
+# The due index starts with a magic number that also records its byte
+# order, the task index header of the tasks file it was built with and
+# the number of incomplete tasks. It is followed by their due date
+# ordinals, in order, and then their positions in the tasks file
+DUE_INDEX_MAGIC = b"TASKDUE" + sys.byteorder[0].encode()
+DUE_INDEX_HEADER = struct.Struct("<8s16sQ")
+DUE_INDEX_COLUMNS = "iI"
+# Setting TASK_MANAGER_STREAMING=1 streams the tasks from the file for
+# every action instead of holding them in a TaskStore, so memory use stays
+# flat however large the tasks file grows
+STREAMING = os.environ.get("TASK_MANAGER_STREAMING") == "1"
+# Setting TASK_MANAGER_BACKEND=sqlite stores the tasks and users in an
+# SQLite database next to tasks.txt instead of the text files, and
+# TASK_MANAGER_BACKEND=sharded splits the tasks by user into shards
+BACKEND = os.environ.get("TASK_MANAGER_BACKEND", "text")
+# The backends that keep the tasks in the tasks .txt file, which is the
+# only one the worker processes of parallel_report_counters can count
+PARALLEL_BACKENDS = ("text", "streaming")
+# The number of shards the tasks are split into when the sharded layout
+# is first created, after which the number is read from its manifest
+SHARD_COUNT = int(os.environ.get("TASK_MANAGER_SHARDS", 16))
+DATABASE_NAME = "task_manager.db"
+# Number of rows inserted per statement when importing into the database
+IMPORT_BATCH_SIZE = 10_000
+# Size of the slices the mapped tasks file is counted in by scan_count
+SCAN_CHUNK_SIZE = 1 << 20
+# An empty line or one of blank space only, which the parsers skip, so
+# the slices that hold one are counted line by line
+SCAN_BLANK_LINE = re.compile(rb"\n[ \t\r\f\v]*(?:\n|[ \t\r\f\v]\Z)")
+# Setting TASK_MANAGER_WORKERS to more than 1 counts the reports in that
+# many worker processes, each given a part of the tasks file of at least
+# PARALLEL_MIN_CHUNK_SIZE bytes
+REPORT_WORKERS = int(os.environ.get("TASK_MANAGER_WORKERS", 1))
+PARALLEL_MIN_CHUNK_SIZE = 1 << 16
+# A tasks file starts with a header line that names the version of its
+# line format. The fields of each line are joined by ", ", with every
+# backslash, comma and line break in a value escaped by a backslash, so
+# that a value can hold any text. Files without the header are in the
+# legacy format, with the values joined as they are, and are rewritten
+# in the current format when they are next loaded or appended to
+FORMAT_VERSION = 2
+FORMAT_HEADER = f"#task_manager tasks v{FORMAT_VERSION}"
+FIELD_ESCAPES = str.maketrans({"\\": "\\\\", ",": "\\,", "\n": "\\n",
+                               "\r": "\\r"})
+FIELD_UNESCAPES = {"\\": "\\", ",": ",", "n": "\n", "r": "\r"}
+FIELD_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+# The fields of a line of the tasks file, in order, and the Task attribute
+# each of them is stored in
+TASK_ATTRIBUTES = {
+    "user": "user",
+    "task": "task",
+    "task_description": "task_description",
+    "date_assign": "date_assign",
+    "due_date": "due",
+    "task_comp": "complete",
+    "task_id": "task_id",
+}
+# The formats that tasks and users are imported from and exported to, by
+# the extension of the file, and the fields of a task and of a user in
+# them. The id of an imported task is given by the storage
+RECORD_FORMATS = {".txt": "txt", ".csv": "csv", ".jsonl": "jsonl",
+                  ".ndjson": "jsonl"}
+TASK_RECORD_FIELDS = tuple(TASK_ATTRIBUTES)[:-1]
+USER_RECORD_FIELDS = ("username", "password")
+
+
+class Task:
+    """
+    A class that holds a single task in a compact form. The attributes
+    are stored in slots rather than a per-task dict, the user name is
+    interned so that all of a user's tasks share one string, the
+    completion state is a bool and the dates are int ordinals.
+
+    Attributes:
+        task_id(int): Stable id of the task
+        user(str): User that the task is assigned to
+        task(str): Task that is assigned to the user
+        task_description(str): Description of the task that is assigned
+        date_assign(int): Ordinal of the date the task is assigned on
+        due(int): Ordinal of the date the task is due on
+        complete(bool): Whether the task is complete or not
+        date_texts(tuple): The date_assign and due_date fields as they
+        were written, each None if it is the text of its ordinal, or
+        None if both are
+    """
+
+    __slots__ = ("task_id", "user", "task", "task_description",
+                 "date_assign", "due", "complete", "date_texts")
+
+    def __init__(self, task_id: int, user: str, task: str,
+                 task_description: str, date_assign: int, due: int,
+                 complete: bool):
+        self.task_id = task_id
+        self.user = sys.intern(user)
+        self.task = task
+        self.task_description = task_description
+        self.date_assign = date_assign
+        self.due = due
+        self.complete = complete
+        self.date_texts = None
+
+    @classmethod
+    def from_fields(cls, user: str, task: str, task_description: str,
+                    date_assign: str, due_date: str, task_comp: str,
+                    task_id: str):
+        """
+        Creates a Task from the string fields of a line of the tasks file,
+        in the order they are stored in.
+        """
+        assign, assign_canonical = stored_date(date_assign)
+        due, due_canonical = stored_date(due_date)
+        task = cls(int(task_id), user, task, task_description, assign, due,
+                   task_comp == "Yes")
+        if not (assign_canonical and due_canonical):
+            task.date_texts = (None if assign_canonical else date_assign,
+                               None if due_canonical else due_date)
+        return task
+
+    def get_field(self, key: str):
+        """
+        Returns the value of the field key as it is written in the tasks
+        file.
+        """
+        if key in ("date_assign", "due_date"):
+            due = key == "due_date"
+            if self.date_texts is not None and self.date_texts[due]:
+                return self.date_texts[due]
+            return date_text(self.due if due else self.date_assign)
+        if key == "task_comp":
+            return "Yes" if self.complete else "No"
+        return str(getattr(self, key))
+
+    def set_field(self, key: str, value: str):
+        """
+        Sets the field key from a value as it is written in the tasks
+        file.
+        """
+        if key == "user":
+            self.user = sys.intern(value)
+        elif key in ("date_assign", "due_date"):
+            self.set_date(key == "due_date", value)
+        elif key == "task_comp":
+            self.complete = value == "Yes"
+        elif key == "task_id":
+            self.task_id = int(value)
+        else:
+            setattr(self, key, value)
+
+    def set_date(self, due: bool, value: str):
+        """
+        Sets the assigned date, or the due date if due is set, from its
+        text, keeping the text if it is not the one of the ordinal.
+        """
+        ordinal, canonical = stored_date(value)
+        if due:
+            self.due = ordinal
+        else:
+            self.date_assign = ordinal
+        texts = list(self.date_texts or (None, None))
+        texts[due] = None if canonical else value
+        self.date_texts = None if texts == [None, None] else tuple(texts)
+
+    def differs(self, key: str, value: str):
+        """
+        Returns whether value, as it is written in the tasks file, differs
+        from the current value of the field key.
+        """
+        return self.get_field(key) != value
+
+    def copy(self):
+        """
+        Returns a copy of the task.
+        """
+        task = Task(self.task_id, self.user, self.task,
+                    self.task_description, self.date_assign, self.due,
+                    self.complete)
+        task.date_texts = self.date_texts
+        return task
+
+    def fields(self):
+        """
+        Returns the task as the dictionary returned by task_dct, with
+        every value as it is written in the tasks file.
+        """
+        return task_dct(*(self.get_field(key) for key in TASK_ATTRIBUTES))
+
+    def line(self):
+        """
+        Returns the task as a line of the tasks file, without the newline.
+        """
+        return join_fields(self.get_field(key) for key in TASK_ATTRIBUTES)
+
+
+def escape_field(value: str):
+    """
+    A function that escapes the backslashes, commas and line breaks of a
+    value, so that it can be written as a field of the tasks file.
+
+    Args:
+        value(str): The value of the field
+
+    Returns:
+        field(str): The value as it is written in the tasks file
+    """
+    if not ("\\" in value or "," in value or "\n" in value
+            or "\r" in value):
+        return value
+    field = value.translate(FIELD_ESCAPES)
+
+    return field
+
+
+def unescape_field(field: str):
+    """
+    A function that undoes escape_field, turning a field as it is written
+    in the tasks file back into its value.
+
+    Args:
+        field(str): The field as it is written in the tasks file
+
+    Returns:
+        value(str): The value of the field
+    """
+    value = FIELD_ESCAPE.sub(
+        lambda match: FIELD_UNESCAPES.get(match[1], match[0]), field)
+
+    return value
+
+
+def join_fields(values):
+    """
+    A function that joins values into a line of the tasks file, without
+    the newline.
+
+    Args:
+        values(iterable): The value of each field, in order
+
+    Returns:
+        line(str): The escaped values, joined by ", "
+    """
+    line = ", ".join(map(escape_field, values))
+
+    return line
+
+
+def split_fields(line: str):
+    """
+    A function that splits a line of the tasks file into the values of
+    its fields. A line without a backslash holds no escaped value, so it
+    is split as it is, as fast as a line of the legacy format.
+
+    Args:
+        line(str): A line of the tasks file, without the newline
+
+    Returns:
+        values(list): The value of each field, in order
+    """
+    pieces = line.split(", ")
+    if "\\" not in line:
+        return pieces
+    values = []
+    run_on = False
+    for piece in pieces:
+        if run_on:
+            values[-1] += f", {piece}"
+        else:
+            values.append(piece)
+        # A piece that ends in an odd number of backslashes ends in an
+        # escaped comma, so the value runs on into the next piece
+        run_on = (len(piece) - len(piece.rstrip("\\"))) % 2 == 1
+    values = [unescape_field(value) if "\\" in value else value
+              for value in values]
+
+    return values
+
+
+def has_format_header(start: bytes):
+    """
+    A function that tells whether the first bytes of a tasks file are
+    the header line of the current line format.
+
+    Args:
+        start(bytes): At least the first len(FORMAT_HEADER) + 1 bytes of
+        the file, or all of it if it is shorter. The header is ASCII, so
+        its length in bytes is that in characters
+
+    Returns:
+        current(bool): Whether the file starts with FORMAT_HEADER
+    """
+    header = FORMAT_HEADER.encode("utf-8")
+    current = (start.startswith(header)
+               and start[len(header):len(header) + 1] in (b"", b"\n",
+                                                          b"\r"))
+
+    return current
+
+
+def legacy_format(filename: str):
+    """
+    A function that tells whether the tasks file is in the legacy line
+    format, in which the values are joined as they are. Empty and
+    missing files hold no lines, so they are in neither format.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        legacy(bool): Whether filename has lines but no format header
+    """
+    try:
+        with open(path_directory(filename), mode="rb") as file:
+            start = file.read(len(FORMAT_HEADER) + 1)
+    except FileNotFoundError:
+        return False
+    legacy = bool(start) and not has_format_header(start)
+
+    return legacy
+
+
+def journal_filename(filename: str):
+    """
+    A function that returns the name of the journal file which records
+    the edits made to the tasks in filename.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        journal(str): The name of the journal file, e.g.
+        tasks_journal.txt for tasks.txt
+    """
+    root, extension = os.path.splitext(filename)
+    journal = f"{root}_journal{extension or '.txt'}"
+
+    return journal
+
+
+def index_filename(filename: str):
+    """
+    A function that returns the name of the sidecar file which indexes
+    the byte offset and length of each task in filename by its id.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        index(str): The name of the index file, e.g. tasks_index.bin
+        for tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    index = f"{root}_index.bin"
+
+    return index
+
+
+# The task locks held by each thread, by lock file path
+held_locks = threading.local()
+
+
+def lock_filename(filename: str):
+    """
+    A function that returns the name of the lock file of the tasks in
+    filename, which is locked by every process that reads or writes them
+    and holds their version counter.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        lock(str): The name of the lock file, e.g. tasks.lock for
+        tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    lock = f"{root}.lock"
+
+    return lock
+
+
+@contextmanager
+def task_lock(filename: str, exclusive: bool = False):
+    """
+    A context manager that holds an advisory lock on the tasks in
+    filename: shared while they are read, so that a writer cannot swap
+    the file and its journal halfway through, and exclusive while they
+    are written. Locks already held by the thread are re-entered rather
+    than taken again. Releasing an exclusive lock adds one to the
+    version counter of the tasks if they were written under it, as
+    recorded by note_write, and one to the rewrite counter if the tasks
+    file was rewritten rather than appended to, as recorded by
+    note_rewrite. Without fcntl, as on Windows, only the counters are
+    kept.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        exclusive(bool): Whether the tasks are going to be written
+
+    Yields:
+        file(file): The open lock file
+    """
+    lock_path = path_directory(lock_filename(filename))
+    held = getattr(held_locks, "files", None)
+    if held is None:
+        held = held_locks.files = {}
+    if lock_path in held:
+        if exclusive and not held[lock_path]["exclusive"]:
+            raise RuntimeError("A shared task lock cannot be made exclusive")
+        yield held[lock_path]["file"]
+        return
+    file = os.fdopen(os.open(lock_path, os.O_RDWR | os.O_CREAT), "r+b")
+    held[lock_path] = {"file": file, "exclusive": exclusive,
+                       "written": False, "rewritten": False}
+    try:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield file
+    finally:
+        lock = held[lock_path]
+        if lock["written"] or lock["rewritten"]:
+            # Count the write, even one cut short, before unlocking
+            version, rewrites = read_counters(file)
+            file.seek(0)
+            file.write(TASK_COUNTERS.pack(version + lock["written"],
+                                          rewrites + lock["rewritten"]))
+            file.flush()
+        del held[lock_path]
+        # Closing the file releases the lock
+        file.close()
+
+
+def held_lock(filename: str):
+    """
+    A function that returns the state of the lock on the tasks in
+    filename held by the thread.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        lock(dict): The open lock file, whether the lock is exclusive and
+        whether the tasks have been written and the tasks file rewritten
+        under it, or None if the thread does not hold the lock
+    """
+    held = getattr(held_locks, "files", {})
+    lock = held.get(path_directory(lock_filename(filename)))
+
+    return lock
+
+
+def note_write(filename: str):
+    """
+    A function that records that the tasks are being changed under the
+    exclusive lock held by the thread, so that edits made from listings
+    taken before are rebased.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+    """
+    lock = held_lock(filename)
+    if lock is not None and lock["exclusive"]:
+        lock["written"] = True
+
+
+def note_rewrite(filename: str):
+    """
+    A function that records that the tasks file is being rewritten
+    under the exclusive lock held by the thread, so that other processes
+    load it again in full rather than reading what was appended. A
+    rewrite that leaves the tasks as they were, as a compaction or a
+    migration does, is not counted as a write of the tasks.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+    """
+    lock = held_lock(filename)
+    if lock is not None and lock["exclusive"]:
+        lock["rewritten"] = True
+
+
+def read_counters(file):
+    """
+    A function that reads the counters of the tasks from their open
+    lock file.
+
+    Args:
+        file(file): The lock file, as yielded by task_lock
+
+    Returns:
+        counters(tuple): The number of writes made to the tasks, and the
+        number of times the tasks file has been rewritten
+    """
+    file.seek(0)
+    content = file.read(TASK_COUNTERS.size)
+    counters = (TASK_COUNTERS.unpack(content)
+                if len(content) == TASK_COUNTERS.size else (0, 0))
+
+    return counters
+
+
+def task_counters(filename: str):
+    """
+    A function that returns the counters of the tasks in filename,
+    including the write and the rewrite made under the lock held by the
+    thread, which are only added to the lock file once it is released.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        counters(tuple): The number of writes made to the tasks, and the
+        number of times the tasks file has been rewritten
+    """
+    with task_lock(filename) as file:
+        version, rewrites = read_counters(file)
+        lock = held_lock(filename)
+        counters = (version + lock["written"], rewrites + lock["rewritten"])
+
+    return counters
+
+
+def task_version(filename: str):
+    """
+    A function that returns the version counter of the tasks in
+    filename, which changes whenever they are written.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        version(int): The number of writes made to the tasks
+    """
+    version = task_counters(filename)[0]
+
+    return version
+
+
+def rebased_edit(task: Task, edit: dict, listed: dict):
+    """
+    A function that works out the edit to make to a task that may have
+    been changed since it was listed. Only the values the user changed
+    from the listing are applied, so newer changes to the other values
+    are not overwritten with the listed ones.
+
+    Args:
+        task(Task): The task as it currently is
+        edit(dict): a dict representing the edited task
+        listed(dict): a dict representing the task as it was listed
+
+    Returns:
+        edit(dict): a dict representing the current task with the
+        user's changes applied
+    """
+    rebased = task.fields()
+    rebased.update((key, value) for key, value in edit.items()
+                   if listed.get(key) != value)
+
+    return rebased
+
+
+def file_header(filename: str):
+    """
+    A function that returns the task index header describing the current
+    state of filename.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        header(bytes): The packed modification time and size of filename
+    """
+    stat = os.stat(path_directory(filename))
+    header = TASK_INDEX_HEADER.pack(stat.st_mtime_ns, stat.st_size)
+
+    return header
+
+
+@instrumented
+def build_task_index(filename: str):
+    """
+    A function that scans filename once and writes its task index, with
+    the entry of each task stored at the position of its id.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+    """
+    entries = {}
+    offset = 0
+    format_header = FORMAT_HEADER.encode("utf-8")
+    with open(path_directory(filename), mode="rb") as file:
+        for line in file:
+            record = line.strip()
+            if record and record != format_header:
+                last_field = record.rpartition(b", ")[2]
+                # The id is the last field of the record, which is never
+                # escaped, and tasks without an id, which end in their
+                # completion instead, take their position as id
+                task_id = (int(last_field) if last_field.isdigit()
+                           else len(entries))
+                entries[task_id] = (offset, len(record))
+            offset += len(line)
+    content = bytearray(file_header(filename))
+    for task_id in range(max(entries, default=-1) + 1):
+        content += TASK_INDEX_ENTRY.pack(*entries.get(task_id, (0, 0)))
+    with open(path_directory(index_filename(filename)), mode="wb") as index:
+        index.write(content)
+
+
+def snapshot_filename(filename: str):
+    """
+    A function that returns the name of the binary snapshot file of the
+    tasks in filename.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        snapshot(str): The name of the snapshot file, e.g.
+        tasks_snapshot.bin for tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    snapshot = f"{root}_snapshot.bin"
+
+    return snapshot
+
+
+@instrumented
+def write_snapshot(filename: str, tasks: list, header: bytes):
+    """
+    A function that writes the tasks of filename to its snapshot as
+    columns: the task ids, the user of each task as a number in a table
+    of user names, the completion flags and the date ordinals are stored
+    as fixed width arrays, followed by the user names and then the titles
+    and descriptions as blocks of text, with the values in each block
+    separated by newlines. A user name cannot hold a newline, but a title
+    or description can, so those that do are escaped as in the tasks file
+    and their positions in the block are recorded. The few tasks whose
+    dates are not written as date_text() gives them are recorded by
+    position, with their two date fields at the end of the text block,
+    left empty where the date is. The snapshot is written to a temporary
+    file which then replaces the old one.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        tasks(list): The Task records of every task in filename
+        header(bytes): The task index header of filename as it was when
+        the tasks were read
+    """
+    user_numbers = {}
+    columns = [array(typecode) for typecode in SNAPSHOT_COLUMNS]
+    task_ids, users, complete, date_assign, due = columns
+    text = []
+    for task in tasks:
+        task_ids.append(task.task_id)
+        users.append(user_numbers.setdefault(task.user, len(user_numbers)))
+        complete.append(task.complete)
+        date_assign.append(task.date_assign)
+        due.append(task.due)
+        text.append(task.task)
+        text.append(task.task_description)
+    dated = array(SNAPSHOT_DATED)
+    for position, task in enumerate(tasks):
+        if task.date_texts is not None:
+            dated.append(position)
+            text.extend(date or "" for date in task.date_texts)
+    text_block = "\n".join(text)
+    escaped = array(SNAPSHOT_ESCAPED)
+    # The values hold newlines of their own only if the block has more
+    # newlines than separators
+    if text_block.count("\n") >= len(text):
+        escaped.extend(position for position, value in enumerate(text)
+                       if "\n" in value)
+        for position in escaped:
+            text[position] = escape_field(text[position])
+        text_block = "\n".join(text)
+    user_block = "\n".join(user_numbers).encode("utf-8")
+    text_block = text_block.encode("utf-8")
+    file_path = path_directory(snapshot_filename(filename))
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, mode="wb") as file:
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, header, len(tasks),
+                                        len(user_block), len(text_block),
+                                        len(escaped), len(dated)))
+        for column in columns:
+            file.write(column.tobytes())
+        file.write(escaped.tobytes())
+        file.write(dated.tobytes())
+        file.write(user_block)
+        file.write(text_block)
+        instrumentation.count("bytes_written", file.tell())
+    os.replace(temp_path, file_path)
+
+
+@instrumented
+def read_snapshot(filename: str):
+    """
+    A function that reads the tasks of filename from its snapshot with
+    a single read, if the snapshot describes filename as it currently
+    is.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        tasks(list): The Task records of every task in filename, or None
+        if there is no snapshot of the current file
+    """
+    try:
+        with open(path_directory(snapshot_filename(filename)),
+                  mode="rb") as file:
+            content = memoryview(file.read())
+    except FileNotFoundError:
+        return None
+    instrumentation.count("bytes_read", len(content))
+    if len(content) < SNAPSHOT_HEADER.size:
+        return None
+    magic, header, task_count, user_size, text_size, escaped_count, \
+        dated_count = SNAPSHOT_HEADER.unpack_from(content)
+    if magic != SNAPSHOT_MAGIC or header != file_header(filename):
+        return None
+    offset = SNAPSHOT_HEADER.size
+    columns = []
+    for typecode in SNAPSHOT_COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * task_count
+        column.frombytes(content[offset:offset + size])
+        columns.append(column)
+        offset += size
+    task_ids, users, complete, date_assign, due = columns
+    escaped = array(SNAPSHOT_ESCAPED)
+    size = escaped.itemsize * escaped_count
+    escaped.frombytes(content[offset:offset + size])
+    offset += size
+    dated = array(SNAPSHOT_DATED)
+    size = dated.itemsize * dated_count
+    dated.frombytes(content[offset:offset + size])
+    offset += size
+    names = str(content[offset:offset + user_size], "utf-8").split("\n")
+    offset += user_size
+    text = str(content[offset:offset + text_size], "utf-8").split("\n")
+    for position in escaped:
+        text[position] = unescape_field(text[position])
+    if not task_count:
+        return []
+    end = 2 * task_count
+    tasks = list(map(Task, task_ids, map(names.__getitem__, users),
+                     text[0:end:2], text[1:end:2], date_assign, due,
+                     map(bool, complete)))
+    for position, assign_text, due_text in zip(dated, text[end::2],
+                                               text[end + 1::2]):
+        tasks[position].date_texts = (assign_text or None, due_text or None)
+
+    return tasks
+
+
+def due_index_filename(filename: str):
+    """
+    A function that returns the name of the file that the due index of
+    the incomplete tasks in filename is kept in.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        due_index(str): The name of the due index file, e.g.
+        tasks_due_index.bin for tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    due_index = f"{root}_due_index.bin"
+
+    return due_index
+
+
+@instrumented
+def write_due_index(filename: str, dues: array, positions: array,
+                    header: bytes):
+    """
+    A function that writes the due index of filename, alongside its
+    snapshot, so that the next load does not have to sort the incomplete
+    tasks again. The index is written to a temporary file which then
+    replaces the old one.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        dues(array): The due date ordinals of the incomplete tasks, in
+        order
+        positions(array): The position of each of those tasks in the
+        tasks file
+        header(bytes): The task index header of filename that the
+        snapshot was written with
+    """
+    file_path = path_directory(due_index_filename(filename))
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, mode="wb") as file:
+        file.write(DUE_INDEX_HEADER.pack(DUE_INDEX_MAGIC, header, len(dues)))
+        file.write(dues.tobytes())
+        file.write(positions.tobytes())
+    os.replace(temp_path, file_path)
+
+
+@instrumented
+def read_due_index(filename: str, header: bytes):
+    """
+    A function that reads the due index of filename, if it was written
+    with the snapshot that the tasks were read from.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        header(bytes): The task index header of filename as it currently
+        is
+
+    Returns:
+        columns(tuple): The due date ordinals and positions of the
+        incomplete tasks, or None if there is no index of the current
+        file
+    """
+    try:
+        with open(path_directory(due_index_filename(filename)),
+                  mode="rb") as file:
+            content = file.read()
+    except FileNotFoundError:
+        return None
+    if len(content) < DUE_INDEX_HEADER.size:
+        return None
+    magic, index_header, count = DUE_INDEX_HEADER.unpack_from(content)
+    if magic != DUE_INDEX_MAGIC or index_header != header:
+        return None
+    offset = DUE_INDEX_HEADER.size
+    columns = []
+    for typecode in DUE_INDEX_COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * count
+        column.frombytes(content[offset:offset + size])
+        columns.append(column)
+        offset += size
+    instrumentation.count("bytes_read", len(content))
+
+    return tuple(columns)
+
+
+def append_task_index(filename: str, task_id: int, entries: bytes,
+                      header: bytes):
+    """
+    A function that adds the entries of tasks appended to filename to
+    its task index. The index is rebuilt instead if it did not describe
+    the file as it was before the tasks were appended.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        task_id(int): The id of the first appended task, the others
+        having the ids that follow it
+        entries(bytes): The packed (offset, length) entry of each task
+        header(bytes): The task index header of filename before the
+        tasks were appended
+    """
+    index_path = path_directory(index_filename(filename))
+    try:
+        with open(index_path, mode="r+b") as index:
+            if index.read(TASK_INDEX_HEADER.size) == header:
+                index.seek(TASK_INDEX_HEADER.size
+                           + task_id * TASK_INDEX_ENTRY.size)
+                index.write(entries)
+                index.seek(0)
+                index.write(file_header(filename))
+                return
+    except FileNotFoundError:
+        pass
+    build_task_index(filename)
+
+
+def read_task(filename: str, task_id: int):
+    """
+    A function that reads a single task from filename by its id, using
+    the task index to seek straight to the record, and applies any edits
+    of that task recorded in the journal.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        task_id(int): The id of the task to read
+
+    Returns:
+        task(Task): The record of the task
+    """
+    index_path = task_index_path(filename)
+    with open(index_path, mode="rb") as index:
+        index.seek(TASK_INDEX_HEADER.size + task_id * TASK_INDEX_ENTRY.size)
+        entry = index.read(TASK_INDEX_ENTRY.size)
+    offset, length = (TASK_INDEX_ENTRY.unpack(entry)
+                      if len(entry) == TASK_INDEX_ENTRY.size else (0, 0))
+    if length == 0:
+        raise KeyError(f"Task {task_id} is not in {filename}")
+    with open(path_directory(filename), mode="rb") as file:
+        escaped = has_format_header(file.read(len(FORMAT_HEADER) + 1))
+        file.seek(offset)
+        record = file.read(length).decode("utf-8")
+    task = parse_task(record, task_id, escaped)
+    for edit_id, key, value in read_journal(filename):
+        if edit_id == task_id:
+            if key is None:
+                raise KeyError(f"Task {task_id} is not in {filename}")
+            task.set_field(key, value)
+
+    return task
+
+
+def task_index_path(filename: str):
+    """
+    A function that returns the path of the task index of filename,
+    building the index first if it is missing or out of date.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        index_path(str): The filepath to the task index
+    """
+    index_path = path_directory(index_filename(filename))
+    try:
+        with open(index_path, mode="rb") as index:
+            stale = (index.read(TASK_INDEX_HEADER.size)
+                     != file_header(filename))
+    except FileNotFoundError:
+        stale = True
+    if stale:
+        build_task_index(filename)
+
+    return index_path
+
+
+def next_task_id(filename: str):
+    """
+    A function that returns the id to give the next task appended to
+    filename, which is worked out from the number of entries in its task
+    index rather than by reading the tasks.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        task_id(int): The next free task id
+    """
+    index_size = os.path.getsize(task_index_path(filename))
+    task_id = (index_size - TASK_INDEX_HEADER.size) // TASK_INDEX_ENTRY.size
+
+    return task_id
+
+
+def legacy_fields(line: str):
+    """
+    A function that splits a line of the legacy line format, in which
+    commas are not escaped, into the values of its fields. The user,
+    title, dates and completion hold no ", ", so when a line splits into
+    more pieces than it has fields the extra pieces belong to the
+    description and are joined back into it.
+
+    Args:
+        line(str): A line of the tasks file, without the newline
+
+    Returns:
+        fields(list): The value of each field, in order, with the id as
+        the last one if the line has one
+    """
+    fields = line.split(", ")
+    # The last field is the id, or the completion if the line has no id
+    end = len(fields) - fields[-1].isdigit()
+    if end > 6:
+        fields[2:end - 3] = [", ".join(fields[2:end - 3])]
+
+    return fields
+
+
+def parse_task(line: str, position: int, escaped: bool = True):
+    """
+    A function that parses one line of a tasks .txt file into a task
+    dictionary. Lines written before tasks had ids take their position
+    in the file as their id.
+
+    Args:
+        line(str): A line of the tasks file
+        position(int): The number of tasks before the line in the file
+        escaped(bool): Whether the file is in the current line format,
+        rather than the legacy one in which backslashes are not escapes
+
+    Returns:
+        task(Task): The task of the line, or None if the line is blank
+        or the format header
+    """
+    line_content = line.strip()
+    # Skip blank lines left between appended and rewritten tasks
+    if not line_content or line_content == FORMAT_HEADER:
+        return None
+    if not escaped:
+        fields = legacy_fields(line_content)
+    elif "\\" in line_content:
+        fields = split_fields(line_content)
+    else:
+        # Lines without a backslash are split in place, as split_fields
+        # would, to save a call for each line
+        fields = line_content.split(", ")
+    if len(fields) == 6:
+        fields.append(position)
+    task = Task.from_fields(*fields)
+
+    return task
+
+
+def read_journal(filename: str, offset: int = 0):
+    """
+    A generator that yields each edit recorded in the journal of the
+    tasks in filename, in the order they were made.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        offset(int): The byte offset of the first entry to read
+
+    Yields:
+        edit(tuple): The task id, the task field and its new value, or
+        None for both if the task was removed
+    """
+    try:
+        file = open(path_directory(journal_filename(filename)),
+                    encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with file:
+        file.seek(offset)
+        for line in file:
+            line_content = line.strip()
+            if line_content:
+                # A journal written before values were escaped splits into
+                # more fields when a value holds ", "
+                operation, task_id, *value = split_fields(line_content)
+                if operation == JOURNAL_REMOVE:
+                    yield int(task_id), None, None
+                else:
+                    yield (int(task_id), JOURNAL_OPERATIONS[operation],
+                           ", ".join(value))
+
+
+def iter_tasks(filename: str):
+    """
+    A generator that streams the tasks of filename one line at a time,
+    with the edits recorded in its journal applied, so that the memory
+    used does not grow with the size of the file.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Yields:
+        task(Task): The record of a task
+    """
+    # The journal is small, so its edits are gathered up front
+    edits = {}
+    for task_id, key, value in read_journal(filename):
+        edits.setdefault(task_id, {})[key] = value
+    position = 0
+    with open(path_directory(filename), encoding="utf-8") as file:
+        escaped = file.readline().strip() == FORMAT_HEADER
+        file.seek(0)
+        for line in file:
+            task = parse_task(line, position, escaped)
+            if task is not None:
+                position += 1
+                changes = edits.get(task.task_id)
+                if changes is not None:
+                    # Skip the tasks that have been removed
+                    if None in changes:
+                        continue
+                    for key, value in changes.items():
+                        task.set_field(key, value)
+                yield task
+
+
+def map_tasks(filename: str):
+    """
+    A function that maps filename into memory read-only, so that it can
+    be scanned as raw bytes without reading it into a list of lines.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        buffer(mmap.mmap): The mapped file, or None if the file is empty
+    """
+    with open(path_directory(filename), mode="rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        # The mapping stays valid after the file is closed
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def scan_chunks(buffer: mmap.mmap):
+    """
+    A generator that yields the mapped file in slices of SCAN_CHUNK_SIZE
+    bytes that end on a newline, so no line is split between slices and
+    only one slice is copied out of the mapping at a time.
+
+    Args:
+        buffer(mmap.mmap): The mapped tasks file
+
+    Yields:
+        chunk(bytes): The next whole lines of the file
+    """
+    start = 0
+    size = len(buffer)
+    while start < size:
+        end = buffer.rfind(b"\n", start, start + SCAN_CHUNK_SIZE) + 1
+        if end <= start or start + SCAN_CHUNK_SIZE >= size:
+            # The rest of the file, or a line longer than a slice
+            end = buffer.find(b"\n", start + SCAN_CHUNK_SIZE) + 1 or size
+        yield buffer[start:end]
+        start = end
+
+
+@instrumented
+def scan_count(filename: str):
+    """
+    A function that counts the tasks of filename by counting the
+    newlines of the mapped file, one memchr pass per slice, without
+    decoding or splitting any line. Slices with blank lines in them are
+    counted line by line instead, and the format header is not counted.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        total_tasks(int): The number of tasks in filename
+    """
+    buffer = map_tasks(filename)
+    if buffer is None:
+        return 0
+    total_tasks = 0
+    with buffer:
+        for chunk in scan_chunks(buffer):
+            if chunk[:1].isspace() or SCAN_BLANK_LINE.search(chunk):
+                total_tasks += sum(1 for line in chunk.split(b"\n")
+                                   if line.strip())
+            else:
+                total_tasks += chunk.count(b"\n")
+                if not chunk.endswith(b"\n"):
+                    # The last line of the file has no newline
+                    total_tasks += 1
+        if has_format_header(buffer[:len(FORMAT_HEADER) + 1]):
+            total_tasks -= 1
+
+    return total_tasks
+
+
+@instrumented
+def scan_user_tasks(filename: str, user: str):
+    """
+    A function that finds the tasks of user by searching the mapped
+    file for lines that start with the "user, " prefix, so that only the
+    lines of user are decoded and parsed. Tasks reassigned to user in the
+    journal are read through the task index and merged in by id.
+
+    Files that still hold tasks without ids are streamed in full instead,
+    as those tasks take their position in the file as their id.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        user(str): The user whose tasks are yielded
+
+    Returns:
+        tasks(list): The Task records of user, in file order
+    """
+    edits = {}
+    for task_id, key, value in read_journal(filename):
+        edits.setdefault(task_id, {})[key] = value
+    reassigned = {task_id for task_id, changes in edits.items()
+                  if changes.get("user") == user and None not in changes}
+    buffer = map_tasks(filename)
+    if buffer is None:
+        return []
+    with buffer:
+        # Skip any blank lines before the first task
+        start = 0
+        while start < len(buffer) and buffer[start:start + 1].isspace():
+            start += 1
+        end = buffer.find(b"\n", start)
+        first_line = buffer[start:end if end != -1 else len(buffer)]
+        escaped = has_format_header(first_line)
+        if (not escaped
+                and not first_line.rpartition(b", ")[2].strip().isdigit()):
+            legacy = True
+        else:
+            legacy = False
+            moved = [read_task(filename, task_id)
+                     for task_id in sorted(reassigned)]
+            matched = []
+            name = escape_field(user) if escaped else user
+            prefix = f"{name}, ".encode("utf-8")
+            line_prefix = b"\n" + prefix
+            start = 0
+            found = buffer[:len(prefix)] == prefix
+            if not found:
+                start = buffer.find(line_prefix) + 1
+                found = start > 0
+            while found:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    end = len(buffer)
+                task = parse_task(buffer[start:end].decode("utf-8"), 0,
+                                  escaped)
+                changes = edits.get(task.task_id, {})
+                # Skip the tasks that have been removed
+                if task.task_id not in reassigned and None not in changes:
+                    for key, value in changes.items():
+                        task.set_field(key, value)
+                    if task.user == user:
+                        matched.append(task)
+                start = buffer.find(line_prefix, end) + 1
+                found = start > 0
+    if legacy:
+        return [task for task in iter_tasks(filename) if task.user == user]
+
+    return list(heapq.merge(matched, moved, key=lambda task: task.task_id))
+
+
+def chunk_ranges(filename: str, chunks: int):
+    """
+    A function that splits filename into at most chunks byte ranges of
+    about the same size, each of which starts and ends on a line
+    boundary.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        chunks(int): The number of ranges to split the file into
+
+    Returns:
+        ranges(list): The (start, end) byte offsets of each range
+    """
+    file_path = path_directory(filename)
+    size = os.path.getsize(file_path)
+    chunk_size = max(-(-size // max(chunks, 1)), PARALLEL_MIN_CHUNK_SIZE)
+    ranges = []
+    start = 0
+    with open(file_path, mode="rb") as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            # Move the end of the range past the line it falls in
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def count_chunk(filename: str, start: int, end: int, edits: dict,
+                today: int, escaped: bool = True):
+    """
+    A function that counts the report totals of the tasks between the
+    byte offsets start and end of filename, with the edits recorded in
+    its journal applied. It is run in the worker processes of
+    parallel_report_counters.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        start(int): The offset of the first line of the range
+        end(int): The offset just past the last line of the range
+        edits(dict): The journal edits of each task id
+        today(int): The ordinal of the date tasks are overdue before
+        escaped(bool): Whether the file is in the current line format
+
+    Returns:
+        report(dict): The counters of the range, as returned by
+        report_counters
+    """
+    with open(path_directory(filename), mode="rb") as file:
+        file.seek(start)
+        content = file.read(end - start).decode("utf-8")
+
+    def tasks():
+        for line in content.split("\n"):
+            task = parse_task(line, 0, escaped)
+            if task is not None:
+                changes = edits.get(task.task_id)
+                if changes is not None:
+                    # Skip the tasks that have been removed
+                    if None in changes:
+                        continue
+                    for key, value in changes.items():
+                        task.set_field(key, value)
+                yield task
+
+    return report_counters(tasks(), today)
+
+
+def merge_counters(reports: list):
+    """
+    A function that adds up the report counters of parts of the tasks
+    into the counters of all of them.
+
+    Args:
+        reports(iterable): The counters of each part, as returned by
+        report_counters
+
+    Returns:
+        report(dict): The combined counters
+    """
+    merged = report_counters((), 0)
+    user_counts = merged["users"]
+    for report in reports:
+        for key in ("total", "completed", "incompleted", "overdue"):
+            merged[key] += report[key]
+        for user, counts in report["users"].items():
+            totals = user_counts.setdefault(user, [0, 0, 0])
+            for position, count in enumerate(counts):
+                totals[position] += count
+
+    return merged
+
+
+@instrumented
+def parallel_report_counters(filename: str, workers: int):
+    """
+    A function that counts the report totals of filename in a pool of
+    worker processes. The file is split into line aligned byte ranges,
+    each worker counts the tasks of a range and the partial counters are
+    merged in file order. Files that still hold tasks without ids are
+    counted in a single pass instead, as those tasks take their position
+    in the file as their id.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        workers(int): The number of worker processes
+
+    Returns:
+        report(dict): The counters, as returned by report_counters
+    """
+    today = today_ordinal()
+    with open(path_directory(filename), encoding="utf-8") as file:
+        first_line = next((line for line in file if line.strip()), "")
+    escaped = first_line.strip() == FORMAT_HEADER
+    # Tasks without an id end in their completion instead
+    with_ids = escaped or first_line.rpartition(", ")[2].strip().isdigit()
+    ranges = chunk_ranges(filename, workers)
+    if not with_ids or workers <= 1 or len(ranges) <= 1:
+        return report_counters(iter_tasks(filename), today)
+    edits = {}
+    for task_id, key, value in read_journal(filename):
+        edits.setdefault(task_id, {})[key] = value
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_chunk, filename, start, end,
+                                   edits, today, escaped)
+                   for start, end in ranges]
+        report = merge_counters(future.result() for future in futures)
+
+    return report
+
+
+def record_edit(filename: str, task: Task, edit: dict):
+    """
+    A function that appends a journal entry for each value of edit that
+    differs from task.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        task(Task): The task as it is before the edit
+        edit(dict): a dict representing the edited task
+
+    Returns:
+        entries(int): The number of journal entries written
+    """
+    entries = []
+    for operation, key in JOURNAL_OPERATIONS.items():
+        if key in edit and task.differs(key, edit[key]):
+            entries.append(join_fields((operation, str(task.task_id),
+                                        edit[key])) + "\n")
+    if entries:
+        note_write(filename)
+        write_file(journal_filename(filename), "a+", "".join(entries))
+
+    return len(entries)
+
+
+def record_removal(filename: str, task_id: int):
+    """
+    A function that appends a journal entry that takes the task with
+    task_id out of filename, which leaves its line in the file until the
+    journal is compacted.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        task_id(int): The id of the task to remove
+    """
+    note_write(filename)
+    write_file(journal_filename(filename), "a+",
+               join_fields((JOURNAL_REMOVE, str(task_id))) + "\n")
+
+
+def start_appending(filename: str):
+    """
+    A function that readies filename, under the exclusive lock of the
+    caller, for lines in the current format to be appended to it: an
+    empty file is given the format header, and a file in the legacy
+    format is rewritten in the current one.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+    """
+    if os.path.getsize(path_directory(filename)) == 0:
+        write_file(filename, "a+", FORMAT_HEADER)
+    elif legacy_format(filename):
+        compact_tasks(filename)
+
+
+def append_task(filename: str, content: str, task_id: int):
+    """
+    A function that appends a new task line with task_id to filename
+    and adds its entry to the task index.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        content(str): The task line as returned by add_task
+        task_id(int): The id to give the task
+
+    Returns:
+        task(Task): The record of the new task
+    """
+    start_appending(filename)
+    note_write(filename)
+    record = f"{content.strip()}, {task_id}"
+    header = file_header(filename)
+    write_file(filename, "a+", f"\n{record}")
+    size = os.path.getsize(path_directory(filename))
+    length = len(record.encode("utf-8"))
+    append_task_index(filename, task_id,
+                      TASK_INDEX_ENTRY.pack(size - length, length), header)
+    task = Task.from_fields(*split_fields(record))
+
+    return task
+
+
+@instrumented
+def append_tasks(filename: str, contents, task_id: int):
+    """
+    A function that appends many new task lines to filename through a
+    BatchWriter, giving them the ids from task_id on, and adds their
+    entries to the task index in a single write.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        contents(iterable): The task lines, as returned by add_task
+        task_id(int): The id to give the first task
+
+    Returns:
+        total_tasks(int): The number of tasks appended
+    """
+    contents = iter(contents)
+    first = next(contents, None)
+    if first is None:
+        return 0
+    start_appending(filename)
+    note_write(filename)
+    header = file_header(filename)
+    offset = os.path.getsize(path_directory(filename))
+    entries = bytearray()
+    total_tasks = 0
+    with BatchWriter(filename, "a") as writer:
+        for content in chain((first,), contents):
+            record = f"{content.strip()}, {task_id + total_tasks}"
+            length = len(record.encode("utf-8"))
+            # Each record follows the newline that separates it
+            entries += TASK_INDEX_ENTRY.pack(offset + 1, length)
+            offset += 1 + length
+            writer.write(f"\n{record}")
+            total_tasks += 1
+    append_task_index(filename, task_id, bytes(entries), header)
+
+    return total_tasks
+
+
+def compact_tasks(filename: str):
+    """
+    A function that folds the journal of filename back into it while
+    streaming the tasks, for use in streaming mode, and rebuilds the
+    task index. A file in the legacy line format is rewritten in the
+    current one even if it has no journal.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+    """
+    journal_path = path_directory(journal_filename(filename))
+    if not (os.path.exists(journal_path) or legacy_format(filename)):
+        return
+    file_overwrite(filename, iter_tasks(filename))
+    try:
+        os.remove(journal_path)
+    except FileNotFoundError:
+        pass
+    build_task_index(filename)
+
+
+def task_matches(task: Task, user: str = None, completed: bool = None,
+                 due_from: int = None, due_to: int = None):
+    """
+    A function that checks a task against the filters of a query, each
+    of which is skipped when it is None.
+
+    Args:
+        task(Task): The task to check
+        user(str): The user the task must be assigned to
+        completed(bool): Whether the task must be complete
+        due_from(int): The ordinal of the earliest due date
+        due_to(int): The ordinal of the latest due date
+
+    Returns:
+        matches(bool): True if the task passes every filter
+    """
+    matches = ((user is None or task.user == user)
+               and (completed is None or task.complete == completed)
+               and (due_from is None or task.due >= due_from)
+               and (due_to is None or task.due <= due_to))
+
+    return matches
+
+
+def paginate(tasks, offset: int, limit: int, sort_by_due: bool = False):
+    """
+    A function that returns the page of tasks that starts at offset,
+    reading only as far into tasks as the end of the page. Sorted pages
+    keep only the earliest tasks up to the end of the page while sorting.
+
+    Args:
+        tasks(iterable): The tasks, in file order
+        offset(int): The number of tasks before the page
+        limit(int): The number of tasks on the page, or None for all of
+        the rest
+        sort_by_due(bool): Whether to sort the tasks by due date, keeping
+        tasks due on the same date in file order
+
+    Returns:
+        page(list): The tasks on the page
+        next_offset(int): The offset of the next page, or None if this
+        is the last page
+    """
+    stop = None if limit is None else offset + limit + 1
+    if sort_by_due:
+        if stop is None:
+            tasks = sorted(tasks, key=attrgetter("due"))
+        else:
+            tasks = heapq.nsmallest(stop, tasks, key=attrgetter("due"))
+    page = list(islice(tasks, offset, stop))
+    next_offset = None
+    if limit is not None and len(page) > limit:
+        del page[limit:]
+        next_offset = offset + limit
+
+    return page, next_offset
+
+
+class TaskStore:
+    """
+    A class that loads a tasks .txt file into memory once and keeps
+    secondary indexes of the tasks by id, user, completion state and due
+    date, so that the menu actions are served from memory. The file is
+    only read again when its modification time or size changes.
+
+    Each task carries a stable id as the last field of its line. Files
+    written before ids were introduced are migrated on their first load,
+    with each task given its position in the file as its id, as are files
+    in the legacy line format.
+
+    Edits are appended to a journal file as small entries keyed by the
+    task id. The journal is replayed on every load and folded back into
+    the file by compact().
+
+    Attributes:
+        filename(str): The .txt file that the tasks are loaded from
+        tasks(list): A list of Task records, in the same order as the
+        lines of the file
+        by_id(dict): The position in tasks of each task id
+        by_user(dict): The positions in tasks of each user's tasks
+        by_completion(dict): The positions in tasks of the tasks that
+        are complete (True) and incomplete (False)
+        by_due_date(dict): The positions in tasks of the tasks due on
+        each due date ordinal
+        due_dates(list): The due date ordinals of by_due_date, in order
+        open_dues(array): The due date ordinals of the incomplete tasks,
+        in order, which is kept in the due index file
+        open_positions(array): The positions in tasks of the incomplete
+        tasks in the order of open_dues, and in file order within a due
+        date
+        search_index(SearchIndex): The index of the words of the tasks,
+        or None until the first search
+        next_id(int): The id that the next appended task will be given
+        removed_ids(set): The ids of the tasks whose lines are still in
+        the file, removed by the journal
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.tasks = []
+        self.by_id = {}
+        self.by_user = {}
+        self.by_completion = {}
+        self.by_due_date = {}
+        self.due_dates = []
+        self.open_dues = array(DUE_INDEX_COLUMNS[0])
+        self.open_positions = array(DUE_INDEX_COLUMNS[1])
+        self.search_index = None
+        self.journal = journal_filename(filename)
+        self.journal_entries = 0
+        self.next_id = 0
+        self.removed_ids = set()
+        self._stamp = None
+        self._rewrites = 0
+
+    def _file_stamp(self):
+        """
+        Returns the modification time and size of the file and of its
+        journal, which are used to tell whether either has changed since
+        the store was loaded.
+        """
+        stamp = []
+        for filename in (self.filename, self.journal):
+            try:
+                stat = os.stat(path_directory(filename))
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @instrumented
+    def load(self):
+        """
+        Reads the tasks and their due index from the snapshot of the file
+        if it is current, or otherwise parses every line of the file into
+        a task and writes a new snapshot and due index, then rebuilds the
+        indexes and replays the journal on top of them. A file in the
+        legacy line format, or with tasks that have no id yet, is
+        migrated.
+        """
+        self._stamp = self._file_stamp()
+        self._rewrites = task_counters(self.filename)[1]
+        self.journal_entries = 0
+        self.removed_ids = set()
+        # The file may have been replaced, so the search index is read
+        # again from its file on the next search
+        self.search_index = None
+        migrate = False
+        # The tasks hold no references to each other, so the garbage
+        # collector is paused while they are created rather than scanning
+        # them again and again as they pile up
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            header = file_header(self.filename)
+            tasks = read_snapshot(self.filename)
+            if tasks is not None:
+                self._index_all(tasks, read_due_index(self.filename, header))
+            else:
+                tasks = []
+                with open(path_directory(self.filename),
+                          encoding="utf-8") as file:
+                    first_line = file.readline()
+                    escaped = first_line.strip() == FORMAT_HEADER
+                    # Files in the legacy format, including those with
+                    # tasks without an id, are rewritten once loaded
+                    migrate = bool(first_line) and not escaped
+                    file.seek(0)
+                    for line in file:
+                        task = parse_task(line, len(tasks), escaped)
+                        if task is not None:
+                            tasks.append(task)
+                    instrumentation.count("bytes_read", file.tell())
+                instrumentation.count("lines_parsed", len(tasks))
+                # Tasks moved in from another shard are appended out of
+                # order of their ids
+                task_ids = list(map(attrgetter("task_id"), tasks))
+                if any(map(gt, task_ids, islice(task_ids, 1, None))):
+                    tasks.sort(key=attrgetter("task_id"))
+                self._index_all(tasks)
+                if not migrate:
+                    write_snapshot(self.filename, tasks, header)
+                    write_due_index(self.filename, self.open_dues,
+                                    self.open_positions, header)
+        finally:
+            if collecting:
+                gc.enable()
+        self._replay(read_journal(self.filename))
+        instrumentation.count("journal_entries_replayed",
+                              self.journal_entries)
+        if migrate:
+            self._write_compacted()
+
+    @instrumented
+    def refresh(self):
+        """
+        Loads the file again only if it has changed since the last load,
+        and only reads what was appended if other processes have just
+        appended tasks or journal entries.
+
+        Returns:
+            self(TaskStore): The store, so that calls can be chained
+        """
+        with task_lock(self.filename) as file:
+            stamp = self._file_stamp()
+            if stamp == self._stamp or self._catch_up(stamp, file):
+                return self
+        # Loading may migrate the file, so other processes are kept out
+        with task_lock(self.filename, exclusive=True):
+            if self._file_stamp() != self._stamp:
+                self.load()
+        return self
+
+    def _catch_up(self, stamp: tuple, file):
+        """
+        Reads the tasks and journal entries appended to the file and its
+        journal since the last load, if the file has not been rewritten
+        since.
+
+        Args:
+            stamp(tuple): The current state of the file and its journal
+            file(file): The lock file, as yielded by task_lock
+
+        Returns:
+            caught_up(bool): Whether the store is now current
+        """
+        if self._stamp is None or stamp[0] is None \
+                or read_counters(file)[1] != self._rewrites:
+            return False
+        offsets = []
+        for old, new in zip(self._stamp, stamp):
+            if old is None and new is None:
+                offsets.append(0)
+                continue
+            # A journal created since is read from its start
+            old = old or (0, 0)
+            if new is None or new[1] < old[1]:
+                return False
+            offsets.append(old[1])
+        file_offset, journal_offset = offsets
+        if stamp[0][1] > file_offset:
+            with open(path_directory(self.filename),
+                      mode="rb") as tasks_file:
+                tasks_file.seek(file_offset)
+                content = tasks_file.read().decode("utf-8")
+            instrumentation.count("bytes_read", stamp[0][1] - file_offset)
+            for line in content.split("\n"):
+                task = parse_task(line, len(self.tasks))
+                if task is not None:
+                    self._place(task)
+                    instrumentation.count("lines_parsed")
+        self._replay(read_journal(self.filename, journal_offset))
+        self._stamp = stamp
+
+        return True
+
+    def _replay(self, entries):
+        """
+        Applies journal entries to the store. The tasks that entries
+        remove are taken out together once the others are applied, so
+        that the indexes are only rebuilt once.
+
+        Args:
+            entries(iterable): The entries, as yielded by read_journal
+        """
+        removed = set()
+        for task_id, key, value in entries:
+            if key is None:
+                removed.add(task_id)
+            else:
+                self.update(self.by_id[task_id], {key: value})
+            self.journal_entries += 1
+        if removed:
+            self._drop(removed)
+            self.removed_ids |= removed
+
+    def mark_synced(self):
+        """
+        Records the current state of the file as loaded, after the store
+        itself has written its tasks to the file under the exclusive
+        lock.
+        """
+        self._stamp = self._file_stamp()
+        self._rewrites = task_counters(self.filename)[1]
+
+    def _index_all(self, tasks: list, open_index: tuple = None):
+        """
+        Replaces the tasks of the store with tasks and builds each of the
+        indexes in a single pass over them. The incomplete tasks are then
+        sorted by due date, unless open_index already holds them as read
+        from the due index file.
+        """
+        self.tasks = tasks
+        self.by_id = {task.task_id: position
+                      for position, task in enumerate(tasks)}
+        self.by_user = {}
+        self.by_completion = {}
+        self.by_due_date = {}
+        for index, attribute in ((self.by_user, "user"),
+                                 (self.by_completion, "complete"),
+                                 (self.by_due_date, "due")):
+            for position, key in enumerate(map(attrgetter(attribute),
+                                               tasks)):
+                positions = index.get(key)
+                if positions is None:
+                    index[key] = [position]
+                else:
+                    positions.append(position)
+        self.due_dates = sorted(self.by_due_date)
+        self.next_id = max(self.by_id, default=-1) + 1
+        if open_index is None:
+            # The sort is stable, so tasks due on the same day stay in
+            # file order
+            positions = sorted(self.by_completion.get(False, []),
+                               key=lambda position: tasks[position].due)
+            open_index = (array(DUE_INDEX_COLUMNS[0],
+                                [tasks[position].due
+                                 for position in positions]),
+                          array(DUE_INDEX_COLUMNS[1], positions))
+        self.open_dues, self.open_positions = open_index
+
+    def _open_add(self, position: int):
+        """
+        Adds the incomplete task at position to the due index, after the
+        tasks due before or on the same day that come before it in file
+        order.
+        """
+        due = self.tasks[position].due
+        start = bisect_left(self.open_dues, due)
+        end = bisect_right(self.open_dues, due, start)
+        slot = bisect_left(self.open_positions, position, start, end)
+        self.open_dues.insert(slot, due)
+        self.open_positions.insert(slot, position)
+
+    def _open_remove(self, position: int, due: int):
+        """
+        Removes the task at position, which was due on due, from the due
+        index.
+        """
+        start = bisect_left(self.open_dues, due)
+        end = bisect_right(self.open_dues, due, start)
+        slot = bisect_left(self.open_positions, position, start, end)
+        del self.open_dues[slot]
+        del self.open_positions[slot]
+
+    def _place(self, task: Task):
+        """
+        Adds a task to the end of tasks and to each of the indexes, or if
+        its id is below that of another task, as for a task moved in from
+        another shard, puts it in the place of its id among the tasks and
+        rebuilds the indexes. The search index is then dropped, as it only
+        adds the tasks above the ids it has indexed.
+        """
+        if task.task_id >= self.next_id:
+            self._index(task)
+            return
+        position = bisect_left(self.tasks, task.task_id,
+                               key=attrgetter("task_id"))
+        self.tasks.insert(position, task)
+        self._index_all(self.tasks)
+        self.search_index = None
+
+    def _drop(self, task_ids: set):
+        """
+        Takes the tasks with task_ids out of tasks and rebuilds the
+        indexes. The search index is dropped, as it lists the tasks.
+        """
+        self._index_all([task for task in self.tasks
+                         if task.task_id not in task_ids])
+        self.search_index = None
+
+    def _index(self, task: dict):
+        """
+        Adds a task to the end of tasks and to each of the indexes.
+        """
+        position = len(self.tasks)
+        self.tasks.append(task)
+        self.by_id[task.task_id] = position
+        self.by_user.setdefault(task.user, []).append(position)
+        self.by_completion.setdefault(task.complete, []).append(position)
+        if task.due not in self.by_due_date:
+            insort(self.due_dates, task.due)
+        self.by_due_date.setdefault(task.due, []).append(position)
+        if not task.complete:
+            self._open_add(position)
+        if self.search_index is not None:
+            self.search_index.add((task,))
+        self.next_id = max(self.next_id, task.task_id + 1)
+
+    @instrumented
+    def append(self, content: str, task_id: int = None):
+        """
+        Appends a new task line to the file and to the store, without
+        reloading the rest of the file. The task is given the next free
+        id, unless one is given, and its entry is added to the task
+        index. A task given an id below that of another task is put in
+        the place of its id among the tasks, and the search index file is
+        then removed.
+
+        Args:
+            content(str): The task line as returned by add_task
+            task_id(int): The id to give the task, which must not be the
+            id of a task in the file
+
+        Returns:
+            task_id(int): The id given to the new task
+        """
+        with task_lock(self.filename, exclusive=True):
+            self.refresh()
+            task = append_task(self.filename, content,
+                               self.next_id if task_id is None else task_id)
+            if task.task_id < self.next_id:
+                self._remove_search_index()
+            self._place(task)
+            self.mark_synced()
+
+        return task.task_id
+
+    @instrumented
+    def remove(self, task_id: int):
+        """
+        Takes the task with task_id out of the store, for moving the task
+        to another file, and records its removal in the journal rather
+        than rewriting the file. The search index file is removed, as it
+        lists the task.
+
+        Args:
+            task_id(int): The id of the task to remove
+
+        Returns:
+            task(Task): The task that was removed
+        """
+        with task_lock(self.filename, exclusive=True):
+            self.refresh()
+            task = self.get(task_id)
+            record_removal(self.filename, task_id)
+            self._drop({task_id})
+            self.removed_ids.add(task_id)
+            self._remove_search_index()
+            self.journal_entries += 1
+            self.mark_synced()
+            if self.journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+                self.compact()
+
+        return task
+
+    @instrumented
+    def insert(self, task: Task):
+        """
+        Puts a task moved from another file into the store, in the place
+        of its id among the tasks, by appending its line to the file. If
+        the line the task was removed from is still in the file, the
+        journal is compacted first, so that the task is not in the file
+        twice.
+
+        Args:
+            task(Task): The task to insert
+        """
+        with task_lock(self.filename, exclusive=True):
+            self.refresh()
+            if task.task_id in self.removed_ids:
+                self._write_compacted()
+            self.append(join_fields(task.get_field(key)
+                                    for key in TASK_RECORD_FIELDS),
+                        task.task_id)
+
+    def _remove_search_index(self):
+        """
+        Drops the search index and removes its file, after tasks have been
+        taken out of the store or put in among the indexed ones.
+        """
+        self.search_index = None
+        try:
+            os.remove(path_directory(search_index_filename(self.filename)))
+        except FileNotFoundError:
+            pass
+
+    def update(self, position: int, changes: dict):
+        """
+        Updates the values of the task at position and moves it between
+        the index entries whose keys have changed.
+
+        Args:
+            position(int): The position of the task in tasks
+            changes(dict): The new values of the task, as strings in
+            the format of the tasks file
+        """
+        task = self.tasks[position]
+        before = (task.user, task.complete, task.due)
+        for key, value in changes.items():
+            task.set_field(key, value)
+        after = (task.user, task.complete, task.due)
+        for index, old, new in zip((self.by_user, self.by_completion,
+                                    self.by_due_date), before, after):
+            if old != new:
+                index[old].remove(position)
+                if not index[old]:
+                    del index[old]
+                # Keep the positions in file order
+                insort(index.setdefault(new, []), position)
+        if before[2] != after[2]:
+            if before[2] not in self.by_due_date:
+                self.due_dates.remove(before[2])
+            if len(self.by_due_date[after[2]]) == 1:
+                insort(self.due_dates, after[2])
+        if before[1:] != after[1:]:
+            if not before[1]:
+                self._open_remove(position, before[2])
+            if not after[1]:
+                self._open_add(position)
+
+    def get(self, task_id: int):
+        """
+        Returns the task with task_id.
+        """
+        return self.tasks[self.by_id[task_id]]
+
+    @instrumented
+    def record(self, task_id: str, edit: dict):
+        """
+        Appends a journal entry for each value of edit that differs from
+        the task with task_id, and applies the changes to the store. The
+        journal is compacted once it holds JOURNAL_COMPACT_THRESHOLD
+        entries.
+
+        Args:
+            task_id(int): The id of the task that has been edited
+            edit(dict): a dict representing the edited task
+        """
+        with task_lock(self.filename, exclusive=True):
+            self.refresh()
+            entries = record_edit(self.filename, self.get(task_id), edit)
+            if not entries:
+                return
+            self.update(self.by_id[task_id], edit)
+            self.journal_entries += entries
+            self.mark_synced()
+            if self.journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+                self.compact()
+
+    def _write_compacted(self):
+        """
+        Atomically replaces the file with the tasks held in the store,
+        removes the journal and rebuilds the task index, the snapshot and
+        the due index.
+        """
+        with task_lock(self.filename, exclusive=True):
+            file_overwrite(self.filename, self.tasks)
+            try:
+                os.remove(path_directory(self.journal))
+            except FileNotFoundError:
+                pass
+            build_task_index(self.filename)
+            header = file_header(self.filename)
+            write_snapshot(self.filename, self.tasks, header)
+            write_due_index(self.filename, self.open_dues,
+                            self.open_positions, header)
+            self.journal_entries = 0
+            self.removed_ids = set()
+            self.mark_synced()
+
+    @instrumented
+    def compact(self):
+        """
+        Folds the journal back into the file, and writes out the search
+        index if tasks have been added to it. Replaying a journal twice
+        gives the same result, so a journal left behind by an interrupted
+        compaction is harmless.
+        """
+        with task_lock(self.filename, exclusive=True):
+            self.refresh()
+            if self._stamp[1] is not None:
+                self._write_compacted()
+            if self.search_index is not None and self.search_index.changed:
+                write_search_index(self.filename, self.search_index)
+
+    @instrumented
+    def load_search_index(self):
+        """
+        Returns the search index of the tasks, reading it from its file
+        on first use and adding the tasks it has not seen. The index is
+        built again if it lists a different number of the tasks it covers
+        than the store holds, as when the file has been replaced.
+
+        Returns:
+            index(SearchIndex): The search index of every task
+        """
+        if self.search_index is None:
+            index = read_search_index(self.filename) or SearchIndex()
+            new_tasks = [task for task in self.tasks
+                         if task.task_id >= index.covered]
+            if index.count + len(new_tasks) != len(self.tasks):
+                index = SearchIndex()
+                new_tasks = self.tasks
+            index.add(new_tasks)
+            self.search_index = index
+        return self.search_index
+
+    def user_tasks(self, user: str):
+        """
+        Returns the tasks assigned to user, in file order.
+        """
+        return [self.tasks[position]
+                for position in self.by_user.get(user, [])]
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        """
+        Returns a page of the tasks that match the filters, as
+        TaskStorage.query does. The candidates are taken from the search
+        index, the index of the user, the completion state, the due dates
+        or, for the incomplete tasks in a range of due dates, the due
+        index, so that only they are checked, and when no filter is left
+        to check, the tasks before offset are skipped without being
+        looked at.
+        """
+        checks = []
+        if words:
+            run = sorted(self.by_id[task_id] for task_id in
+                         self.load_search_index().lookup(words))
+            if sort_by_due:
+                run.sort(key=lambda position: self.tasks[position].due)
+            runs = [run]
+            if user is not None:
+                checks.append(lambda task: task.user == user)
+        elif completed is False and user is None and (
+                sort_by_due or due_from is not None or due_to is not None):
+            start = 0 if due_from is None else bisect_left(self.open_dues,
+                                                           due_from)
+            end = (len(self.open_dues) if due_to is None
+                   else bisect_right(self.open_dues, due_to, start))
+            run = self.open_positions[start:end]
+            runs = [run if sort_by_due else sorted(run)]
+            completed = due_from = due_to = None
+        elif user is None and sort_by_due:
+            # The due dates in range, in order, each with its tasks in
+            # file order
+            start = 0 if due_from is None else bisect_left(self.due_dates,
+                                                           due_from)
+            end = (len(self.due_dates) if due_to is None
+                   else bisect_right(self.due_dates, due_to))
+            runs = [self.by_due_date[due]
+                    for due in self.due_dates[start:end]]
+            due_from = due_to = None
+        elif user is not None:
+            runs = [self.by_user.get(user, [])]
+            if sort_by_due:
+                runs = [sorted(runs[0],
+                               key=lambda position: self.tasks[position].due)]
+        elif completed is not None:
+            runs = [self.by_completion.get(completed, [])]
+            completed = None
+        else:
+            runs = [range(len(self.tasks))]
+        if completed is not None:
+            checks.append(lambda task: task.complete == completed)
+        if due_from is not None:
+            checks.append(lambda task: task.due >= due_from)
+        if due_to is not None:
+            checks.append(lambda task: task.due <= due_to)
+
+        if checks:
+            matches = (self.tasks[position] for run in runs
+                       for position in run
+                       if all(check(self.tasks[position])
+                              for check in checks))
+            return paginate(matches, offset, limit)
+        selected = []
+        skip = offset
+        for run in runs:
+            if skip >= len(run):
+                skip -= len(run)
+                continue
+            end = None if limit is None else skip + limit + 1 - len(selected)
+            selected.extend(run[skip:end])
+            skip = 0
+            if limit is not None and len(selected) > limit:
+                break
+        next_offset = None
+        if limit is not None and len(selected) > limit:
+            del selected[limit:]
+            next_offset = offset + limit
+
+        return [self.tasks[position] for position in selected], next_offset
+
+
+# Stores one TaskStore per filename so every menu action shares it
+task_stores = {}
+
+
+def get_store(filename: str):
+    """
+    A function that returns the up to date TaskStore for filename,
+    creating it on first use.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        store(TaskStore): The store holding the tasks of filename
+    """
+    if filename not in task_stores:
+        task_stores[filename] = TaskStore(filename)
+    store = task_stores[filename].refresh()
+
+    return store
+
+# --------------------------------- Search -------------------------------- #
+
+# Words are runs of letters, digits and underscores, found without regard
+# to case in the title and description of each task
+SEARCH_WORD = re.compile(r"\w+")
+# The search index starts with a magic number that also records its byte
+# order, the id up to which the tasks are indexed and the number of
+# tasks, words and postings it holds. It is followed by the number of
+# tasks listed under each word, the task ids of every word in turn and
+# then the words, separated by newlines
+SEARCH_INDEX_MAGIC = b"TASKSRC" + sys.byteorder[0].encode()
+SEARCH_INDEX_HEADER = struct.Struct("<8sQQQQ")
+SEARCH_INDEX_COLUMNS = "Iq"
+
+
+def search_words(text: str):
+    """
+    A function that returns the distinct words of text, in lower case.
+
+    Args:
+        text(str): The text to split into words
+
+    Returns:
+        words(set): The words of text
+    """
+    words = set(SEARCH_WORD.findall(text.lower()))
+
+    return words
+
+
+def task_words(task: Task):
+    """
+    A function that returns the words of the title and description of a
+    task, which are what a search looks in.
+
+    Args:
+        task(Task): The task to split into words
+
+    Returns:
+        words(set): The words of the task
+    """
+    return search_words(f"{task.task} {task.task_description}")
+
+
+def search_matches(task: Task, words: list):
+    """
+    A function that checks whether every one of words starts a word of
+    the title or description of a task, for the backends that have no
+    search index.
+
+    Args:
+        task(Task): The task to check
+        words(list): The words searched for
+
+    Returns:
+        matches(bool): True if the task holds every word
+    """
+    words_of_task = task_words(task)
+    matches = all(any(word.startswith(prefix) for word in words_of_task)
+                  for prefix in words)
+
+    return matches
+
+
+def postings_contain(postings: array, task_id: int):
+    """
+    A function that checks whether task_id is one of the sorted task ids
+    of a word of the search index.
+
+    Args:
+        postings(array): The task ids of a word, in order
+        task_id(int): The task id to look for
+
+    Returns:
+        found(bool): True if postings holds task_id
+    """
+    index = bisect_left(postings, task_id)
+    found = index < len(postings) and postings[index] == task_id
+
+    return found
+
+
+class SearchIndex:
+    """
+    A class that keeps an inverted index of the words of the titles and
+    descriptions of the tasks: the ids of the tasks that hold each word,
+    in order, and the words themselves in order, so that the words
+    starting with a prefix are a range found by bisect. The title and
+    description of a task never change once it is added, so the index
+    only grows, and tasks with ids from covered on are the ones it has
+    not seen.
+
+    Attributes:
+        postings(dict): The ids of the tasks holding each word, as a
+        sorted array
+        words(list): The words of postings, in order
+        covered(int): The id after the highest indexed task id
+        count(int): The number of tasks indexed
+        changed(bool): Whether the index has changed since it was last
+        read from or written to its file
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.words = []
+        self.covered = 0
+        self.count = 0
+        self.changed = False
+
+    def add(self, tasks):
+        """
+        Adds the words of each of tasks to the index.
+        """
+        new_words = []
+        for task in tasks:
+            task_id = task.task_id
+            for word in task_words(task):
+                postings = self.postings.get(word)
+                if postings is None:
+                    self.postings[word] = array(SEARCH_INDEX_COLUMNS[1],
+                                                (task_id,))
+                    new_words.append(word)
+                elif postings[-1] < task_id:
+                    postings.append(task_id)
+                else:
+                    insort(postings, task_id)
+            self.covered = max(self.covered, task_id + 1)
+            self.count += 1
+            self.changed = True
+        if new_words:
+            # Sorting a sorted list with a run appended only merges them
+            new_words.sort()
+            self.words.extend(new_words)
+            self.words.sort()
+
+    def matching(self, prefix: str):
+        """
+        Returns the postings of every word that starts with prefix.
+        """
+        postings = []
+        for word in islice(self.words, bisect_left(self.words, prefix),
+                           None):
+            if not word.startswith(prefix):
+                break
+            postings.append(self.postings[word])
+        return postings
+
+    def lookup(self, words: list):
+        """
+        Returns the ids of the tasks holding a word that starts with each
+        of words, in no particular order. The candidates are taken from
+        the prefix with the fewest postings, and each is then looked up
+        in the postings of the other prefixes by bisect.
+        """
+        ranked = sorted((self.matching(prefix) for prefix in words),
+                        key=lambda postings: sum(map(len, postings)))
+        candidates = set().union(*ranked[0])
+        for postings in ranked[1:]:
+            candidates = {task_id for task_id in candidates
+                          if any(postings_contain(run, task_id)
+                                 for run in postings)}
+        return candidates
+
+
+def search_index_filename(filename: str):
+    """
+    A function that returns the name of the file that the search index
+    of the tasks in filename is kept in.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        search_index(str): The name of the search index file, e.g.
+        tasks_search.bin for tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    search_index = f"{root}_search.bin"
+
+    return search_index
+
+
+@instrumented
+def write_search_index(filename: str, index: SearchIndex):
+    """
+    A function that writes the search index of filename to its file, so
+    that the next process only has to index the tasks added since. The
+    index is written to a temporary file which then replaces the old
+    one.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        index(SearchIndex): The search index of the tasks
+    """
+    counts = array(SEARCH_INDEX_COLUMNS[0])
+    task_ids = array(SEARCH_INDEX_COLUMNS[1])
+    for word in index.words:
+        postings = index.postings[word]
+        counts.append(len(postings))
+        task_ids.extend(postings)
+    word_block = "\n".join(index.words).encode("utf-8")
+    file_path = path_directory(search_index_filename(filename))
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, mode="wb") as file:
+        file.write(SEARCH_INDEX_HEADER.pack(
+            SEARCH_INDEX_MAGIC, index.covered, index.count, len(index.words),
+            len(task_ids)))
+        file.write(counts.tobytes())
+        file.write(task_ids.tobytes())
+        file.write(word_block)
+        instrumentation.count("bytes_written", file.tell())
+    os.replace(temp_path, file_path)
+    index.changed = False
+
+
+@instrumented
+def read_search_index(filename: str):
+    """
+    A function that reads the search index of filename from its file.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        index(SearchIndex): The search index, or None if there is none
+    """
+    try:
+        with open(path_directory(search_index_filename(filename)),
+                  mode="rb") as file:
+            content = memoryview(file.read())
+    except FileNotFoundError:
+        return None
+    instrumentation.count("bytes_read", len(content))
+    if len(content) < SEARCH_INDEX_HEADER.size:
+        return None
+    magic, covered, count, word_count, posting_count = \
+        SEARCH_INDEX_HEADER.unpack_from(content)
+    if magic != SEARCH_INDEX_MAGIC:
+        return None
+    offset = SEARCH_INDEX_HEADER.size
+    columns = []
+    for typecode, size in zip(SEARCH_INDEX_COLUMNS,
+                              (word_count, posting_count)):
+        column = array(typecode)
+        column.frombytes(content[offset:offset + column.itemsize * size])
+        columns.append(column)
+        offset += column.itemsize * size
+    counts, task_ids = columns
+    index = SearchIndex()
+    index.covered = covered
+    index.count = count
+    if word_count:
+        index.words = str(content[offset:], "utf-8").split("\n")
+    start = 0
+    for word, size in zip(index.words, counts):
+        index.postings[word] = task_ids[start:start + size]
+        start += size
+
+    return index
+
+# ------------------------------ Report-State ----------------------------- #
+
+
+class ReportState:
+    """
+    A class that keeps the report counters of a TaskStore up to date as
+    tasks are added and edited, so that reports can be produced without
+    counting every task again. The counters are saved to a .json file
+    next to the reports, together with the state of the tasks file they
+    describe and the date they were counted on.
+
+    Tasks that are incomplete and not yet overdue are kept in a min-heap
+    by due date, so moving the counters on to a later date only looks at
+    the tasks whose due date has passed since.
+
+    Attributes:
+        store(TaskStore): The store whose tasks are counted
+        filename(str): The .json file the counters are saved to
+        report(dict): The counters, as returned by report_counters
+        today(int): The ordinal of the date the counters are valid on
+        stamp(list): The state of the tasks file the counters describe
+    """
+
+    def __init__(self, store: TaskStore, filename: str):
+        self.store = store
+        self.filename = filename
+        self.report = None
+        self.today = None
+        self.stamp = None
+        self._due_heap = []
+        self._heap_due = {}
+
+    def _store_stamp(self):
+        """
+        Returns the state of the tasks file in the form saved to json.
+        """
+        return json.loads(json.dumps(self.store._stamp))
+
+    def rebuild(self):
+        """
+        Counts every task of the store and rebuilds the due date heap.
+        """
+        self.today = today_ordinal()
+        self.report = report_counters(self.store.tasks, self.today)
+        self._build_heap()
+        self.save()
+
+    def _build_heap(self):
+        """
+        Pushes every incomplete task that is not overdue onto the heap.
+        """
+        self._due_heap = []
+        self._heap_due = {}
+        for task in self.store.tasks:
+            if not task.complete and task.due >= self.today:
+                self._due_heap.append((task.due, task.task_id))
+                self._heap_due[task.task_id] = task.due
+        heapq.heapify(self._due_heap)
+
+    @instrumented
+    def load(self):
+        """
+        Loads the saved counters if they describe the current tasks file,
+        or counts the tasks again otherwise.
+        """
+        try:
+            saved = json.loads(read_file(self.filename, "r"))
+        except (FileNotFoundError, ValueError):
+            saved = None
+        if saved is None or saved["stamp"] != self._store_stamp():
+            self.rebuild()
+            return
+        self.report = saved["report"]
+        self.today = saved["today"]
+        self.stamp = saved["stamp"]
+        self._build_heap()
+
+    def save(self):
+        """
+        Saves the counters along with the tasks file state they describe.
+        """
+        self.stamp = self._store_stamp()
+        content = {"stamp": self.stamp, "today": self.today,
+                   "report": self.report}
+        write_file(self.filename, "w+", json.dumps(content))
+
+    @instrumented
+    def refresh(self):
+        """
+        Makes the counters current: they are counted again if the tasks
+        file was changed elsewhere, and tasks whose due date has passed
+        since they were last counted are moved to overdue.
+
+        Returns:
+            self(ReportState): The state, so that calls can be chained
+        """
+        self.store.refresh()
+        if self.report is None:
+            self.load()
+        elif self.stamp != self._store_stamp():
+            self.rebuild()
+        today = today_ordinal()
+        if today != self.today:
+            self.today = today
+            while self._due_heap and self._due_heap[0][0] < today:
+                due, task_id = heapq.heappop(self._due_heap)
+                # Skip entries left behind by edits of the task
+                if self._heap_due.get(task_id) != due:
+                    continue
+                del self._heap_due[task_id]
+                task = self.store.get(task_id)
+                if not task.complete:
+                    self.report["overdue"] += 1
+                    self.report["users"][task.user][2] += 1
+            self.save()
+        return self
+
+    def _count(self, task: Task, step: int):
+        """
+        Adds (step 1) or removes (step -1) a task to or from the counters.
+        A task that is removed also leaves the heap, as its entry there
+        holds the due date of the version of the task being removed.
+        """
+        if step == -1:
+            self._heap_due.pop(task.task_id, None)
+        counts = self.report["users"].setdefault(task.user, [0, 0, 0])
+        self.report["total"] += step
+        counts[0] += step
+        if task.complete:
+            self.report["completed"] += step
+            counts[1] += step
+        else:
+            self.report["incompleted"] += step
+            if task.due < self.today:
+                self.report["overdue"] += step
+                counts[2] += step
+            elif step == 1:
+                heapq.heappush(self._due_heap, (task.due, task.task_id))
+                self._heap_due[task.task_id] = task.due
+
+    def task_changed(self, old_task: Task, new_task: Task):
+        """
+        Updates the counters after a task has been added (old_task is
+        None), edited or removed (new_task is None), and saves them.
+
+        Args:
+            old_task(Task): The task before it was edited or removed
+            new_task(Task): The task after it was added or edited
+        """
+        if old_task is not None:
+            self._count(old_task, -1)
+        if new_task is not None:
+            self._count(new_task, 1)
+        self.save()
+
+
+# Stores one ReportState per tasks filename
+report_states = {}
+
+
+def get_report_state(filename: str, rebuild: bool = False):
+    """
+    A function that returns the current ReportState of the tasks in
+    filename, creating it on first use.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        rebuild(bool): Whether to count every task again
+
+    Returns:
+        state(ReportState): The report state of filename
+    """
+    if filename not in report_states:
+        root = os.path.splitext(filename)[0]
+        report_states[filename] = ReportState(get_store(filename),
+                                              f"{root}_report_state.json")
+    state = report_states[filename]
+    if rebuild:
+        state.store.refresh()
+        state.rebuild()
+
+    return state.refresh()
+
+
+# -------------------------------- Storage -------------------------------- #
+
+
+class TaskStorage:
+    """
+    A class that describes the interface the menu actions use to read
+    and change the tasks, so that where and how the tasks are kept can
+    be swapped without changing the menu actions. Each backend overrides
+    every method.
+    """
+
+    def tasks(self):
+        """
+        Returns an iterable of every task, as Task records.
+        """
+        raise NotImplementedError
+
+    def user_tasks(self, user: str):
+        """
+        Returns an iterable of the tasks assigned to user.
+        """
+        raise NotImplementedError
+
+    def count(self):
+        """
+        Returns the number of tasks.
+        """
+        raise NotImplementedError
+
+    def get(self, task_id: int):
+        """
+        Returns the task with task_id.
+        """
+        raise NotImplementedError
+
+    def add(self, content: str):
+        """
+        Adds the task line returned by add_task and returns its task id.
+        """
+        raise NotImplementedError
+
+    def add_many(self, contents):
+        """
+        Adds many task lines, as returned by add_task, in one batch and
+        returns the number added.
+        """
+        raise NotImplementedError
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        """
+        Returns the page of limit tasks from offset on of the tasks that
+        match every filter that is not None, in file order or sorted by
+        due date, and the offset of the next page or None, as returned by
+        paginate. The due dates are ordinals and the range is inclusive,
+        and each of words must start a word of the title or description
+        of the task, as returned by search_words.
+        """
+        raise NotImplementedError
+
+    def edit(self, task_id: int, edit: dict, listed: dict = None,
+             version: int = None):
+        """
+        Applies the values of edit to the task with task_id. If the task
+        was edited from a listing (listed) taken at a version of the
+        tasks that is no longer current, the edit is retried on the
+        current task with only the changes made from the listing, as
+        worked out by rebased_edit.
+        """
+        raise NotImplementedError
+
+    def version(self):
+        """
+        Returns the version counter of the tasks, which changes whenever
+        they are written.
+        """
+        raise NotImplementedError
+
+    def report(self, rebuild: bool = False):
+        """
+        Returns the report counters, as returned by report_counters,
+        counting every task again if rebuild is set.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Writes out anything still pending before the program exits.
+        """
+        raise NotImplementedError
+
+
+class TextStorage(TaskStorage):
+    """
+    A class that keeps the tasks in the tasks .txt file, served from a
+    TaskStore and an incrementally maintained ReportState.
+
+    Attributes:
+        filename(str): The .txt file that contains the tasks
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def tasks(self):
+        return get_store(self.filename).tasks
+
+    def user_tasks(self, user: str):
+        return get_store(self.filename).user_tasks(user)
+
+    def count(self):
+        return len(get_store(self.filename).tasks)
+
+    def get(self, task_id: int):
+        return get_store(self.filename).get(task_id)
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        return get_store(self.filename).query(user, completed, due_from,
+                                              due_to, sort_by_due, offset,
+                                              limit, words)
+
+    def add(self, content: str):
+        state = get_report_state(self.filename)
+        task_id = state.store.append(content)
+        state.task_changed(None, state.store.get(task_id))
+
+        return task_id
+
+    def add_many(self, contents):
+        # The store reads the appended tasks back on its next refresh
+        with task_lock(self.filename, exclusive=True):
+            return append_tasks(self.filename, contents,
+                                get_store(self.filename).next_id)
+
+    def edit(self, task_id: int, edit: dict, listed: dict = None,
+             version: int = None):
+        with task_lock(self.filename, exclusive=True) as file:
+            state = get_report_state(self.filename)
+            old_task = state.store.get(task_id).copy()
+            if listed is not None and version != read_counters(file)[0]:
+                edit = rebased_edit(old_task, edit, listed)
+            state.store.record(task_id, edit)
+            state.task_changed(old_task, state.store.get(task_id))
+
+    def version(self):
+        return task_version(self.filename)
+
+    def report(self, rebuild: bool = False):
+        return get_report_state(self.filename, rebuild).report
+
+    def close(self):
+        get_store(self.filename).compact()
+
+
+class StreamingStorage(TaskStorage):
+    """
+    A class that keeps the tasks in the tasks .txt file and streams them
+    from the file for every action, so that memory use stays flat. Tasks
+    are looked up through the task index and reports are counted again
+    each time. The tasks are counted, and a user's tasks found, by
+    scanning the memory mapped file as raw bytes.
+
+    Attributes:
+        filename(str): The .txt file that contains the tasks
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def tasks(self):
+        return iter_tasks(self.filename)
+
+    def user_tasks(self, user: str):
+        return scan_user_tasks(self.filename, user)
+
+    def count(self):
+        return scan_count(self.filename)
+
+    def get(self, task_id: int):
+        return read_task(self.filename, task_id)
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        tasks = (iter_tasks(self.filename) if user is None
+                 else scan_user_tasks(self.filename, user))
+        matches = (task for task in tasks
+                   if task_matches(task, None, completed, due_from, due_to)
+                   and (not words or search_matches(task, words)))
+        return paginate(matches, offset, limit, sort_by_due)
+
+    def add(self, content: str):
+        with task_lock(self.filename, exclusive=True):
+            task_id = next_task_id(self.filename)
+            append_task(self.filename, content, task_id)
+
+        return task_id
+
+    def add_many(self, contents):
+        with task_lock(self.filename, exclusive=True):
+            return append_tasks(self.filename, contents,
+                                next_task_id(self.filename))
+
+    def edit(self, task_id: int, edit: dict, listed: dict = None,
+             version: int = None):
+        with task_lock(self.filename, exclusive=True) as file:
+            task = read_task(self.filename, task_id)
+            if listed is not None and version != read_counters(file)[0]:
+                edit = rebased_edit(task, edit, listed)
+            record_edit(self.filename, task, edit)
+
+    def version(self):
+        return task_version(self.filename)
+
+    def report(self, rebuild: bool = False):
+        return parallel_report_counters(self.filename, REPORT_WORKERS)
+
+    def close(self):
+        with task_lock(self.filename, exclusive=True):
+            compact_tasks(self.filename)
+
+
+def shard_directory(filename: str):
+    """
+    A function that returns the name of the directory that the shards of
+    the tasks in filename and their manifest are kept in.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+
+    Returns:
+        directory(str): The name of the directory, e.g. tasks_shards for
+        tasks.txt
+    """
+    root = os.path.splitext(filename)[0]
+    directory = f"{root}_shards"
+
+    return directory
+
+
+def shard_filename(filename: str, number: int):
+    """
+    A function that returns the name of a shard of the tasks in
+    filename, which is a tasks .txt file of its own.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        number(int): The number of the shard
+
+    Returns:
+        shard(str): The name of the shard, e.g. tasks_shards/shard_003.txt
+    """
+    shard = os.path.join(shard_directory(filename), f"shard_{number:03d}.txt")
+
+    return shard
+
+
+def shard_number(user: str, shards: int):
+    """
+    A function that returns the number of the shard that the tasks of
+    user are kept in. The checksum of the name is used rather than
+    hash(), which differs between processes.
+
+    Args:
+        user(str): The user the tasks are assigned to
+        shards(int): The number of shards
+
+    Returns:
+        number(int): The number of the shard of user
+    """
+    number = zlib.crc32(user.encode("utf-8")) % shards
+
+    return number
+
+
+@instrumented
+def shard_tasks(filename: str, shards: int):
+    """
+    A function that splits the tasks of filename, with the edits in its
+    journal applied, into shards by user, and then writes the manifest
+    that records the number of shards and the next free task id. The
+    manifest is written last, so a split that is cut short is started
+    again.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        shards(int): The number of shards to split the tasks into
+    """
+    tasks = (iter_tasks(filename)
+             if os.path.exists(path_directory(filename)) else ())
+    next_id = 0
+    with task_lock(filename), ExitStack() as stack:
+        writers = [stack.enter_context(
+                       BatchWriter(shard_filename(filename, number)))
+                   for number in range(shards)]
+        for writer in writers:
+            writer.write(FORMAT_HEADER)
+        for task in tasks:
+            writers[shard_number(task.user, shards)].write(
+                f"\n{task.line()}")
+            next_id = max(next_id, task.task_id + 1)
+    write_file(os.path.join(shard_directory(filename), "manifest.json"),
+               "w", json.dumps({"shards": shards, "next_id": next_id}))
+
+
+class ShardedStorage(TaskStorage):
+    """
+    A class that keeps the tasks split by user into shards, each a tasks
+    .txt file served from its own TaskStore, so that the views and edits
+    of one user only read and write the shard of that user. Each shard
+    keeps its tasks in order of their ids, which are given out from the
+    manifest so that they are unique across the shards. Reassigning a
+    task to a user of another shard moves it between the two shards: its
+    line is appended to the shard it moves to and its removal from the
+    other is recorded in that shard's journal, so that neither shard is
+    rewritten. The views of every user and the reports merge the shards.
+
+    Attributes:
+        filename(str): The .txt file that the tasks were split from
+        manifest(str): The .json file that records the number of shards
+        and the next free task id
+        shards(list): The TextStorage of each shard
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.manifest = os.path.join(shard_directory(filename),
+                                     "manifest.json")
+        os.makedirs(path_directory(shard_directory(filename)), exist_ok=True)
+        with task_lock(self.manifest, exclusive=True):
+            if not os.path.exists(path_directory(self.manifest)):
+                shard_tasks(filename, SHARD_COUNT)
+            shards = self._read_manifest()["shards"]
+        self.shards = [TextStorage(shard_filename(filename, number))
+                       for number in range(shards)]
+
+    def _read_manifest(self):
+        """
+        Returns the number of shards and the next free task id.
+        """
+        return json.loads(read_file(self.manifest, "r"))
+
+    def _next_ids(self, count: int):
+        """
+        Gives out count task ids from the manifest and returns the first.
+        """
+        with task_lock(self.manifest, exclusive=True):
+            manifest = self._read_manifest()
+            task_id = manifest["next_id"]
+            manifest["next_id"] += count
+            write_file(self.manifest, "w", json.dumps(manifest))
+
+        return task_id
+
+    def _shard(self, user: str):
+        """
+        Returns the number of the shard of user.
+        """
+        return shard_number(user, len(self.shards))
+
+    def _find(self, task_id: int, user: str = None):
+        """
+        Returns the number of the shard holding the task with task_id,
+        looking first in the shard of user, the user it was listed with.
+        """
+        numbers = range(len(self.shards))
+        if user is not None:
+            numbers = [self._shard(user), *numbers]
+        for number in numbers:
+            if task_id in get_store(self.shards[number].filename).by_id:
+                return number
+        raise KeyError(task_id)
+
+    def tasks(self):
+        return heapq.merge(*(shard.tasks() for shard in self.shards),
+                           key=attrgetter("task_id"))
+
+    def user_tasks(self, user: str):
+        return self.shards[self._shard(user)].user_tasks(user)
+
+    def count(self):
+        return sum(shard.count() for shard in self.shards)
+
+    def get(self, task_id: int):
+        return self.shards[self._find(task_id)].get(task_id)
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        if user is not None:
+            return self.shards[self._shard(user)].query(
+                user, completed, due_from, due_to, sort_by_due, offset,
+                limit, words)
+        # Each shard gives its tasks up to the end of the page, in order
+        # of due date or id, and the pages are merged in the same order
+        stop = None if limit is None else offset + limit + 1
+        pages = [shard.query(None, completed, due_from, due_to,
+                             sort_by_due, 0, stop, words)[0]
+                 for shard in self.shards]
+        key = ((lambda task: (task.due, task.task_id)) if sort_by_due
+               else attrgetter("task_id"))
+        return paginate(heapq.merge(*pages, key=key), offset, limit)
+
+    def add(self, content: str):
+        number = self._shard(split_fields(content.strip())[0])
+        state = get_report_state(self.shards[number].filename)
+        # The manifest is locked before the shard, as when moving tasks
+        with task_lock(self.manifest, exclusive=True):
+            task_id = state.store.append(content, self._next_ids(1))
+        state.task_changed(None, state.store.get(task_id))
+
+        return task_id
+
+    def add_many(self, contents):
+        total_tasks = 0
+        contents = iter(contents)
+        while True:
+            batch = list(islice(contents, IMPORT_BATCH_SIZE))
+            if not batch:
+                return total_tasks
+            groups = {}
+            for content in batch:
+                number = self._shard(split_fields(content.strip())[0])
+                groups.setdefault(number, []).append(content)
+            with task_lock(self.manifest, exclusive=True):
+                task_id = self._next_ids(len(batch))
+                for number, group in groups.items():
+                    filename = self.shards[number].filename
+                    with task_lock(filename, exclusive=True):
+                        append_tasks(filename, group, task_id)
+                    task_id += len(group)
+            total_tasks += len(batch)
+
+    def edit(self, task_id: int, edit: dict, listed: dict = None,
+             version: int = None):
+        # The manifest is locked first, as when adding tasks, so that the
+        # task cannot be moved away before its shard is locked. The
+        # version is checked under the lock of the shard, which is then
+        # given the rebased edit, as the version of the listing is that
+        # of every shard rather than its own
+        with task_lock(self.manifest, exclusive=True):
+            source = self._find(task_id,
+                                None if listed is None else listed["user"])
+            source_file = self.shards[source].filename
+            with task_lock(source_file, exclusive=True):
+                task = self.shards[source].get(task_id)
+                if listed is not None and version != self.version():
+                    edit = rebased_edit(task, edit, listed)
+                target = self._shard(edit.get("user", task.user))
+                if target == source:
+                    self.shards[source].edit(task_id, edit)
+                    return
+                target_file = self.shards[target].filename
+                with task_lock(target_file, exclusive=True):
+                    source_state = get_report_state(source_file)
+                    target_state = get_report_state(target_file)
+                    old_task = source_state.store.remove(task_id)
+                    source_state.task_changed(old_task, None)
+                    task = old_task.copy()
+                    for key in JOURNAL_OPERATIONS.values():
+                        if key in edit:
+                            task.set_field(key, edit[key])
+                    target_state.store.insert(task)
+                    target_state.task_changed(
+                        None, target_state.store.get(task_id))
+
+    def version(self):
+        return sum(shard.version() for shard in self.shards)
+
+    def report(self, rebuild: bool = False):
+        return merge_counters(shard.report(rebuild) for shard in self.shards)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+# The tasks and users tables of the SQLite backend. Dates are stored as
+# ordinals and the completion state as 0 or 1, as held by Task, with the
+# text of a date kept in date_assign_text or due_text when it was not
+# written in the form of its ordinal, as Task.date_texts keeps it, and the
+# indexes serve the per user views and the completion and due date counts.
+# The task_words table is the search index, with a row for each word of
+# the title and description of each task
+DATABASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    task TEXT NOT NULL,
+    task_description TEXT NOT NULL,
+    date_assign INTEGER NOT NULL,
+    due INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    date_assign_text TEXT,
+    due_text TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_user ON tasks (user, id);
+CREATE INDEX IF NOT EXISTS tasks_complete_due ON tasks (complete, due);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_words (
+    word TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    PRIMARY KEY (word, task_id)
+) WITHOUT ROWID;
+"""
+# The words starting with a prefix sort from the prefix up to the prefix
+# followed by the highest code point
+SEARCH_PREFIX_END = chr(0x10FFFF)
+TASK_COLUMNS = ("id, user, task, task_description, date_assign, due, "
+                "complete, date_assign_text, due_text")
+# The columns added to the tasks table since it was first created, which
+# databases created before them get on first use
+ADDED_TASK_COLUMNS = ("date_assign_text TEXT", "due_text TEXT")
+
+
+class SQLiteStorage(TaskStorage):
+    """
+    A class that keeps the tasks and users in an SQLite database. The
+    database runs in write-ahead logging mode so that reads are not
+    blocked by a write, and every query is a constant parameterised
+    statement, which sqlite3 prepares once and caches. Views of a user's
+    tasks and the report counts are served from the indexes on user,
+    completion and due date, and searches from the task_words table.
+
+    Attributes:
+        database(str): The .db file that contains the tasks and users
+        connection(sqlite3.Connection): The connection to the database
+    """
+
+    def __init__(self, database: str):
+        self.database = database
+        self.connection = sqlite3.connect(path_directory(database))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(DATABASE_SCHEMA)
+        columns = {row[1] for row in self.connection.execute(
+            "PRAGMA table_info(tasks)")}
+        with self.connection:
+            for column in ADDED_TASK_COLUMNS:
+                if column.split()[0] not in columns:
+                    self.connection.execute(
+                        f"ALTER TABLE tasks ADD COLUMN {column}")
+        # Databases created before the search index get it on first use
+        unindexed = self.connection.execute(
+            "SELECT EXISTS (SELECT 1 FROM tasks) "
+            "AND NOT EXISTS (SELECT 1 FROM task_words)").fetchone()[0]
+        if unindexed:
+            with self.connection:
+                self.index_words()
+
+    @staticmethod
+    def _task(row: tuple):
+        """
+        Returns the Task record of a row of the tasks table.
+        """
+        task_id, user, task, task_description, date_assign, due, \
+            complete, assign_text, due_text = row
+        record = Task(task_id, user, task, task_description, date_assign,
+                      due, bool(complete))
+        if assign_text is not None or due_text is not None:
+            record.date_texts = (assign_text, due_text)
+        return record
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs a write transaction, which takes the write lock of the
+        database up front and adds one to its version counter.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            yield
+            self.connection.execute(
+                f"PRAGMA user_version = {self.version() + 1}")
+
+    def tasks(self):
+        rows = self.connection.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY id")
+        return map(self._task, rows)
+
+    def user_tasks(self, user: str):
+        rows = self.connection.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE user = ? ORDER BY id",
+            (user,))
+        return map(self._task, rows)
+
+    def query(self, user: str = None, completed: bool = None,
+              due_from: int = None, due_to: int = None,
+              sort_by_due: bool = False, offset: int = 0,
+              limit: int = None, words: list = None):
+        # The statement only depends on which filters are given, so the
+        # few statements it can be are each prepared once and cached
+        filters = [(clause, (value,)) for clause, value in (
+            ("user = ?", user),
+            ("complete = ?", None if completed is None else int(completed)),
+            ("due >= ?", due_from),
+            ("due <= ?", due_to)) if value is not None]
+        filters.extend(("id IN (SELECT task_id FROM task_words "
+                        "WHERE word >= ? AND word < ?)",
+                        (word, word + SEARCH_PREFIX_END))
+                       for word in words or ())
+        where = " AND ".join(clause for clause, _ in filters) or "1"
+        order = "due, id" if sort_by_due else "id"
+        rows = self.connection.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE {where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            [value for _, values in filters for value in values]
+            + [-1 if limit is None else limit + 1, offset])
+        page = [self._task(row) for row in rows]
+        next_offset = None
+        if limit is not None and len(page) > limit:
+            del page[limit:]
+            next_offset = offset + limit
+
+        return page, next_offset
+
+    def count(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def get(self, task_id: int):
+        row = self.connection.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?",
+            (task_id,)).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        return self._task(row)
+
+    @staticmethod
+    def _row(content: str):
+        """
+        Returns the column values of a task line returned by add_task.
+        """
+        user, task, task_description, date_assign, due_date, task_comp = \
+            split_fields(content.strip())
+        assign, assign_canonical = stored_date(date_assign)
+        due, due_canonical = stored_date(due_date)
+        return (user, task, task_description, assign, due,
+                task_comp == "Yes",
+                None if assign_canonical else date_assign,
+                None if due_canonical else due_date)
+
+    def add(self, content: str):
+        with self._transaction():
+            cursor = self.connection.execute(
+                "INSERT INTO tasks (user, task, task_description, "
+                "date_assign, due, complete, date_assign_text, due_text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row(content))
+            task_id = cursor.lastrowid
+            self.index_words(task_id - 1)
+
+        return task_id
+
+    def add_many(self, contents):
+        with self._transaction():
+            last_id = self.connection.execute(
+                "SELECT COALESCE(MAX(id), -1) FROM tasks").fetchone()[0]
+            cursor = self.connection.executemany(
+                "INSERT INTO tasks (user, task, task_description, "
+                "date_assign, due, complete, date_assign_text, due_text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                map(self._row, contents))
+            self.index_words(last_id)
+
+        return cursor.rowcount
+
+    def index_words(self, after: int = -1):
+        """
+        Adds the words of the tasks with an id above after to the search
+        index, within the transaction of the caller.
+        """
+        # The rows are streamed into the inserts rather than fetched first
+        rows = self.connection.execute(
+            "SELECT id, task, task_description FROM tasks WHERE id > ?",
+            (after,))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO task_words (word, task_id) VALUES (?, ?)",
+            ((word, task_id) for task_id, task, task_description in rows
+             for word in search_words(f"{task} {task_description}")))
+
+    def edit(self, task_id: int, edit: dict, listed: dict = None,
+             version: int = None):
+        with self._transaction():
+            task = self.get(task_id)
+            if listed is not None and version != self.version():
+                edit = rebased_edit(task, edit, listed)
+            for key in JOURNAL_OPERATIONS.values():
+                if key in edit:
+                    task.set_field(key, edit[key])
+            self.connection.execute(
+                "UPDATE tasks SET user = ?, due = ?, complete = ?, "
+                "due_text = ? WHERE id = ?",
+                (task.user, task.due, task.complete,
+                 task.date_texts and task.date_texts[1], task_id))
+
+    def version(self):
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def report(self, rebuild: bool = False):
+        rows = self.connection.execute(
+            "SELECT user, COUNT(*), SUM(complete), "
+            "SUM(NOT complete AND due < ?) FROM tasks GROUP BY user",
+            (today_ordinal(),))
+        user_counts = {user: [total, completed, overdue]
+                       for user, total, completed, overdue in rows}
+        total_num_tasks = sum(counts[0] for counts in user_counts.values())
+        completed_tasks = sum(counts[1] for counts in user_counts.values())
+        report = {
+            "total": total_num_tasks,
+            "completed": completed_tasks,
+            "incompleted": total_num_tasks - completed_tasks,
+            "overdue": sum(counts[2] for counts in user_counts.values()),
+            "users": user_counts
+        }
+
+        return report
+
+    def close(self):
+        self.connection.close()
+
+    def users(self):
+        """
+        Returns the registered users and their passwords, in the order
+        they were registered, as returned by user_authentication.
+        """
+        rows = self.connection.execute(
+            "SELECT username, password FROM users ORDER BY rowid")
+        return dict(rows)
+
+    def add_user(self, username: str, password: str):
+        """
+        Registers a new user with password.
+        """
+        with self._transaction():
+            self.connection.execute(
+                "INSERT INTO users (username, password) VALUES (?, ?)",
+                (username, password))
+
+    def add_users(self, users):
+        """
+        Registers many users, given as (username, stored password) pairs,
+        in one transaction and returns the number registered.
+        """
+        with self._transaction():
+            cursor = self.connection.executemany(
+                "INSERT INTO users (username, password) VALUES (?, ?)",
+                users)
+
+        return cursor.rowcount
+
+    def new_users(self, after: int = 0):
+        """
+        Returns the rowid, username and password of each user registered
+        after the user with rowid after, in the order they registered.
+        """
+        return self.connection.execute(
+            "SELECT rowid, username, password FROM users WHERE rowid > ? "
+            "ORDER BY rowid", (after,)).fetchall()
+
+    def set_passwords(self, passwords: dict):
+        """
+        Replaces the stored password of each user in passwords.
+        """
+        with self._transaction():
+            self.connection.executemany(
+                "UPDATE users SET password = ? WHERE username = ?",
+                ((password, username)
+                 for username, password in passwords.items()))
+
+
+def database_filename(filename: str):
+    """
+    A function that returns the name of the SQLite database kept next
+    to a tasks or users .txt file.
+
+    Args:
+        filename(str): The name of the tasks or users .txt file
+
+    Returns:
+        database(str): The name of the database
+    """
+    return sibling_filename(filename, DATABASE_NAME)
+
+
+@instrumented
+def import_database(tasks_filename: str, users_filename: str,
+                    database: str):
+    """
+    A function that replaces the tasks and users held in database with
+    those of the tasks and users .txt files. The tasks are streamed from
+    the file and inserted in batches of IMPORT_BATCH_SIZE in a single
+    transaction.
+
+    Args:
+        tasks_filename(str): The .txt file that contains the tasks
+        users_filename(str): The .txt file that contains the users
+        database(str): The .db file to import into
+
+    Returns:
+        total_tasks(int): The number of tasks imported
+    """
+    storage = SQLiteStorage(database)
+    connection = storage.connection
+    total_tasks = 0
+    with connection, task_lock(tasks_filename):
+        connection.execute("DELETE FROM tasks")
+        connection.execute("DELETE FROM users")
+        connection.execute("DELETE FROM task_words")
+        connection.executemany(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            (line.strip().split(", ")
+             for line in read_file(users_filename, "r+") if line.strip()))
+        batch = []
+        for task in iter_tasks(tasks_filename):
+            assign_text, due_text = task.date_texts or (None, None)
+            batch.append((task.task_id, task.user, task.task,
+                          task.task_description, task.date_assign, task.due,
+                          task.complete, assign_text, due_text))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                connection.executemany(
+                    f"INSERT INTO tasks ({TASK_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                total_tasks += len(batch)
+                batch = []
+        connection.executemany(
+            f"INSERT INTO tasks ({TASK_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        total_tasks += len(batch)
+        storage.index_words()
+    storage.close()
+
+    return total_tasks
+
+
+def read_task_lines(source: str, users: dict):
+    """
+    A generator that yields the task lines of a .txt file in the format
+    returned by add_task, one task per line, after checking that each is
+    a valid task of a registered user. The file may be in the current
+    line format, under its header, or in the legacy one.
+
+    Args:
+        source(str): The .txt file of the tasks to import
+        users(dict): The registered users
+
+    Yields:
+        content(str): The next task line
+
+    Raises:
+        ValueError: If a line is not a valid task
+    """
+    with open(source, encoding="utf-8") as file:
+        escaped = file.readline().strip() == FORMAT_HEADER
+        file.seek(0)
+        for number, line in enumerate(file, 1):
+            content = line.strip()
+            if content and content != FORMAT_HEADER:
+                fields = (split_fields(content) if escaped
+                          else legacy_fields(content))
+                yield check_task_fields(fields, users,
+                                        f"Line {number} of {source}")
+
+
+def check_task_fields(fields: list, users: dict, where: str):
+    """
+    A function that checks that the fields of a task to import make a
+    valid task of a registered user. Only the title and description may
+    hold line breaks, which are escaped in the tasks file.
+
+    Args:
+        fields(list): The values of TASK_RECORD_FIELDS, in order
+        users(dict): The registered users
+        where(str): Where the task was read from, for the error message
+
+    Returns:
+        content(str): The task line, in the format returned by add_task
+
+    Raises:
+        ValueError: If the fields are not a valid task
+    """
+    if (len(fields) != len(TASK_RECORD_FIELDS)
+            or fields[5] not in ("Yes", "No")
+            or any("\n" in field or "\r" in field
+                   for field in (fields[0], *fields[3:]))):
+        raise ValueError(f"{where} is not a task")
+    if fields[0] not in users:
+        raise ValueError(f"{where} is assigned to an unregistered user")
+    try:
+        date_ordinal(fields[3])
+        date_ordinal(fields[4])
+    except ValueError:
+        raise ValueError(f"{where} has a date not in the dd mon yyyy "
+                         "format") from None
+    content = join_fields(fields)
+
+    return content
+
+
+def record_format(path: str, chosen: str = None):
+    """
+    A function that returns the format of a file that tasks or users are
+    imported from or exported to: the format chosen, or otherwise the
+    one of the extension of the file.
+
+    Args:
+        path(str): The file to import from or export to
+        chosen(str): "txt", "csv" or "jsonl", or None to go by the
+        extension
+
+    Returns:
+        file_format(str): "txt", "csv" or "jsonl"
+
+    Raises:
+        ValueError: If the format cannot be told from the extension
+    """
+    file_format = chosen or RECORD_FORMATS.get(
+        os.path.splitext(path)[1].lower())
+    if file_format not in RECORD_FORMATS.values():
+        raise ValueError(f"The format of {path} is not known, choose one "
+                         "with --format")
+
+    return file_format
+
+
+def read_records(source: str, fields: tuple, file_format: str):
+    """
+    A generator that streams the records of a CSV file with a header row,
+    or of a JSON lines file of objects, one record at a time, with the
+    values of fields as strings.
+
+    Args:
+        source(str): The file to read
+        fields(tuple): The fields every record must have
+        file_format(str): "csv" or "jsonl"
+
+    Yields:
+        where(str): Where the record was read from, for error messages
+        values(list): The values of fields in the record, in order
+
+    Raises:
+        ValueError: If a record is not valid or lacks one of fields
+    """
+    with open(source, encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            rows = csv.reader(file)
+            header = next(rows, [])
+            try:
+                columns = [header.index(field) for field in fields]
+            except ValueError:
+                raise ValueError(f"The header of {source} does not name "
+                                 f"every one of {', '.join(fields)}") \
+                    from None
+            for row in rows:
+                if not row:
+                    continue
+                where = f"Line {rows.line_num} of {source}"
+                try:
+                    yield where, [row[column].strip() for column in columns]
+                except IndexError:
+                    raise ValueError(f"{where} is missing fields") from None
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            where = f"Line {number} of {source}"
+            try:
+                record = json.loads(line)
+                yield where, [str(record[field]).strip() for field in fields]
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{where} is not an object with every one "
+                                 f"of {', '.join(fields)}") from None
+
+
+def read_task_records(source: str, users: dict, chosen: str = None):
+    """
+    A generator that yields the task lines of a file of tasks to import,
+    in the format returned by add_task, after checking that each is a
+    valid task of a registered user. The file may be in the format of
+    tasks.txt without ids, or a CSV or JSON lines file with the fields
+    of TASK_RECORD_FIELDS.
+
+    Args:
+        source(str): The file of the tasks to import
+        users(dict): The registered users
+        chosen(str): The format of source, or None to go by its
+        extension
+
+    Yields:
+        content(str): The next task line
+
+    Raises:
+        ValueError: If a record is not a valid task
+    """
+    file_format = record_format(source, chosen)
+    if file_format == "txt":
+        yield from read_task_lines(source, users)
+        return
+    for where, fields in read_records(source, TASK_RECORD_FIELDS,
+                                      file_format):
+        yield check_task_fields(fields, users, where)
+
+
+def write_records(destination: str, fields: tuple, records,
+                  file_format: str, escaped: bool = False):
+    """
+    A function that streams records to destination through a BatchWriter,
+    as a CSV file with a header row, a JSON lines file of objects or, for
+    "txt", lines of values joined by ", " as in user.txt, or as in
+    tasks.txt, escaped and under the format header, if escaped is set.
+
+    Args:
+        destination(str): The file to write
+        fields(tuple): The names of the values of each record
+        records(iterable): The values of each record, in the order of
+        fields
+        file_format(str): "txt", "csv" or "jsonl"
+        escaped(bool): Whether "txt" lines are in the line format of the
+        tasks file
+
+    Returns:
+        total_records(int): The number of records written
+    """
+    total_records = 0
+    with BatchWriter(destination) as writer:
+        if file_format == "csv":
+            rows = csv.writer(writer, lineterminator="\n")
+            rows.writerow(fields)
+            write = rows.writerow
+        elif file_format == "jsonl":
+            def write(values):
+                writer.write(json.dumps(dict(zip(fields, values))) + "\n")
+        else:
+            join = join_fields if escaped else ", ".join
+            if escaped:
+                writer.write(f"{FORMAT_HEADER}\n")
+
+            def write(values):
+                writer.write(join(values) + "\n")
+        for values in records:
+            write(values)
+            total_records += 1
+
+    return total_records
+
+
+@instrumented
+def import_tasks(filename: str, source: str, users: dict,
+                 chosen: str = None):
+    """
+    A function that adds every task of source to the tasks of filename
+    in batches, streaming source so that memory use stays flat. Every
+    record is checked before any task is added, so a source with an
+    invalid record adds nothing.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        source(str): The .txt, CSV or JSON lines file of the tasks to
+        import, as read by read_task_records
+        users(dict): The registered users
+        chosen(str): The format of source, or None to go by its
+        extension
+
+    Returns:
+        total_tasks(int): The number of tasks imported
+    """
+    for _ in read_task_records(source, users, chosen):
+        pass
+
+    return get_storage(filename).add_many(
+        read_task_records(source, users, chosen))
+
+
+@instrumented
+def export_tasks(filename: str, destination: str, chosen: str = None):
+    """
+    A function that writes every task of filename to destination, as a
+    CSV or JSON lines file with the task ids, or in the format of
+    tasks.txt without them, so that it can be imported again.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        destination(str): The file to write the tasks to
+        chosen(str): The format of destination, or None to go by its
+        extension
+
+    Returns:
+        total_tasks(int): The number of tasks exported
+    """
+    file_format = record_format(destination, chosen)
+    fields = (TASK_RECORD_FIELDS if file_format == "txt"
+              else tuple(TASK_ATTRIBUTES))
+    records = ([task.get_field(key) for key in fields]
+               for task in get_storage(filename).tasks())
+
+    return write_records(destination, fields, records, file_format,
+                         escaped=True)
+
+
+@instrumented
+def export_database(database: str, tasks_filename: str,
+                    users_filename: str):
+    """
+    A function that replaces the tasks and users .txt files with the
+    tasks and users held in database. Any journal and search index left
+    next to the tasks file are removed, as they describe the file being
+    replaced.
+
+    Args:
+        database(str): The .db file to export from
+        tasks_filename(str): The .txt file to write the tasks to
+        users_filename(str): The .txt file to write the users to
+
+    Returns:
+        total_tasks(int): The number of tasks exported
+    """
+    storage = SQLiteStorage(database)
+    with task_lock(tasks_filename, exclusive=True):
+        note_write(tasks_filename)
+        file_overwrite(tasks_filename, storage.tasks())
+        for filename in (journal_filename(tasks_filename),
+                         search_index_filename(tasks_filename)):
+            try:
+                os.remove(path_directory(filename))
+            except FileNotFoundError:
+                pass
+        build_task_index(tasks_filename)
+    with BatchWriter(users_filename) as writer:
+        for position, (username, password) in enumerate(
+                storage.users().items()):
+            writer.write(f"{username}, {password}" if position == 0
+                         else f"\n{username}, {password}")
+    total_tasks = storage.count()
+    storage.close()
+
+    return total_tasks
+
+
+# Stores one TaskStorage per backend and file so every menu action
+# shares it
+storages = {}
+
+
+def get_storage(filename: str, backend: str = None):
+    """
+    A function that returns the TaskStorage that the tasks of filename
+    are kept in, creating it on first use. The backend defaults to the
+    one set by TASK_MANAGER_BACKEND, and the SQLite database is kept next
+    to filename, so the users .txt file maps to the same storage. The
+    database is filled from the tasks.txt and user.txt next to it when it
+    does not exist yet, and the shards are likewise split from the tasks
+    .txt file.
+
+    Args:
+        filename(str): The tasks or users .txt file
+        backend(str): "text", "sqlite" or "sharded"
+
+    Returns:
+        storage(TaskStorage): The storage of the tasks of filename
+    """
+    backend = backend or BACKEND
+    if backend == "sqlite":
+        tasks_filename = sibling_filename(filename, "tasks.txt")
+        users_filename = sibling_filename(filename, "user.txt")
+        filename = database_filename(filename)
+        # The database is created from the text files on first use
+        if not os.path.exists(path_directory(filename)) and all(
+                os.path.exists(path_directory(name))
+                for name in (tasks_filename, users_filename)):
+            import_database(tasks_filename, users_filename, filename)
+    elif STREAMING and backend == "text":
+        backend = "streaming"
+    key = (backend, filename)
+    if key not in storages:
+        if backend == "sqlite":
+            storages[key] = SQLiteStorage(filename)
+        elif backend == "streaming":
+            storages[key] = StreamingStorage(filename)
+        elif backend == "sharded":
+            storages[key] = ShardedStorage(filename)
+        else:
+            storages[key] = TextStorage(filename)
+
+    return storages[key]
+
+
+# ------------------------------- User-Store ------------------------------ #
+
+# Passwords are stored as "pbkdf2_sha256$iterations$salt$hash" so that the
+# cost of each hash is kept with it, and TASK_MANAGER_KDF_ITERATIONS can
+# raise the cost of new passwords without breaking the stored ones
+PASSWORD_SCHEME = "pbkdf2_sha256"
+KDF_ITERATIONS = int(os.environ.get("TASK_MANAGER_KDF_ITERATIONS", 600_000))
+SALT_SIZE = 16
+# Number of successful logins remembered, so that a user logging in again
+# to a long running process is not made to wait for the hash again
+VERIFY_CACHE_SIZE = 1024
+# The cache keeps a keyed digest of each password rather than the
+# password, with a key that only lives as long as the process
+VERIFY_CACHE_KEY = os.urandom(32)
+
+
+def hash_password(password: str, iterations: int = None):
+    """
+    A function that hashes password with a new random salt, to be stored
+    in place of the password.
+
+    Args:
+        password(str): The password to hash
+        iterations(int): The cost of the hash, defaulting to
+        KDF_ITERATIONS
+
+    Returns:
+        stored(str): The scheme, cost, salt and hash of the password
+    """
+    iterations = iterations or KDF_ITERATIONS
+    salt = os.urandom(SALT_SIZE)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt,
+                                 iterations)
+    stored = f"{PASSWORD_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+    return stored
+
+
+def is_password_hash(stored: str):
+    """
+    A function that checks whether a stored password is a hash made by
+    hash_password rather than a plaintext password of a user.txt file
+    written before passwords were hashed.
+
+    Args:
+        stored(str): The stored password
+
+    Returns:
+        hashed(bool): True if stored is a hash
+    """
+    parts = stored.split("$")
+    hashed = len(parts) == 4 and parts[0] == PASSWORD_SCHEME
+
+    return hashed
+
+
+# Maps each stored hash to the keyed digest of the password last
+# verified against it, oldest first
+verified_passwords = {}
+
+
+@instrumented
+def verify_password(stored: str, password: str):
+    """
+    A function that checks password against the stored password of a
+    user. Successful checks against a hash are cached, so that repeated
+    logins skip the hash, and a changed password misses the cache as its
+    hash has a new salt.
+
+    Args:
+        stored(str): The stored password, or None for an unknown user
+        password(str): The password given by the user
+
+    Returns:
+        verified(bool): True if password matches
+    """
+    if stored is None:
+        return False
+    if not is_password_hash(stored):
+        return hmac.compare_digest(stored.encode("utf-8"),
+                                   password.encode("utf-8"))
+    digest = hmac.digest(VERIFY_CACHE_KEY, password.encode("utf-8"),
+                         "sha256")
+    cached = verified_passwords.get(stored)
+    if cached is not None and hmac.compare_digest(cached, digest):
+        return True
+    _, iterations, salt, expected = stored.split("$")
+    derived = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"),
+                                  bytes.fromhex(salt), int(iterations))
+    verified = hmac.compare_digest(derived.hex(), expected)
+    if verified:
+        if len(verified_passwords) >= VERIFY_CACHE_SIZE:
+            del verified_passwords[next(iter(verified_passwords))]
+        verified_passwords[stored] = digest
+
+    return verified
+
+
+class UserStore:
+    """
+    A class that keeps the registered users and their stored passwords in
+    memory. The users .txt file is read once, after which only what was
+    appended to it since is read, so registering a user reads back a
+    single line. A file that was replaced, such as by hash_passwords, is
+    read again in full. With the SQLite backend the users registered
+    since are fetched by rowid instead.
+
+    Attributes:
+        filename(str): The .txt file that the users are loaded from
+        users(dict): The stored password of each username, in the order
+        they were registered
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.users = {}
+        # How far the file, or the users table by rowid, has been read
+        self._offset = 0
+        self._inode = None
+
+    @instrumented
+    def refresh(self):
+        """
+        Reads the users registered since the last refresh and returns the
+        store.
+        """
+        if BACKEND == "sqlite":
+            storage = get_storage(self.filename)
+            for rowid, username, password in storage.new_users(self._offset):
+                self.users[username] = password
+                self._offset = rowid
+            return self
+        file_path = path_directory(self.filename)
+        stat = os.stat(file_path)
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Cleared rather than replaced, as the menu holds on to it
+            self.users.clear()
+            self._offset = 0
+            self._inode = stat.st_ino
+        if stat.st_size > self._offset:
+            with open(file_path, mode="rb") as file:
+                file.seek(self._offset)
+                appended = file.read()
+            self._offset += len(appended)
+            for line in appended.decode("utf-8").splitlines():
+                if line.strip():
+                    username, password = line.strip().split(", ")
+                    self.users[username] = password
+
+        return self
+
+    def register(self, username: str, password: str):
+        """
+        Registers username with a hash of password, and reads it back
+        into the store.
+        """
+        stored = hash_password(password)
+        if BACKEND == "sqlite":
+            get_storage(self.filename).add_user(username, stored)
+        else:
+            write_file(self.filename, "a+", f"\n{username}, {stored}")
+        self.refresh()
+
+    def register_many(self, users):
+        """
+        Registers many users, given as (username, stored password) pairs
+        with the passwords already hashed, in one batch, reads them back
+        into the store and returns the number registered.
+        """
+        if BACKEND == "sqlite":
+            total_users = get_storage(self.filename).add_users(users)
+        else:
+            total_users = 0
+            with BatchWriter(self.filename, "a") as writer:
+                for username, stored in users:
+                    writer.write(f"\n{username}, {stored}")
+                    total_users += 1
+        self.refresh()
+
+        return total_users
+
+    def verify(self, username: str, password: str):
+        """
+        Returns whether password is that of username.
+        """
+        return verify_password(self.users.get(username), password)
+
+
+# Stores one UserStore per filename so every menu action shares it
+user_stores = {}
+
+
+def get_user_store(filename: str):
+    """
+    A function that returns the up to date UserStore for filename,
+    creating it on first use.
+
+    Args:
+        filename(str): The .txt file that contains the users
+
+    Returns:
+        store(UserStore): The store holding the users of filename
+    """
+    if filename not in user_stores:
+        user_stores[filename] = UserStore(filename)
+    store = user_stores[filename].refresh()
+
+    return store
+
+
+@instrumented
+def hash_passwords(filename: str, iterations: int = None):
+    """
+    A function that replaces every plaintext password of the users of
+    filename with its hash. Passwords that are already hashed are kept.
+    This is the only way plaintext passwords are hashed: logging in
+    with one checks it as it is and leaves it in the file.
+
+    Args:
+        filename(str): The .txt file that contains the users
+        iterations(int): The cost of the hashes, defaulting to
+        KDF_ITERATIONS
+
+    Returns:
+        total_hashed(int): The number of passwords hashed
+    """
+    users = get_user_store(filename).users
+    hashed = {username: hash_password(password, iterations)
+              for username, password in users.items()
+              if not is_password_hash(password)}
+    if BACKEND == "sqlite":
+        get_storage(filename).set_passwords(hashed)
+    else:
+        with BatchWriter(filename) as writer:
+            for position, (username, password) in enumerate(users.items()):
+                password = hashed.get(username, password)
+                writer.write(f"{username}, {password}" if position == 0
+                             else f"\n{username}, {password}")
+    users.update(hashed)
+    total_hashed = len(hashed)
+
+    return total_hashed
+
+
+def read_user_records(source: str, users: dict, chosen: str = None):
+    """
+    A generator that yields the users of a file of users to import, after
+    checking that each is a new user with a password. The file may be in
+    the format of user.txt, or a CSV or JSON lines file with the fields
+    of USER_RECORD_FIELDS.
+
+    Args:
+        source(str): The file of the users to import
+        users(dict): The registered users
+        chosen(str): The format of source, or None to go by its
+        extension
+
+    Yields:
+        username(str): The name of the next user
+        password(str): Their password, as plaintext or a hash
+
+    Raises:
+        ValueError: If a record is not a valid new user
+    """
+    file_format = record_format(source, chosen)
+    if file_format == "txt":
+        def read():
+            with open(source, encoding="utf-8") as file:
+                for number, line in enumerate(file, 1):
+                    if line.strip():
+                        yield (f"Line {number} of {source}",
+                               line.strip().split(", "))
+        records = read()
+    else:
+        records = read_records(source, USER_RECORD_FIELDS, file_format)
+    # Only the names are kept, to catch a user listed twice
+    seen = set()
+    for where, fields in records:
+        if (len(fields) != len(USER_RECORD_FIELDS) or not all(fields)
+                or any(", " in field or "\n" in field for field in fields)):
+            raise ValueError(f"{where} is not a user")
+        username, password = fields
+        if username in users or username in seen:
+            raise ValueError(f"{where} is a user that is already "
+                             "registered")
+        seen.add(username)
+        yield username, password
+
+
+@instrumented
+def import_users(filename: str, source: str, chosen: str = None,
+                 iterations: int = None):
+    """
+    A function that registers every user of source in one batch,
+    streaming source so that only the names are held in memory. Every
+    record is checked before any user is registered, so a source with an
+    invalid record registers no one. Plaintext passwords are hashed and
+    hashed passwords kept as they are.
+
+    Args:
+        filename(str): The .txt file that contains the users
+        source(str): The file of the users to import, as read by
+        read_user_records
+        chosen(str): The format of source, or None to go by its
+        extension
+        iterations(int): The cost of the hashes, defaulting to
+        KDF_ITERATIONS
+
+    Returns:
+        total_users(int): The number of users registered
+    """
+    store = get_user_store(filename)
+    for _ in read_user_records(source, store.users, chosen):
+        pass
+    new_users = ((username, password if is_password_hash(password)
+                  else hash_password(password, iterations))
+                 for username, password in
+                 read_user_records(source, store.users, chosen))
+
+    return store.register_many(new_users)
+
+
+@instrumented
+def export_users(filename: str, destination: str, chosen: str = None):
+    """
+    A function that writes every user of filename and their stored
+    password to destination, in the format of user.txt or as a CSV or
+    JSON lines file.
+
+    Args:
+        filename(str): The .txt file that contains the users
+        destination(str): The file to write the users to
+        chosen(str): The format of destination, or None to go by its
+        extension
+
+    Returns:
+        total_users(int): The number of users exported
+    """
+    users = get_user_store(filename).users
+
+    return write_records(destination, USER_RECORD_FIELDS, users.items(),
+                         record_format(destination, chosen))
+
+
+# ---------------------------------- Login -------------------------------- #
+
+
+def login(users: dict):
+    """
+    A function that asks for a username and password until they match
+    those of a registered user.
+
+    Args:
+        users(dict): The registered users and their passwords, as
+        returned by user_authentication
+
+    Returns:
+        username(str): The username of the user that has logged in
+    """
+    while True:
+        # Use defensive means to ensure username is stored in lowercaps
+        username = input('Please provide username to login: ').lower()
+        # Check whether user input, "username" is in our users list
+        if username in users.keys():
+            print(f"Hello {username.title()}, please provide your", end=" ")
+            password_request = input("password: ")
+            # Use .get() function to access the stored password of the
+            # user, which is checked against the hash
+            if verify_password(users.get(username), password_request):
+                print("Password correct!", end=" ")
+                print(f"Welcome back, {username.title()}!\n")
+                return username
+            else:
+                print('\nOops, that doesnt seem right,', end=' ')
+                print("Let's try that again.")
+        else:
+            print('Username name on database. Please ensure', end=' ')
+            print('you are providing the correct login details\n')
+
+# --------------------------------- Server -------------------------------- #
+
+# The server reads one JSON request per line and writes one JSON reply per
+# line, in the order the requests were sent on each connection
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+# Longest request line that is read before the connection is dropped
+SERVER_LINE_LIMIT = 1 << 16
+# Values of a field that would break the views of the tasks, which show
+# each field on a line of its own
+UNSAFE_VALUES = ("\n", "\r")
+
+
+def check_value(name: str, value):
+    """
+    A function that checks a value sent to the server for a field of a
+    task, which must fit on one line.
+
+    Args:
+        name(str): The name of the field, for the error message
+        value: The value sent for the field
+
+    Returns:
+        value(str): The value, without surrounding blank space
+
+    Raises:
+        ValueError: If value is not a string that fits on one line
+    """
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{name} must be a non-empty string")
+    if any(unsafe in value for unsafe in UNSAFE_VALUES):
+        raise ValueError(f"{name} cannot contain line breaks")
+
+    return value.strip()
+
+
+def check_due_date(value):
+    """
+    A function that checks a due date sent to the server.
+
+    Args:
+        value: The value sent for the due date
+
+    Returns:
+        due_date(str): The due date in {dd mon yyyy} format
+
+    Raises:
+        ValueError: If value is not a date in {dd mon yyyy} format
+    """
+    due_date = check_value("due_date", value).title()
+    try:
+        date_ordinal(due_date)
+    except ValueError:
+        raise ValueError("due_date must be in {dd mon yyyy} format") \
+            from None
+
+    return due_date
+
+
+def check_text(name: str, value):
+    """
+    A function that checks that a value sent to the server, such as a
+    user name or a password, is text.
+
+    Args:
+        name(str): The name of the field, for the error message
+        value: The value sent for the field
+
+    Returns:
+        value(str): The value
+
+    Raises:
+        ValueError: If value is not a string
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be text")
+
+    return value
+
+
+def check_task_id(value):
+    """
+    A function that checks a task id sent to the server, which may be
+    sent as a number or as the text of one.
+
+    Args:
+        value: The value sent for the task id
+
+    Returns:
+        task_id(int): The task id
+
+    Raises:
+        ValueError: If value is not a whole number
+    """
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError("task_id must be a whole number")
+
+    return value
+
+
+class TaskServer:
+    """
+    A class that serves the menu actions to many clients at once, over a
+    JSON-lines protocol, from a storage and user store that every
+    connection shares, so that the tasks stay loaded between requests.
+    Each request is an object with an "op" naming the action and its
+    arguments, and may carry an "id" that is copied to its reply. Each
+    reply has "ok" and either the "result" or the "error".
+
+    The actions run on the event loop one at a time, as they are served
+    from memory. Only the password check of login is done in a worker
+    thread, so that a costly hash does not hold up the other clients.
+
+    Attributes:
+        tasks_filename(str): The .txt file that contains the tasks
+        users_filename(str): The .txt file that contains the users
+        operations(dict): The coroutine that serves each op
+    """
+
+    def __init__(self, tasks_filename: str = "tasks.txt",
+                 users_filename: str = "user.txt"):
+        self.tasks_filename = tasks_filename
+        self.users_filename = users_filename
+        self.operations = {
+            "login": self.login,
+            "add_task": self.add_task,
+            "view_all": self.view_all,
+            "view_my": self.view_my,
+            "edit": self.edit,
+            "statistics": self.statistics,
+            "generate_report": self.generate_report,
+        }
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter):
+        """
+        Serves the requests of one connection until the client closes it.
+        Each connection has its own session, holding the user logged in.
+        """
+        session = {"username": None}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.reply(session, line)
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # The client went away or sent a line over SERVER_LINE_LIMIT
+            pass
+        finally:
+            writer.close()
+
+    @instrumented
+    async def reply(self, session: dict, line: bytes):
+        """
+        Carries out the request of one line and returns its reply.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+            request_id = request.get("id")
+            op = request.get("op")
+            operation = (self.operations.get(op) if isinstance(op, str)
+                         else None)
+            if operation is None:
+                raise ValueError(f"Unknown op {op!r}")
+            if op != "login" and session["username"] is None:
+                raise PermissionError("Please log in first")
+            reply = {"ok": True,
+                     "result": await operation(session, request)}
+        except KeyError as error:
+            reply = {"ok": False, "error": f"Missing {error}"}
+        except (ValueError, TypeError, PermissionError) as error:
+            reply = {"ok": False, "error": str(error)}
+        if request_id is not None:
+            reply["id"] = request_id
+
+        return reply
+
+    def users(self):
+        """
+        Returns the registered users and their stored passwords.
+        """
+        return get_user_store(self.users_filename).users
+
+    def storage(self):
+        """
+        Returns the storage of the tasks.
+        """
+        return get_storage(self.tasks_filename)
+
+    @staticmethod
+    def check_admin(session: dict):
+        """
+        Raises PermissionError unless admin is logged in, as the admin
+        menu is the only one with these options.
+        """
+        if session["username"] != "admin":
+            raise PermissionError("Only admin can do this")
+
+    async def login(self, session: dict, request: dict):
+        """
+        Logs the connection in as username, if password matches.
+        """
+        username = check_text("username", request["username"]).lower()
+        password = check_text("password", request["password"])
+        stored = self.users().get(username)
+        verified = await asyncio.get_running_loop().run_in_executor(
+            None, verify_password, stored, password)
+        if not verified:
+            raise PermissionError("Wrong username or password")
+        session["username"] = username
+
+        return {"username": username}
+
+    async def add_task(self, session: dict, request: dict):
+        """
+        Assigns a new task to user, as add_task does.
+        """
+        taskee = check_text("user", request["user"])
+        if taskee not in self.users():
+            raise ValueError(f"User {taskee!r} has not been registered")
+        task_description = check_value("task_description",
+                                       request["task_description"])
+        if len(task_description) >= 255:
+            raise ValueError("task_description must be shorter than 255 "
+                             "characters")
+        content = new_task_content(taskee, check_value("task",
+                                                       request["task"]),
+                                   task_description,
+                                   check_due_date(request["due_date"]))
+        task_id = self.storage().add(content)
+
+        return {"task_id": task_id}
+
+    def view(self, request: dict, user: str = None):
+        """
+        Returns a page of the tasks, as the dictionaries returned by
+        task_dct, and the offset of the next page. The request may carry
+        the offset and limit of the page (of at most VIEW_PAGE_SIZE
+        tasks by default), "sort": "due" and the filters of query_tasks,
+        with the due dates in {dd mon yyyy} format and the words searched
+        for as text.
+        """
+        filters = {}
+        for key in ("offset", "limit"):
+            value = request.get(key)
+            if value is not None:
+                if not isinstance(value, int) or value < 0:
+                    raise ValueError(f"{key} must be a whole number")
+                filters[key] = value
+        filters.setdefault("limit", VIEW_PAGE_SIZE)
+        for key in ("completed", "overdue"):
+            value = request.get(key)
+            if value is not None:
+                if not isinstance(value, bool):
+                    raise ValueError(f"{key} must be true or false")
+                filters[key] = value
+        for key in ("due_from", "due_to"):
+            if request.get(key) is not None:
+                filters[key] = check_due_date(request[key])
+        if request.get("search") is not None:
+            if not isinstance(request["search"], str):
+                raise ValueError("search must be text")
+            filters["search"] = request["search"]
+        filters["sort_by_due"] = request.get("sort") == "due"
+        page, next_offset = query_tasks(self.tasks_filename, user,
+                                        **filters)
+
+        return {"tasks": [task.fields() for task in page],
+                "next": next_offset}
+
+    async def view_all(self, session: dict, request: dict):
+        """
+        Returns a page of the tasks of every user, or of the user given.
+        """
+        user = request.get("user")
+        if user is not None:
+            check_text("user", user)
+
+        return self.view(request, user)
+
+    async def view_my(self, session: dict, request: dict):
+        """
+        Returns a page of the tasks of the user logged in.
+        """
+        return self.view(request, session["username"])
+
+    async def edit(self, session: dict, request: dict):
+        """
+        Applies changes to a task of the user logged in, which as in
+        edit_my_tasks may be marking it complete, reassigning it or
+        changing its due date, and returns the edited task. Only the
+        changed values are applied, so changes that other processes made
+        to the task in the meantime are kept.
+        """
+        task_id = check_task_id(request["task_id"])
+        changes = request["changes"]
+        if not isinstance(changes, dict):
+            raise ValueError("changes must be a JSON object")
+        storage = self.storage()
+        version = storage.version()
+        try:
+            task = storage.get(task_id)
+        except KeyError:
+            raise ValueError(f"No task with id {task_id}") from None
+        if task.user != session["username"]:
+            raise PermissionError("Only tasks assigned to you can be edited")
+        if task.complete:
+            raise ValueError("A completed task cannot be edited")
+        listed = task.fields()
+        edit = dict(listed)
+        for key, value in changes.items():
+            if key == "task_comp" and value == "Yes":
+                edit[key] = value
+            elif (key == "user" and isinstance(value, str)
+                    and value in self.users()):
+                edit[key] = value
+            elif key == "due_date":
+                edit[key] = check_due_date(value)
+            else:
+                raise ValueError(f"Cannot change {key} to {value!r}")
+        storage.edit(task.task_id, edit, listed, version)
+
+        return storage.get(task.task_id).fields()
+
+    async def statistics(self, session: dict, request: dict):
+        """
+        Returns the number of users and of tasks, as statistics shows.
+        """
+        self.check_admin(session)
+
+        return {"total_users": len(self.users()),
+                "total_tasks": self.storage().count()}
+
+    async def generate_report(self, session: dict, request: dict):
+        """
+        Writes the reports from a full count of the tasks, as
+        generate_report does, and returns where they were written.
+        """
+        self.check_admin(session)
+        generate_report(self.tasks_filename, self.users())
+
+        return {name: sibling_filename(self.tasks_filename, name)
+                for name in ("task_overview.txt", "user_overview.txt")}
+
+
+async def serve(server: TaskServer, host: str = SERVER_HOST,
+                port: int = SERVER_PORT, path: str = None):
+    """
+    A coroutine that serves server on a Unix socket at path, or on a TCP
+    port of host when no path is given, until it is cancelled.
+
+    Args:
+        server(TaskServer): The server of the tasks
+        host(str): The address to listen on
+        port(int): The TCP port to listen on
+        path(str): The Unix socket to listen on instead
+    """
+    if path is not None:
+        listener = await asyncio.start_unix_server(
+            server.handle, path, limit=SERVER_LINE_LIMIT)
+        address = path
+    else:
+        listener = await asyncio.start_server(
+            server.handle, host, port, limit=SERVER_LINE_LIMIT)
+        address = f"{host}:{port}"
+    async with listener:
+        print(f"Serving {server.tasks_filename} on {address}", flush=True)
+        await listener.serve_forever()
+
+
+def run_server(tasks_filename: str, users_filename: str,
+               host: str = SERVER_HOST, port: int = SERVER_PORT,
+               path: str = None):
+    """
+    A function that loads the tasks and users and serves them until the
+    server is interrupted, and then writes out anything still pending.
+
+    Args:
+        tasks_filename(str): The .txt file that contains the tasks
+        users_filename(str): The .txt file that contains the users
+        host(str): The address to listen on
+        port(int): The TCP port to listen on
+        path(str): The Unix socket to listen on instead
+    """
+    # Load the tasks and users before the first client connects
+    storage = get_storage(tasks_filename)
+    storage.count()
+    get_user_store(users_filename)
+    try:
+        asyncio.run(serve(TaskServer(tasks_filename, users_filename),
+                          host, port, path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        storage.close()
+
+# ---------------------------------- Menu -------------------------------- #
+
+
+def browse_tasks(filename: str, users: dict, filters: dict = None):
+    """
+    A function that shows the tasks of every user a page at a time, and
+    lets the user move between the pages and filter and sort the tasks,
+    until they go back to the previous menu.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        users(dict): The registered users, which tasks can be filtered by
+        filters(dict): The filters and sort order to start with, as
+        taken by query_tasks
+    """
+    filters = dict(filters or {})
+    offset = 0
+    while True:
+        page, next_offset = query_tasks(filename, offset=offset,
+                                        limit=VIEW_PAGE_SIZE, **filters)
+        if page:
+            print(f"\nTasks {offset + 1} to {offset + len(page)}:")
+            print_views(task_views(page))
+        else:
+            print("\nThere are no tasks to show.\n")
+        choice = page_menu(offset, next_offset)
+        if choice == "n" and next_offset is not None:
+            offset = next_offset
+        elif choice == "p" and offset > 0:
+            offset = max(0, offset - VIEW_PAGE_SIZE)
+        elif choice == "f":
+            filters = filter_menu(users)
+            offset = 0
+        elif choice == "-1":
+            break
+        else:
+            print("Please ensure to have made the correct input.")
+
+
+def due_tasks(filename: str, users: dict, soon: bool = False):
+    """
+    A function that shows how many overdue tasks, or tasks due soon,
+    each user has, and then the tasks themselves a page at a time, the
+    most urgent first. For the tasks due soon, the number of days ahead
+    is asked for.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        users(dict): The registered users, which tasks can be filtered by
+        soon(bool): Whether to show the tasks due soon rather than the
+        overdue tasks
+    """
+    days = 0
+    if soon:
+        while True:
+            answer = input("Number of days ahead to show the tasks due "
+                           f"for (default {DUE_SOON_DAYS}): ").strip()
+            if not answer:
+                days = DUE_SOON_DAYS
+                break
+            if answer.isdigit():
+                days = int(answer)
+                break
+            print("Please provide a whole number of days.\n")
+    today = today_ordinal()
+    # No date can be shown past the last day of year 9999
+    days = min(days, date.max.toordinal() - today)
+    counts = due_counts(filename, days)
+    if soon:
+        filters = {"completed": False, "due_from": date_text(today),
+                   "due_to": date_text(today + days), "sort_by_due": True}
+        print(f"\nTasks due by {date_text(today + days)} per user:")
+    else:
+        filters = {"overdue": True, "sort_by_due": True}
+        print("\nOverdue tasks per user:")
+    for user, count in sorted(counts.items()):
+        if count[soon]:
+            print(f"{user.title()}: {count[soon]}")
+    browse_tasks(filename, users, filters)
+
+
+def edit_my_tasks(filename: str, username: str, users: dict):
+    """
+    A function that shows the tasks of the user that is logged in a page
+    at a time and lets them mark a task as complete, reassign it or
+    change its due date, move between the pages or filter and sort the
+    tasks, until they go back to the previous menu.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        username(str): The user that is logged in
+        users(dict): The registered users, which tasks can be reassigned
+        to
+    """
+    filters = {}
+    offset = 0
+    print(f"\nTasks for {username.title()}:\n")
+
+    show_page = True
+    while True:
+        if show_page:
+            # Edits made from a listing that other users have since
+            # changed only apply the changes made here
+            version = get_storage(filename).version()
+            # Only the tasks of the page are fetched and formatted
+            page, next_offset = query_tasks(
+                filename, username, offset=offset, limit=VIEW_PAGE_SIZE,
+                **filters)
+            print_views(task_views(page, offset + 1))
+            show_page = False
+        try:
+            print("\nPlease provide the index of the task", end=" ")
+            print("you'd like to edit,", end=" ")
+            if next_offset is not None:
+                print("n for the next page,", end=" ")
+            if offset > 0:
+                print("p for the previous page,", end=" ")
+            print("f to filter and sort the tasks, or return", end=" ")
+            edit = input("-1 to go back to the previous menu: ").strip()
+            if edit in ("n", "p", "f"):
+                if edit == "n" and next_offset is not None:
+                    offset = next_offset
+                elif edit == "p":
+                    offset = max(0, offset - VIEW_PAGE_SIZE)
+                elif edit == "f":
+                    filters = filter_menu(users, ask_user=False)
+                    offset = 0
+                show_page = True
+                continue
+            edit = int(edit)
+            if edit == -1:
+                break
+            elif offset < edit <= offset + len(page):
+                # Subtract the tasks of the previous pages and -1 to
+                # ignore zero-indexing
+                _task = page[edit - offset - 1].fields()
+                # Remove blank spaces from values using dict
+                # comprehension
+                _task = {idx: value.strip()
+                         for idx, value in _task.items()}
+                listed = dict(_task)
+                print("\nTASK SELECTED:")
+                print(f"{view_format(**_task)}\n")
+                # Strips any blank space from the input value
+                selection = edit_menu().strip()
+                if ((selection == "e")
+                        & (_task["task_comp"].strip() == "No")):
+                    _task["task_comp"] = "Yes"
+                    # Overwrite the changes
+                    version = edit_overwrite(filename, _task, listed,
+                                             version)
+                    # Confirmation message to user
+                    print(f"\nTask: {_task['task']}", end=" ")
+                    print("has been successfully marked as", end=" ")
+                    print(f"complete for {_task['user'].title()}")
+                elif ((selection == "a")
+                      & (_task["task_comp"].strip() == "No")):
+                    reassign = input("\nUser to reassign task to: ")
+                    if reassign not in users.keys():
+                        print("Please ensure that user you", end=" ")
+                        print("are reassigning task to, is a", end=" ")
+                        print("validated user on the database\n")
+                    else:
+                        _task["user"] = reassign
+                        # Overwrite the changes
+                        version = edit_overwrite(filename, _task, listed,
+                                                 version)
+                        print("Task successfully", end=" ")
+                        print(f"reassigned to {reassign.title()}")
+                elif ((selection == "d")
+                      & (_task["task_comp"].strip() == "No")):
+                    while True:
+                        print("Provide the new due date for", end=" ")
+                        # Store the first letter of the month as
+                        # a capital
+                        reassign_date = input(
+                            "the task (dd mon yyyy): ").title()
+                        try:
+                            # date_ordinal() ensures the correct
+                            # format is provided. Returns value
+                            # error if wrong format provided
+                            date_ordinal(reassign_date)
+                            break
+                        except ValueError:
+                            print("Please provide the correct",
+                                  end=" ")
+                            print("format.\n")
+                    _task["due_date"] = reassign_date
+                    # Overwrite the changes
+                    version = edit_overwrite(filename, _task, listed,
+                                             version)
+                    # Confirmation message to user
+                    print(f"\nTask: {_task['task']} date", end=" ")
+                    print("has been successfully changed to", end=" ")
+                    print(f"{reassign_date} for", end=" ")
+                    print(f"{_task['user'].title()}")
+                elif ((selection == "a")
+                      & (_task["task_comp"].strip() == "Yes")):
+                    print("\nOops! You cannot reassign a", end=" ")
+                    print("completed task!")
+                else:
+                    print("\nInvalid Selection")
+                    show_page = True
+                # The task is listed again as it now is, so that a further
+                # edit of it from this page starts from this one
+                page[edit - offset - 1] = get_storage(filename).get(
+                    int(listed["task_id"]))
+            else:
+                print("\nInput provided is invalid. Please ", end=" ")
+                print("select a valid task number")
+                show_page = True
+        except ValueError:
+            print("Please ensure you have provided valid option\n")
+            show_page = True
+
+
+def view_reports(filename: str, users: dict):
+    """
+    A function that brings the reports up to date and prints them.
+
+    Args:
+        filename(str): The .txt file that contains the tasks
+        users(dict): The registered users, which are reported on
+    """
+    print("\nTo view a report, please generate a report first.")
+    print("1 - To generate a report")
+    print("0 - To go back to the previous menu")
+    answer = input("Submission: ")
+    if answer == "1":
+        refresh_report(filename, users)
+        t_overview = read_file(
+            sibling_filename(filename, "task_overview.txt"), "r")
+        u_overview = read_file(
+            sibling_filename(filename, "user_overview.txt"), "r")
+        print(f"\n{'*'*165}")
+        print(f"\n{t_overview}\n{'*'*165}\n{u_overview}")
+        print(f"\n{'*'*165}")
+    elif answer == "0":
+        return
+    else:
+        print("Please ensure valid option has been selected.")
+
+
+def parse_arguments(argv: list = None):
+    """
+    A function that parses the command line arguments of the task
+    manager. Without a command the interactive menu is run.
+
+    Args:
+        argv(list): The arguments, defaulting to those of the program
+
+    Returns:
+        arguments(argparse.Namespace): The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Task manager")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time the hot functions and print a summary "
+                             "when the session ends")
+    parser.add_argument("--profile", metavar="ACTION",
+                        help="run the menu selection ACTION, such as va or "
+                             "gr, under cProfile")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="profile the memory allocated by the --profile "
+                             "action with tracemalloc instead")
+    commands = parser.add_subparsers(dest="command")
+    for command, summary in (
+            ("import-db", "copy tasks.txt and user.txt into the database"),
+            ("export-db", "copy the database into tasks.txt and user.txt")):
+        subparser = commands.add_parser(command, help=summary)
+        subparser.add_argument("--tasks", default="tasks.txt")
+        subparser.add_argument("--users", default="user.txt")
+        subparser.add_argument("--database",
+                               help="defaults to task_manager.db next to "
+                                    "the tasks file")
+    formats = sorted(set(RECORD_FORMATS.values()))
+    for command, summary in (
+            ("import-tasks", "add every task of a CSV or JSON lines file, "
+                             "or of a file in the format of tasks.txt "
+                             "without ids"),
+            ("export-tasks", "write every task to a CSV, JSON lines or "
+                             ".txt file"),
+            ("import-users", "register every user of a CSV, JSON lines "
+                             "or .txt file"),
+            ("export-users", "write every user to a CSV, JSON lines or "
+                             ".txt file")):
+        subparser = commands.add_parser(command, help=summary)
+        subparser.add_argument("path", metavar=("source" if "import" in
+                                                command else "destination"))
+        subparser.add_argument("--format", choices=formats,
+                               help="defaults to the format of the "
+                                    "extension of the file")
+        subparser.add_argument("--tasks", default="tasks.txt")
+        subparser.add_argument("--users", default="user.txt")
+        if command == "import-users":
+            subparser.add_argument("--iterations", type=int,
+                                   help="cost of the hashes of plaintext "
+                                        "passwords (default: "
+                                        f"{KDF_ITERATIONS})")
+    subparser = commands.add_parser(
+        "hash-passwords", help="replace the plaintext passwords of "
+                               "user.txt with their hashes; they are "
+                               "not hashed at login, so until this is "
+                               "run they stay in plaintext")
+    subparser.add_argument("--users", default="user.txt")
+    subparser.add_argument("--iterations", type=int,
+                           help="cost of the hashes (default: "
+                                f"{KDF_ITERATIONS})")
+    subparser = commands.add_parser(
+        "serve", help="serve the tasks to many clients at once, as JSON "
+                      "lines over a socket")
+    subparser.add_argument("--tasks", default="tasks.txt")
+    subparser.add_argument("--users", default="user.txt")
+    subparser.add_argument("--host", default=SERVER_HOST)
+    subparser.add_argument("--port", type=int, default=SERVER_PORT)
+    subparser.add_argument("--socket",
+                           help="listen on this Unix socket instead of TCP")
+    subparser = commands.add_parser(
+        "report", help="count the tasks and write the reports, in "
+                       "parallel for the text backend")
+    subparser.add_argument("--tasks", default="tasks.txt")
+    subparser.add_argument("--users", default="user.txt")
+    subparser.add_argument("--workers", type=int, default=os.cpu_count(),
+                           help="number of worker processes (default: "
+                                "one per CPU)")
+
+    return parser.parse_args(argv)
+
+
+def transfer(arguments: argparse.Namespace):
+    """
+    A function that runs one of the bulk import and export commands and
+    prints how many tasks or users it moved and how fast. The file is
+    taken relative to the current directory.
+
+    Args:
+        arguments(argparse.Namespace): The parsed arguments
+    """
+    path = os.path.abspath(arguments.path)
+    start = time.perf_counter()
+    try:
+        if arguments.command == "import-tasks":
+            total = import_tasks(arguments.tasks, path,
+                                 user_authentication(arguments.users),
+                                 arguments.format)
+            summary = f"Imported {{}} tasks into {arguments.tasks}"
+        elif arguments.command == "export-tasks":
+            total = export_tasks(arguments.tasks, path, arguments.format)
+            summary = f"Exported {{}} tasks to {arguments.path}"
+        elif arguments.command == "import-users":
+            total = import_users(arguments.users, path, arguments.format,
+                                 arguments.iterations)
+            summary = f"Imported {{}} users into {arguments.users}"
+        else:
+            total = export_users(arguments.users, path, arguments.format)
+            summary = f"Exported {{}} users to {arguments.path}"
+    except (OSError, ValueError) as error:
+        verb = "imported" if arguments.command.startswith("import") \
+            else "exported"
+        sys.exit(f"Nothing {verb}: {error}")
+    seconds = time.perf_counter() - start
+    rate = total / seconds if seconds else 0
+    print(f"{summary.format(total)} in {seconds:.2f}s "
+          f"({rate:,.0f} rows/s)")
+
+
+def main(argv: list = None):
+    """
+    A function that runs the task manager: it logs a user in and then
+    carries out their menu selections until they choose to exit, or
+    runs the command given on the command line.
+
+    Args:
+        argv(list): The arguments, defaulting to those of the program
+    """
+    arguments = parse_arguments(argv)
+    instrumentation.enabled = instrumentation.enabled or arguments.instrument
+    instrumentation.profile_action = (arguments.profile
+                                      or instrumentation.profile_action)
+    instrumentation.profile_memory = (arguments.profile_memory
+                                      or instrumentation.profile_memory)
+    if instrumentation.enabled:
+        # The summary is printed however the session ends
+        atexit.register(lambda: sys.stderr.write(
+            f"\n{instrumentation.summary()}"))
+    if arguments.command in ("import-tasks", "export-tasks",
+                             "import-users", "export-users"):
+        transfer(arguments)
+        return
+    if arguments.command == "hash-passwords":
+        total_hashed = hash_passwords(arguments.users, arguments.iterations)
+        print(f"Hashed {total_hashed} passwords in {arguments.users}")
+        return
+    if arguments.command == "serve":
+        run_server(arguments.tasks, arguments.users, arguments.host,
+                   arguments.port, arguments.socket)
+        return
+    if arguments.command == "report":
+        generate_report(arguments.tasks,
+                        user_authentication(arguments.users),
+                        arguments.workers)
+        print("Report successfully generated!")
+        return
+    if arguments.command is not None:
+        database = arguments.database or database_filename(arguments.tasks)
+        if arguments.command == "import-db":
+            total_tasks = import_database(arguments.tasks, arguments.users,
+                                          database)
+            print(f"Imported {total_tasks} tasks into {database}")
+        else:
+            total_tasks = export_database(database, arguments.tasks,
+                                          arguments.users)
+            print(f"Exported {total_tasks} tasks to {arguments.tasks}")
+        return
+    # store the user/password dictionary as users to be able to access the
+    # users using the .keys() function, as well as the users passwords,
+    # using the .values() function
+    users = user_authentication("user.txt")
+    username = login(users)
+
+    choice = 'x'
+    while choice != 'e':
+        if username == 'admin':
+            admin_menu()
+        else:
+            menu()
+        choice = input('Selection: ')
+        # Only the action chosen with --profile is profiled
+        with profiled(choice):
+            if choice == 'r':
+                if username == 'admin':
+                    # users is kept up to date by the store of user.txt
+                    new_user('user.txt', users)
+                else:
+                    print('Only admin has the rights to register new users')
+            elif choice == 'a':
+                new_task = add_task(users)
+                append_new_task('tasks.txt', new_task)
+            elif choice == 'va':
+                print("\nTasks for all users:")
+                browse_tasks('tasks.txt', users)
+            elif choice == 'vm':
+                edit_my_tasks('tasks.txt', username, users)
+            elif choice == 'st':
+                search = input("Search the task titles and descriptions "
+                               "for: ")
+                browse_tasks('tasks.txt', users, {"search": search})
+            elif choice == 'od':
+                due_tasks('tasks.txt', users)
+            elif choice == 'du':
+                due_tasks('tasks.txt', users, soon=True)
+            elif choice == 'ds':
+                print("\nSystem summative statistics:")
+                print('*'*165)
+                statistics('user.txt', 'tasks.txt')
+                print(f"{'*'*165}\n")
+            elif choice == 'gr':
+                generate_report("tasks.txt", users)
+                print("\nReport successfully generated!")
+            elif choice == 'vr':
+                view_reports("tasks.txt", users)
+            elif choice == 'e':
+                # Write out anything still pending, such as the recorded edits
+                # of tasks.txt, before leaving
+                get_storage('tasks.txt').close()
+                print("\nGoodbye!")
+            else:
+                print("Please ensure to have made the correct input.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# -------------------------------- Imports -------------------------------- #
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager  # noqa: E402
+from helpers import TASK_LINES, drop_stores  # noqa: E402
+
+# -------------------------------- Fixtures ------------------------------- #
+
+
+@pytest.fixture
+def tasks_file(tmp_path):
+    """
+    Writes a tasks.txt of TASK_LINES, and a user.txt of its users, into a
+    fresh directory, and returns the path of the tasks file. The loaded
+    stores are dropped afterwards.
+    """
+    path = str(tmp_path / "tasks.txt")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(task_manager.FORMAT_HEADER)
+        file.write("".join(f"\n{line}" for line in TASK_LINES))
+    with open(tmp_path / "user.txt", "w", encoding="utf-8") as file:
+        file.write("admin, adm1n\nuser1, password1\nuser2, password2")
+    yield path
+    drop_stores()
@@ -0,0 +1,30 @@
+"""
+The data of the tests and the helpers they share with the fixtures in
+conftest.py.
+"""
+# -------------------------------- Imports -------------------------------- #
+import task_manager
+
+# ------------------------------- Functions ------------------------------- #
+
+# The lines of the tasks file of each test, after the format header. The
+# second and third tasks share their title and description
+TASK_LINES = (
+    "admin, Register users, Add the new users, 10 Oct 2019, 20 Oct 2030, "
+    "No, 0",
+    "user1, Report, Write the report, 11 Oct 2019, 21 Oct 2030, No, 1",
+    "user2, Report, Write the report, 12 Oct 2019, 22 Oct 2030, No, 2",
+    "user1, Review, Review the code, 13 Oct 2019, 23 Oct 2010, Yes, 3",
+)
+
+
+def drop_stores():
+    """
+    Drops every store and storage that has been loaded, so that the files
+    are read again on their next use.
+    """
+    for storage in task_manager.storages.values():
+        storage.close()
+    for stores in (task_manager.task_stores, task_manager.report_states,
+                   task_manager.storages, task_manager.user_stores):
+        stores.clear()
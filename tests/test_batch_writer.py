@@ -0,0 +1,124 @@
+"""
+Tests of BatchWriter: a file being replaced is only swapped for the new
+one once every record has been written, a write cut short by an error
+leaves the file as it was, and the file is synced to disk as often as
+the fsync policy says.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+# Records longer than the buffer of the open file, so that each flush of
+# the writer reaches the file straight away
+LONG = "x" * 9000
+
+
+@pytest.fixture
+def target(tmp_path):
+    """
+    Returns the path of a file holding "old\\n".
+    """
+    path = tmp_path / "records.txt"
+    path.write_text("old\n", encoding="utf-8")
+    return str(path)
+
+
+def read_text(filename: str):
+    """
+    Returns the content of filename.
+    """
+    with open(filename, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.fixture
+def syncs(monkeypatch):
+    """
+    Counts the calls of os.fsync, which still syncs.
+    """
+    calls = []
+    fsync = os.fsync
+
+    def counted(fd):
+        calls.append(fd)
+        fsync(fd)
+
+    monkeypatch.setattr(task_manager.os, "fsync", counted)
+    return calls
+
+
+def test_replace(target):
+    records = [f"{number} {LONG}\n" for number in range(5)]
+    with task_manager.BatchWriter(target, flush_records=2) as writer:
+        for record in records:
+            writer.write(record)
+        # The records are written to a temporary file next to target,
+        # and target is left as it was until they have all been written
+        assert read_text(f"{target}.tmp") == "".join(records[:4])
+        assert read_text(target) == "old\n"
+    assert read_text(target) == "".join(records)
+    assert not os.path.exists(f"{target}.tmp")
+
+
+def test_append(target):
+    with task_manager.BatchWriter(target, "a") as writer:
+        writer.write("new\n")
+    assert read_text(target) == "old\nnew\n"
+    assert not os.path.exists(f"{target}.tmp")
+
+
+def test_error_keeps_file(target):
+    with pytest.raises(RuntimeError):
+        with task_manager.BatchWriter(target, flush_records=2) as writer:
+            for number in range(5):
+                writer.write(f"record {number}\n")
+            raise RuntimeError("Cut short")
+    assert read_text(target) == "old\n"
+    assert not os.path.exists(f"{target}.tmp")
+
+
+def test_flush_thresholds(target):
+    # Flushed after three records, or once 20000 characters are held
+    with task_manager.BatchWriter(target, flush_records=3,
+                                  flush_bytes=20000) as writer:
+        writer.write(LONG)
+        writer.write("a")
+        assert read_text(f"{target}.tmp") == ""
+        writer.write("b")
+        assert read_text(f"{target}.tmp") == f"{LONG}ab"
+        writer.write(LONG)
+        writer.write(LONG + LONG)
+        assert read_text(f"{target}.tmp") == f"{LONG}ab{LONG * 3}"
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("always", 4), ("close", 1), ("never", 0),
+])
+def test_fsync_policy(target, syncs, monkeypatch, policy, expected):
+    # Three flushes of two records each, and one at the end with none
+    with task_manager.BatchWriter(target, flush_records=2,
+                                  fsync=policy) as writer:
+        for number in range(6):
+            writer.write(f"record {number}\n")
+    assert len(syncs) == expected
+
+    # The policy set by TASK_MANAGER_FSYNC is the default
+    syncs.clear()
+    monkeypatch.setattr(task_manager, "FSYNC_POLICY", policy)
+    with task_manager.BatchWriter(target, flush_records=2) as writer:
+        for number in range(6):
+            writer.write(f"record {number}\n")
+    assert len(syncs) == expected
+
+
+def test_no_sync_on_error(target, syncs):
+    with pytest.raises(RuntimeError):
+        with task_manager.BatchWriter(target, fsync="close") as writer:
+            writer.write("record\n")
+            raise RuntimeError("Cut short")
+    assert syncs == []
@@ -0,0 +1,94 @@
+"""
+Tests of the overdue and due soon views, which follow the completion
+and due date edits of the tasks, and of the due index file that the
+text backend keeps of the incomplete tasks, which is built again when it
+was written for another state of the tasks file.
+"""
+# -------------------------------- Imports -------------------------------- #
+import shutil
+
+import pytest
+
+import task_manager
+from helpers import drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+BACKENDS = ["text", "streaming", "sharded", "sqlite"]
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """
+    Makes 21 Oct 2030 today, the day after the first task of TASK_LINES
+    was due and the day the second is due.
+    """
+    monkeypatch.setattr(task_manager, "today_ordinal",
+                        lambda: task_manager.date_ordinal("21 Oct 2030"))
+
+
+def overdue(tasks_file: str, **filters):
+    """
+    Returns the ids of the overdue tasks of tasks_file, in order.
+    """
+    page, _ = task_manager.overdue_tasks(tasks_file, **filters)
+    return [task.task_id for task in page]
+
+
+def due_soon(tasks_file: str, days: int, **filters):
+    """
+    Returns the ids of the tasks of tasks_file due within days, in order.
+    """
+    page, _ = task_manager.due_soon_tasks(tasks_file, days, **filters)
+    return [task.task_id for task in page]
+
+
+def edit(tasks_file: str, task_id: int, **changes):
+    """
+    Applies changes to the task with task_id.
+    """
+    storage = task_manager.get_storage(tasks_file)
+    storage.edit(task_id, dict(storage.get(task_id).fields(), **changes))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_views_follow_edits(tasks_file, monkeypatch, today, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    assert overdue(tasks_file) == [0]
+    assert due_soon(tasks_file, 0) == [1]
+    assert due_soon(tasks_file, 1) == [1, 2]
+    assert due_soon(tasks_file, 1, user="user2") == [2]
+
+    edit(tasks_file, 1, task_comp="Yes")
+    assert due_soon(tasks_file, 1) == [2]
+    edit(tasks_file, 2, due_date="01 Jan 2020")
+    assert overdue(tasks_file) == [2, 0]
+    assert overdue(tasks_file, user="admin") == [0]
+    assert due_soon(tasks_file, 1) == []
+    edit(tasks_file, 0, due_date="30 Oct 2030")
+    assert overdue(tasks_file) == [2]
+    assert due_soon(tasks_file, 9) == [0]
+    assert overdue(tasks_file, offset=0, limit=1) == [2]
+
+
+def test_stale_due_index_is_rebuilt(tasks_file, today):
+    due_index = task_manager.path_directory(
+        task_manager.due_index_filename(tasks_file))
+    task_manager.get_store(tasks_file)
+    shutil.copy(due_index, f"{due_index}.old")
+
+    edit(tasks_file, 1, task_comp="Yes")
+    edit(tasks_file, 0, due_date="01 Jan 2020")
+    task_manager.get_store(tasks_file).compact()
+    drop_stores()
+    # The index of the tasks before the edits is put back
+    shutil.copy(f"{due_index}.old", due_index)
+    header = task_manager.file_header(tasks_file)
+    assert task_manager.read_due_index(tasks_file, header) is None
+
+    assert overdue(tasks_file) == [0]
+    assert due_soon(tasks_file, 9) == [2]
+    store = task_manager.get_store(tasks_file)
+    assert list(store.open_dues) == [
+        task_manager.date_ordinal(date) for date in ("01 Jan 2020",
+                                                     "22 Oct 2030")]
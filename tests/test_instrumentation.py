@@ -0,0 +1,82 @@
+"""
+Tests of the instrumentation: while it is enabled the instrumented
+functions are timed and the bytes and lines they handle are counted,
+and the summary is printed at the end of a session run with
+--instrument, and only then.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+import subprocess
+import sys
+
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+PROGRAM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), "task_manager.py")
+
+
+@pytest.fixture
+def instrumentation(monkeypatch):
+    """
+    Replaces the instrumentation with a new one, enabled, and returns it.
+    """
+    instrumentation = task_manager.Instrumentation(enabled=True)
+    monkeypatch.setattr(task_manager, "instrumentation", instrumentation)
+    return instrumentation
+
+
+def test_counts_calls_bytes_and_lines(tasks_file, instrumentation):
+    size = os.path.getsize(tasks_file)
+    store = task_manager.get_store(tasks_file)
+    store.append(task_manager.new_task_content(
+        "user1", "New", "A new task", "01 Jan 2031"))
+
+    assert instrumentation.timings["TaskStore.load"][0] == 1
+    calls, total, samples = instrumentation.timings["TaskStore.append"]
+    assert calls == 1 and total >= 0 and len(samples) == 1
+    counters = instrumentation.counters
+    assert counters["lines_parsed"] == 4
+    assert counters["bytes_read"] >= size
+    assert counters["bytes_written"] > 0
+
+    summary = instrumentation.summary()
+    assert summary.startswith("Function")
+    assert "TaskStore.load" in summary and "lines_parsed" in summary
+
+
+def test_disabled_collects_nothing(tasks_file, instrumentation):
+    instrumentation.enabled = False
+    task_manager.get_store(tasks_file)
+    task_manager.get_storage(tasks_file).report(rebuild=True)
+    assert instrumentation.timings == {}
+    assert instrumentation.counters == {}
+
+
+def test_p95():
+    instrumentation = task_manager.Instrumentation(enabled=True)
+    for milliseconds in range(1, 101):
+        instrumentation.record("function", milliseconds / 1000)
+    line = instrumentation.summary().splitlines()[1].split()
+    assert line == ["function", "100", "5050.00", "50.500", "95.000"]
+
+
+@pytest.mark.parametrize("flag", [True, False])
+def test_summary_printed_when_enabled(tasks_file, tmp_path, flag):
+    environment = dict(os.environ)
+    environment.pop("TASK_MANAGER_INSTRUMENT", None)
+    command = [sys.executable, PROGRAM, "export-tasks",
+               str(tmp_path / "tasks.csv"), "--tasks", tasks_file]
+    if flag:
+        command.insert(2, "--instrument")
+    result = subprocess.run(command, capture_output=True, text=True,
+                            env=environment, check=True)
+    if flag:
+        assert "Function" in result.stderr
+        assert "export_tasks" in result.stderr
+        assert "bytes_written" in result.stderr
+    else:
+        assert result.stderr == ""
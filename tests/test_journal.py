@@ -0,0 +1,69 @@
+"""
+Tests of the journal of task edits: replaying it on load gives the same
+tasks as folding it back into the tasks file.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+# The edits of the tests, by task id, including a value that holds the
+# characters which are escaped in the tasks file
+EDITS = (
+    (0, {"task_comp": "Yes"}),
+    (1, {"user": "user2"}),
+    (2, {"due_date": "01 Jan 2031"}),
+    (1, {"user": "user1, \\ the second"}),
+    (2, {"task_comp": "Yes", "due_date": "02 Feb 2032"}),
+)
+
+
+def loaded_lines(filename: str):
+    """
+    Returns the lines of the tasks of filename as a new store loads them.
+    """
+    store = task_manager.TaskStore(filename)
+    store.load()
+    return [task.line() for task in store.tasks]
+
+
+def test_replay_matches_compaction(tasks_file):
+    store = task_manager.get_store(tasks_file)
+    for task_id, edit in EDITS:
+        store.record(task_id, edit)
+    journal = task_manager.path_directory(
+        task_manager.journal_filename(tasks_file))
+    assert os.path.exists(journal)
+    edited = [task.line() for task in store.tasks]
+
+    replayed = loaded_lines(tasks_file)
+    store.compact()
+    assert not os.path.exists(journal)
+    compacted = loaded_lines(tasks_file)
+
+    assert replayed == compacted == edited
+    with open(tasks_file, encoding="utf-8") as file:
+        assert file.read().splitlines() == [task_manager.FORMAT_HEADER,
+                                            *edited]
+    assert store.get(1).user == "user1, \\ the second"
+
+
+def test_journal_values_are_escaped(tasks_file):
+    store = task_manager.get_store(tasks_file)
+    store.record(1, {"user": "a, b\\c"})
+    journal = task_manager.journal_filename(tasks_file)
+    with open(journal, encoding="utf-8") as file:
+        assert file.read() == "reassign, 1, a\\, b\\\\c\n"
+    assert list(task_manager.read_journal(tasks_file)) == [
+        (1, "user", "a, b\\c")]
+
+
+def test_unescaped_journal_is_read(tasks_file):
+    # A journal written before values were escaped
+    with open(task_manager.journal_filename(tasks_file), "w",
+              encoding="utf-8") as file:
+        file.write("reassign, 1, a, b\ncomplete, 2, Yes\n")
+    assert list(task_manager.read_journal(tasks_file)) == [
+        (1, "user", "a, b"), (2, "task_comp", "Yes")]
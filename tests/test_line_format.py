@@ -0,0 +1,208 @@
+"""
+Tests of the line format of the tasks file: values holding the escaped
+characters round-trip, and files in the legacy format, whose commas are
+not escaped, are read and migrated.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+import sqlite3
+
+import pytest
+
+import task_manager
+from helpers import drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+# Legacy lines whose descriptions hold ", " or a backslash, which is not
+# an escape in the legacy format
+LEGACY_LINES = (
+    "admin, T1, desc, with comma, 10 Oct 2019, 20 Oct 2019, No",
+    "user1, T2, one, two, three, 11 Oct 2019, 21 Oct 2090, Yes",
+    "user1, T3, C:\\temp, 12 Oct 2019, 22 Oct 2090, No",
+)
+LEGACY_DESCRIPTIONS = ["desc, with comma", "one, two, three", "C:\\temp"]
+# Values holding the characters that are escaped in the tasks file
+VALUES = ("back\\slash", "trailing\\", "com, ma", ",", "new\nline",
+          "carriage\r\nreturn", "\n", "\\n, \\, \\\\,\n mixed")
+
+
+def write_lines(filename: str, lines):
+    """
+    Writes lines to filename, one per line.
+    """
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+
+
+def loaded_store(filename: str):
+    """
+    Returns a new store of the tasks of filename.
+    """
+    store = task_manager.TaskStore(filename)
+    store.load()
+    return store
+
+
+def assert_reloaded(filename: str, expected: list):
+    """
+    Asserts that the titles and descriptions of the tasks of filename are
+    expected, both when the file is parsed and when they are read from
+    the snapshot that parsing it writes.
+    """
+    snapshot = task_manager.path_directory(
+        task_manager.snapshot_filename(filename))
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+    parsed = loaded_store(filename)
+    assert task_manager.read_snapshot(filename) is not None
+    for store in (parsed, loaded_store(filename)):
+        assert [(task.task, task.task_description)
+                for task in store.tasks] == expected
+
+
+def test_fields_round_trip():
+    line = task_manager.join_fields(VALUES)
+    assert "\n" not in line and "\r" not in line
+    assert task_manager.split_fields(line) == list(VALUES)
+    for value in VALUES:
+        assert task_manager.unescape_field(
+            task_manager.escape_field(value)) == value
+
+
+def test_values_round_trip_through_files(tasks_file):
+    store = task_manager.get_store(tasks_file)
+    for title, description in zip(VALUES, reversed(VALUES)):
+        store.append(task_manager.new_task_content(
+            "user1", title, description, "01 Jan 2031"))
+    expected = [(task.task, task.task_description) for task in store.tasks]
+    assert expected[-len(VALUES):] == list(zip(VALUES, reversed(VALUES)))
+
+    assert_reloaded(tasks_file, expected)
+    store.compact()
+    assert_reloaded(tasks_file, expected)
+
+
+@pytest.mark.parametrize("with_ids", [False, True])
+def test_legacy_commas_are_read(tasks_file, with_ids):
+    lines = [f"{line}, {task_id}" if with_ids else line
+             for task_id, line in enumerate(LEGACY_LINES)]
+    write_lines(tasks_file, lines)
+
+    tasks = list(task_manager.iter_tasks(tasks_file))
+    assert [task.task_description for task in tasks] == LEGACY_DESCRIPTIONS
+    assert [task.task_id for task in tasks] == [0, 1, 2]
+    assert [task.complete for task in tasks] == [False, True, False]
+    assert [task.task_description for task in task_manager.scan_user_tasks(
+        tasks_file, "user1")] == LEGACY_DESCRIPTIONS[1:]
+    task_manager.build_task_index(tasks_file)
+    assert task_manager.read_task(tasks_file, 1).task == "T2"
+    report = task_manager.parallel_report_counters(tasks_file, 2)
+    assert (report["total"], report["completed"]) == (3, 1)
+
+
+def test_legacy_commas_are_migrated(tasks_file):
+    write_lines(tasks_file, LEGACY_LINES)
+    store = task_manager.get_store(tasks_file)
+    assert ([task.task_description for task in store.tasks]
+            == LEGACY_DESCRIPTIONS)
+    with open(tasks_file, encoding="utf-8") as file:
+        assert file.read().splitlines() == [
+            task_manager.FORMAT_HEADER,
+            "admin, T1, desc\\, with comma, 10 Oct 2019, 20 Oct 2019, No, 0",
+            "user1, T2, one\\, two\\, three, 11 Oct 2019, 21 Oct 2090, Yes, "
+            "1",
+            "user1, T3, C:\\\\temp, 12 Oct 2019, 22 Oct 2090, No, 2",
+        ]
+
+
+def test_legacy_commas_are_imported(tasks_file, tmp_path):
+    source = str(tmp_path / "import.txt")
+    write_lines(source, LEGACY_LINES)
+    users = {"admin": "adm1n", "user1": "password1"}
+    task_manager.import_tasks(tasks_file, source, users)
+    tasks = list(task_manager.get_storage(tasks_file).tasks())
+    assert ([task.task_description for task in tasks[-3:]]
+            == LEGACY_DESCRIPTIONS)
+
+
+def test_date_text_is_kept(tasks_file):
+    write_lines(tasks_file, [
+        "admin, T1, D1, 5 Oct 2030, 06 Oct 2030, No",
+        "user1, T2, D2, 07 Oct 2030, 8 oct 2030, No",
+        "user1, T3, D3, 09 Oct 2030, 10 Oct 2030, No",
+    ])
+    expected = [("5 Oct 2030", "06 Oct 2030"), ("07 Oct 2030", "8 oct 2030"),
+                ("09 Oct 2030", "1 Nov 2030")]
+
+    storage = task_manager.get_storage(tasks_file)
+    storage.edit(2, dict(storage.get(2).fields(), due_date="1 Nov 2030"))
+    task_manager.get_store(tasks_file).compact()
+    with open(tasks_file, encoding="utf-8") as file:
+        lines = file.read().splitlines()[1:]
+    assert [tuple(task_manager.split_fields(line)[3:5])
+            for line in lines] == expected
+
+    drop_stores()
+    snapshot = task_manager.path_directory(
+        task_manager.snapshot_filename(tasks_file))
+    os.remove(snapshot)
+    for store in (loaded_store(tasks_file), loaded_store(tasks_file)):
+        assert [(task.get_field("date_assign"), task.get_field("due_date"))
+                for task in store.tasks] == expected
+    assert [task.due for task in store.tasks] == [
+        task_manager.date_ordinal(due) for _, due in expected]
+
+
+def test_date_text_is_kept_in_database(tasks_file, tmp_path):
+    write_lines(tasks_file, [
+        task_manager.FORMAT_HEADER,
+        "admin, T1, D1, 5 Oct 2030, 06 Oct 2030, No, 0",
+        "user1, T2, D2, 07 Oct 2030, 8 oct 2030, No, 1",
+        "user1, T3, D3, 09 Oct 2030, 10 Oct 2030, No, 2",
+    ])
+    users_file = task_manager.sibling_filename(tasks_file, "user.txt")
+    database = task_manager.database_filename(tasks_file)
+    task_manager.import_database(tasks_file, users_file, database)
+    storage = task_manager.SQLiteStorage(database)
+    storage.add(task_manager.new_task_content("user1", "T4", "D4",
+                                              "5 Nov 2031"))
+    storage.edit(2, {"due_date": "1 Nov 2030"})
+    storage.edit(1, {"due_date": "09 Oct 2030"})
+    assert storage.get(3).due == task_manager.date_ordinal("05 Nov 2031")
+    storage.close()
+
+    exported = str(tmp_path / "exported.txt")
+    task_manager.export_database(database, exported,
+                                 str(tmp_path / "exported_users.txt"))
+    with open(exported, encoding="utf-8") as file:
+        lines = file.read().splitlines()[1:]
+    assert [tuple(task_manager.split_fields(line)[3:5])
+            for line in lines][:3] == [("5 Oct 2030", "06 Oct 2030"),
+                                       ("07 Oct 2030", "09 Oct 2030"),
+                                       ("09 Oct 2030", "1 Nov 2030")]
+    assert task_manager.split_fields(lines[3])[4] == "5 Nov 2031"
+
+
+def test_database_gets_date_text_columns(tmp_path):
+    # A database created before the date texts were kept
+    database = str(tmp_path / "tasks.db")
+    connection = sqlite3.connect(database)
+    connection.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, user TEXT NOT NULL, "
+        "task TEXT NOT NULL, task_description TEXT NOT NULL, "
+        "date_assign INTEGER NOT NULL, due INTEGER NOT NULL, "
+        "complete INTEGER NOT NULL)")
+    connection.execute(
+        "INSERT INTO tasks VALUES (0, 'admin', 'T1', 'D1', ?, ?, 0)",
+        (task_manager.date_ordinal("05 Oct 2030"),
+         task_manager.date_ordinal("06 Oct 2030")))
+    connection.commit()
+    connection.close()
+
+    storage = task_manager.SQLiteStorage(database)
+    assert storage.get(0).fields()["due_date"] == "06 Oct 2030"
+    storage.add(task_manager.new_task_content("user1", "T2", "D2",
+                                              "5 Nov 2031"))
+    assert storage.get(1).get_field("due_date") == "5 Nov 2031"
+    storage.close()
@@ -0,0 +1,84 @@
+"""
+Tests of the version counter of the tasks, which is only moved on by
+writes of the tasks, and of edits made from a listing that has since
+gone stale, which are rebased onto the newer changes.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+from helpers import TASK_LINES, drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+
+def test_version_counts_writes(tasks_file):
+    version = task_manager.task_version(tasks_file)
+    store = task_manager.get_store(tasks_file)
+    store.compact()
+    store.record(1, {"task_comp": "No"})
+    assert task_manager.task_version(tasks_file) == version
+
+    store.record(1, {"task_comp": "Yes"})
+    store.append(task_manager.new_task_content(
+        "user1", "New", "A new task", "01 Jan 2031"))
+    assert task_manager.task_version(tasks_file) == version + 2
+    store.compact()
+    drop_stores()
+    task_manager.get_store(tasks_file)
+    assert task_manager.task_version(tasks_file) == version + 2
+
+
+def test_migration_is_not_a_write(tasks_file):
+    with open(tasks_file, "w", encoding="utf-8") as file:
+        file.write("\n".join(line.rpartition(", ")[0]
+                             for line in TASK_LINES))
+    version = task_manager.task_version(tasks_file)
+    store = task_manager.get_store(tasks_file)
+    assert not task_manager.legacy_format(tasks_file)
+    assert task_manager.task_version(tasks_file) == version
+    # The store still follows appends made after the migration
+    task_manager.append_task(tasks_file, task_manager.new_task_content(
+        "user2", "New", "A new task", "01 Jan 2031"), 4)
+    assert store.refresh().get(4).task == "New"
+
+
+@pytest.mark.parametrize("backend", ["text", "streaming", "sharded",
+                                     "sqlite"])
+def test_stale_edit_is_rebased(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    storage = task_manager.get_storage(tasks_file)
+    listed = storage.get(1).fields()
+    version = storage.version()
+    # The due date is changed after the task was listed
+    storage.edit(1, dict(listed, due_date="01 Jan 2031"))
+    assert storage.version() != version
+
+    # The listing stays stale, so that further edits from it are rebased
+    assert task_manager.edit_overwrite(
+        tasks_file, dict(listed, task_comp="Yes"), listed, version) == version
+    task = storage.get(1)
+    assert (task.get_field("due_date"), task.complete) == ("01 Jan 2031",
+                                                          True)
+
+
+@pytest.mark.parametrize("backend", ["text", "streaming", "sharded",
+                                     "sqlite"])
+def test_menu_edits_are_current(tasks_file, monkeypatch, capsys, backend):
+    # Two edits of the same task in a row from the menu, the second of
+    # which is made from a listing that is current again once the first
+    # has been made
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    answers = iter(["1", "d", "01 Jan 2031", "1", "e", "-1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    rebased = []
+    monkeypatch.setattr(task_manager, "rebased_edit",
+                        lambda task, edit, listed: rebased.append(edit))
+    users = {"admin": "adm1n", "user1": "password1", "user2": "password2"}
+    task_manager.edit_my_tasks(tasks_file, "user2", users)
+    capsys.readouterr()
+
+    assert rebased == []
+    task = task_manager.get_storage(tasks_file).get(2)
+    assert (task.get_field("due_date"), task.complete) == ("01 Jan 2031",
+                                                          True)
@@ -0,0 +1,144 @@
+"""
+Tests of the pages of tasks returned by query_tasks: every combination
+of the filters gives the same tasks on every backend as filtering the
+tasks one by one, sorted by due date with the tasks due on the same day
+in order of their ids, and the pages split them without gaps, overlaps
+or a trailing empty page.
+"""
+# -------------------------------- Imports -------------------------------- #
+from itertools import product
+
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+BACKENDS = ["text", "streaming", "sharded", "sqlite"]
+# user10 starts with user1, whose tasks must not include those of user10
+USERS = ("admin", "user1", "user2", "user10")
+# Few due dates, so that many tasks are due on the same day
+DUE_DATES = ("20 Oct 2030", "05 Mar 2029", "20 Oct 2030", "11 Jan 2031",
+             "05 Mar 2029", "30 Dec 2030")
+WORDS = ("alpha", "beta", "gamma", "alphabet")
+TASK_COUNT = 41
+PAGE_SIZE = 4
+
+
+def task_line(task_id: int):
+    """
+    Returns the line of the task with task_id of the tasks of the tests.
+    """
+    return task_manager.join_fields((
+        USERS[task_id % len(USERS)],
+        f"{WORDS[task_id % len(WORDS)]} {task_id}",
+        f"Task {WORDS[task_id % 3]}",
+        "01 Jan 2029",
+        DUE_DATES[task_id % len(DUE_DATES)],
+        "Yes" if task_id % 3 == 0 else "No",
+        str(task_id),
+    ))
+
+
+@pytest.fixture
+def many_tasks(tasks_file):
+    """
+    Replaces the tasks of the tasks file with TASK_COUNT tasks, and
+    returns the path of the file and the tasks as Task records.
+    """
+    lines = [task_line(task_id) for task_id in range(TASK_COUNT)]
+    with open(tasks_file, "w", encoding="utf-8") as file:
+        file.write(task_manager.FORMAT_HEADER)
+        file.write("".join(f"\n{line}" for line in lines))
+    tasks = [task_manager.Task.from_fields(*task_manager.split_fields(line))
+             for line in lines]
+    return tasks_file, tasks
+
+
+def expected_ids(tasks: list, user, completed, due_from, due_to, search,
+                 sort_by_due):
+    """
+    Returns the ids of the tasks that pass the filters, checked one task
+    at a time, in the order query_tasks gives them.
+    """
+    words = task_manager.search_words(search) if search else ()
+    due_from = None if due_from is None else task_manager.date_ordinal(
+        due_from)
+    due_to = None if due_to is None else task_manager.date_ordinal(due_to)
+    matches = [task for task in tasks
+               if (user is None or task.user == user)
+               and (completed is None or task.complete == completed)
+               and (due_from is None or task.due >= due_from)
+               and (due_to is None or task.due <= due_to)
+               and task_manager.search_matches(task, words)]
+    if sort_by_due:
+        matches.sort(key=lambda task: (task.due, task.task_id))
+    return [task.task_id for task in matches]
+
+
+def paged_ids(tasks_file: str, **filters):
+    """
+    Returns the ids of the tasks that query_tasks gives for filters, read
+    a page at a time.
+    """
+    task_ids = []
+    offset = 0
+    while offset is not None:
+        page, next_offset = task_manager.query_tasks(
+            tasks_file, offset=offset, limit=PAGE_SIZE, **filters)
+        assert len(page) <= PAGE_SIZE
+        if next_offset is not None:
+            assert len(page) == PAGE_SIZE
+            assert next_offset == offset + PAGE_SIZE
+        task_ids.extend(task.task_id for task in page)
+        offset = next_offset
+    return task_ids
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_filter_combinations(many_tasks, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    tasks_file, tasks = many_tasks
+    for user, completed, (due_from, due_to), search, sort_by_due in product(
+            (None, "user1", "user10", "nobody"), (None, False, True),
+            ((None, None), ("20 Oct 2030", None), (None, "20 Oct 2030"),
+             ("05 Mar 2029", "30 Dec 2030")),
+            (None, "alpha", "ALPHA bet", "task gam 1"), (False, True)):
+        filters = {"user": user, "completed": completed,
+                   "due_from": due_from, "due_to": due_to,
+                   "search": search, "sort_by_due": sort_by_due}
+        expected = expected_ids(tasks, **filters)
+        page, next_offset = task_manager.query_tasks(tasks_file, **filters)
+        assert ([task.task_id for task in page], next_offset) == (
+            expected, None), filters
+        assert paged_ids(tasks_file, **filters) == expected, filters
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_page_bounds(many_tasks, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    tasks_file, _ = many_tasks
+    query = task_manager.query_tasks
+    page, next_offset = query(tasks_file, limit=5)
+    assert ([task.task_id for task in page], next_offset) == (
+        [0, 1, 2, 3, 4], 5)
+    # The last page ends the tasks, even when it is full
+    page, next_offset = query(tasks_file, offset=36, limit=5)
+    assert ([task.task_id for task in page], next_offset) == (
+        [36, 37, 38, 39, 40], None)
+    page, next_offset = query(tasks_file, offset=38, limit=5)
+    assert ([task.task_id for task in page], next_offset) == (
+        [38, 39, 40], None)
+    assert query(tasks_file, offset=TASK_COUNT, limit=5) == ([], None)
+    assert query(tasks_file, offset=100) == ([], None)
+    page, next_offset = query(tasks_file, offset=40, sort_by_due=True)
+    assert len(page) == 1 and next_offset is None
+
+
+def test_paginate():
+    assert task_manager.paginate(iter(range(10)), 0, 3) == ([0, 1, 2], 3)
+    assert task_manager.paginate(iter(range(10)), 9, 3) == ([9], None)
+    assert task_manager.paginate(iter(range(6)), 3, 3) == ([3, 4, 5], None)
+    assert task_manager.paginate(iter(range(6)), 2, None) == (
+        [2, 3, 4, 5], None)
+    assert task_manager.paginate(iter(()), 0, 3) == ([], None)
@@ -0,0 +1,116 @@
+"""
+Tests that the reports are byte-identical to those written by the
+original task manager. The files in tests/data/ were written by it from
+the tasks.txt and user.txt there, whose due dates are far enough in the
+past or the future that the overdue counts do not depend on the day the
+tests are run.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+import shutil
+
+import pytest
+
+import task_manager
+from helpers import drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+# The directory of the input files and the expected reports
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "data")
+REPORTS = ("task_overview.txt", "user_overview.txt")
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    """
+    Copies the tasks.txt and user.txt of the data directory into a fresh
+    directory and returns the path of the tasks file.
+    """
+    for name in ("tasks.txt", "user.txt"):
+        shutil.copy(os.path.join(DATA_DIRECTORY, name), tmp_path / name)
+    yield str(tmp_path / "tasks.txt")
+    drop_stores()
+
+
+def assert_reports_match(filename: str):
+    """
+    Asserts that the reports next to filename are byte-identical to the
+    expected ones.
+    """
+    for name in REPORTS:
+        with open(task_manager.sibling_filename(filename, name),
+                  "rb") as file:
+            written = file.read()
+        with open(os.path.join(DATA_DIRECTORY, name), "rb") as file:
+            assert written == file.read(), name
+
+
+@pytest.mark.parametrize("backend", ["text", "streaming", "sharded",
+                                     "sqlite"])
+def test_generate_report(report_files, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(report_files, "user.txt"))
+    task_manager.generate_report(report_files, users)
+    assert_reports_match(report_files)
+
+
+def test_parallel_report(report_files):
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(report_files, "user.txt"))
+    task_manager.generate_report(report_files, users, workers=2)
+    assert_reports_match(report_files)
+
+
+def test_refreshed_report(report_files):
+    # The report is kept up to date as the tasks are edited, and matches
+    # a report of the same tasks written from the start
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(report_files, "user.txt"))
+    task_manager.refresh_report(report_files, users)
+    storage = task_manager.get_storage(report_files)
+    task = storage.get(4).fields()
+    storage.edit(4, dict(task, task_comp="Yes"))
+    storage.edit(4, task)
+    task_manager.refresh_report(report_files, users)
+    assert_reports_match(report_files)
+
+
+def test_due_date_moved_into_the_past(tasks_file, monkeypatch):
+    # A task whose due date is moved from the future into the past is
+    # counted overdue once, and not again when its old due date passes
+    storage = task_manager.get_storage(tasks_file)
+    storage.report()
+    storage.edit(1, dict(storage.get(1).fields(), due_date="01 Jan 2020"))
+    report = storage.report()
+    assert report["overdue"] == 1
+
+    monkeypatch.setattr(task_manager, "today_ordinal",
+                        lambda: task_manager.date_ordinal("01 Jan 2031"))
+    report = storage.report()
+    assert report["overdue"] == 3
+    assert report["users"]["user1"] == [2, 1, 1]
+    assert task_manager.report_counters(
+        list(storage.tasks()), task_manager.today_ordinal()) == report
+
+
+@pytest.mark.parametrize("backend", ["sharded", "sqlite"])
+def test_parallel_report_of_other_backends(report_files, monkeypatch,
+                                           backend):
+    # The tasks of these backends are not kept in tasks.txt, so they are
+    # counted through the storage even when workers are asked for
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(report_files, "user.txt"))
+    storage = task_manager.get_storage(report_files)
+    storage.add_many(task_manager.new_task_content(
+        "user1", f"Late {number}", "Overdue", "01 Jan 2020")
+        for number in range(3))
+    task_manager.generate_report(report_files, users, workers=2)
+    with open(task_manager.sibling_filename(
+            report_files, "task_overview.txt")) as file:
+        overview = file.read().splitlines()
+    assert overview[2].split()[-1] == "12"
+    assert overview[5].split()[-1] == "6"
@@ -0,0 +1,135 @@
+"""
+Tests of the scans of the mapped tasks file that the streaming backend
+counts the tasks and finds the tasks of a user with: a user's lines are
+found by the prefix of their name, which must not match a user whose
+name merely starts with it, and the tasks reassigned in the journal are
+merged in by id.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+# user1 is a prefix of user10 and user11, and the first task is user1's
+USERS = ("user1", "user10", "user11", "admin", "user1")
+
+
+def write_tasks(tasks_file: str, users=USERS, header: bool = True,
+                with_ids: bool = True, separator: str = "\n",
+                trailing: str = ""):
+    """
+    Writes a task for each of users to tasks_file, and returns the path.
+    """
+    lines = []
+    for task_id, user in enumerate(users):
+        fields = [user, f"Task {task_id}", f"Task of {user}",
+                  "01 Jan 2030", f"{task_id + 1:02d} Feb 2031", "No"]
+        if with_ids:
+            fields.append(str(task_id))
+        lines.append(", ".join(fields))
+    if header:
+        lines.insert(0, task_manager.FORMAT_HEADER)
+    with open(tasks_file, "w", encoding="utf-8", newline="") as file:
+        file.write(separator.join(lines) + trailing)
+    task_manager.build_task_index(tasks_file)
+    return tasks_file
+
+
+def reassign(tasks_file: str, task_id: int, user: str):
+    """
+    Records the reassignment of the task with task_id to user in the
+    journal, as an edit made by another process would.
+    """
+    task = task_manager.read_task(tasks_file, task_id)
+    task_manager.record_edit(tasks_file, task,
+                             dict(task.fields(), user=user))
+
+
+def user_ids(tasks_file: str, user: str):
+    """
+    Returns the ids of the tasks of user that the scan finds, and checks
+    that they are those that reading every task finds.
+    """
+    task_ids = [task.task_id
+                for task in task_manager.scan_user_tasks(tasks_file, user)]
+    assert task_ids == [task.task_id
+                        for task in task_manager.iter_tasks(tasks_file)
+                        if task.user == user]
+    return task_ids
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_user_prefixes(tasks_file, header):
+    write_tasks(tasks_file, header=header)
+    assert user_ids(tasks_file, "user1") == [0, 4]
+    assert user_ids(tasks_file, "user10") == [1]
+    assert user_ids(tasks_file, "user11") == [2]
+    assert user_ids(tasks_file, "admin") == [3]
+    assert user_ids(tasks_file, "user") == []
+    assert user_ids(tasks_file, "ser1") == []
+
+
+def test_reassigned_in_journal(tasks_file):
+    write_tasks(tasks_file)
+    reassign(tasks_file, 1, "user1")
+    reassign(tasks_file, 4, "user10")
+    assert user_ids(tasks_file, "user1") == [0, 1]
+    assert user_ids(tasks_file, "user10") == [4]
+
+    # Reassigned away and back again, and edited after it was moved
+    reassign(tasks_file, 0, "user11")
+    reassign(tasks_file, 0, "user1")
+    task = task_manager.read_task(tasks_file, 1)
+    task_manager.record_edit(tasks_file, task,
+                             dict(task.fields(), task_comp="Yes"))
+    tasks = task_manager.scan_user_tasks(tasks_file, "user1")
+    assert [(task.task_id, task.complete) for task in tasks] == [
+        (0, False), (1, True)]
+    assert user_ids(tasks_file, "user11") == [2]
+
+
+def test_removed_in_journal(tasks_file):
+    write_tasks(tasks_file)
+    reassign(tasks_file, 2, "user1")
+    task_manager.record_removal(tasks_file, 2)
+    task_manager.record_removal(tasks_file, 4)
+    assert user_ids(tasks_file, "user1") == [0]
+    assert user_ids(tasks_file, "user11") == []
+
+
+def test_legacy_and_odd_lines(tasks_file):
+    # Tasks without ids take their position as their id
+    write_tasks(tasks_file, header=False, with_ids=False)
+    assert user_ids(tasks_file, "user1") == [0, 4]
+    write_tasks(tasks_file, header=False, separator="\n\n", trailing="\n")
+    assert user_ids(tasks_file, "user1") == [0, 4]
+    write_tasks(tasks_file, separator="\r\n", trailing="\r\n")
+    assert user_ids(tasks_file, "user1") == [0, 4]
+    assert user_ids(tasks_file, "admin") == [3]
+
+
+@pytest.mark.parametrize("header", [True, False])
+@pytest.mark.parametrize("separator, trailing", [
+    ("\n", ""), ("\n", "\n"), ("\n\n", "\n\n"), ("\r\n", "\r\n"),
+    ("\n \n", "\n"),
+])
+def test_count(tasks_file, monkeypatch, header, separator, trailing):
+    users = [f"user{number % 7}" for number in range(50)]
+    write_tasks(tasks_file, users, header, separator=separator,
+                trailing=trailing)
+    assert task_manager.scan_count(tasks_file) == 50
+    # Slices smaller than a line, and a few lines long
+    for size in (8, 100, 333):
+        monkeypatch.setattr(task_manager, "SCAN_CHUNK_SIZE", size)
+        assert task_manager.scan_count(tasks_file) == 50
+
+
+def test_count_empty(tasks_file):
+    with open(tasks_file, "w", encoding="utf-8") as file:
+        file.write("")
+    assert task_manager.scan_count(tasks_file) == 0
+    with open(tasks_file, "w", encoding="utf-8") as file:
+        file.write(f"{task_manager.FORMAT_HEADER}\n")
+    assert task_manager.scan_count(tasks_file) == 0
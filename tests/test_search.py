@@ -0,0 +1,97 @@
+"""
+Tests of the search of the titles and descriptions of the tasks: each
+word searched for must start a word of the task, the search index is
+kept up to date as tasks are added and edited, and an index file that
+no longer describes the tasks is built again.
+"""
+# -------------------------------- Imports -------------------------------- #
+import os
+
+import pytest
+
+import task_manager
+from helpers import drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+BACKENDS = ["text", "streaming", "sharded", "sqlite"]
+
+
+def search(tasks_file: str, text: str, **filters):
+    """
+    Returns the ids of the tasks of tasks_file that text finds, in order.
+    """
+    page, _ = task_manager.query_tasks(tasks_file, search=text, **filters)
+    return [task.task_id for task in page]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_prefixes(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    assert search(tasks_file, "rep") == [1, 2]
+    assert search(tasks_file, "REV") == [3]
+    assert search(tasks_file, "re") == [0, 1, 2, 3]
+    assert search(tasks_file, "eport") == []
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_every_word_must_match(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    assert search(tasks_file, "write rep") == [1, 2]
+    assert search(tasks_file, "the code") == [3]
+    assert search(tasks_file, "write code") == []
+    assert search(tasks_file, "report", user="user2") == [2]
+    assert search(tasks_file, "the", completed=False,
+                  sort_by_due=True) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_punctuation_matches_nothing(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    assert search(tasks_file, "!?, -") == []
+    assert search(tasks_file, "") == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_index_follows_changes(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    assert search(tasks_file, "report") == [1, 2]
+    storage = task_manager.get_storage(tasks_file)
+    task_id = storage.add(task_manager.new_task_content(
+        "user1", "Deploy", "Deploy the report site", "01 Jan 2031"))
+    assert search(tasks_file, "depl") == [task_id]
+    assert search(tasks_file, "report") == [1, 2, task_id]
+
+    storage.edit(1, dict(storage.get(1).fields(), user="user2"))
+    assert search(tasks_file, "report", user="user2") == [1, 2]
+    assert search(tasks_file, "report", user="user1") == [task_id]
+
+    drop_stores()
+    assert search(tasks_file, "depl") == [task_id]
+
+
+def test_stale_index_is_rebuilt(tasks_file):
+    store = task_manager.get_store(tasks_file)
+    store.load_search_index()
+    store.compact()
+    index_file = task_manager.path_directory(
+        task_manager.search_index_filename(tasks_file))
+    assert os.path.exists(index_file)
+    drop_stores()
+
+    # The tasks file is replaced by one with other tasks, which the index
+    # written for the old file no longer describes
+    with open(tasks_file, "w", encoding="utf-8") as file:
+        file.write(task_manager.FORMAT_HEADER)
+        file.write("\nuser1, Plan, Plan the launch, 01 Oct 2030, "
+                   "02 Oct 2030, No, 0")
+    assert search(tasks_file, "report") == []
+    assert search(tasks_file, "launch") == [0]
+
+
+def test_unreadable_index_is_rebuilt(tasks_file):
+    with open(task_manager.path_directory(
+            task_manager.search_index_filename(tasks_file)), "wb") as file:
+        file.write(b"not an index" * 10)
+    assert task_manager.read_search_index(tasks_file) is None
+    assert search(tasks_file, "rep") == [1, 2]
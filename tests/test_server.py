@@ -0,0 +1,140 @@
+"""
+Tests of the JSON-lines protocol of the task server, driven through a
+real connection: every request gets a reply, including malformed ones,
+which are answered with an error rather than dropping the connection.
+"""
+# -------------------------------- Imports -------------------------------- #
+import asyncio
+import json
+
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+
+def exchange(tasks_file: str, requests: list):
+    """
+    Sends each of requests, a JSON value or a line of raw text, to a
+    server of tasks_file over one connection, and returns the replies.
+    """
+    async def run():
+        server = task_manager.TaskServer(
+            tasks_file, task_manager.sibling_filename(tasks_file,
+                                                      "user.txt"))
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for request in requests:
+            line = request if isinstance(request, str) else \
+                json.dumps(request)
+            writer.write(line.encode("utf-8") + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        await writer.wait_closed()
+        # Let the handler of the connection see that it was closed
+        await asyncio.sleep(0.01)
+        listener.close()
+        await listener.wait_closed()
+        return replies
+
+    return asyncio.run(run())
+
+
+def login(username: str, password: str):
+    """
+    Returns the login request of username.
+    """
+    return {"op": "login", "username": username, "password": password}
+
+
+def test_login(tasks_file):
+    replies = exchange(tasks_file, [
+        {"op": "view_my"},
+        login("user1", "wrong"),
+        login("User1", "password1"),
+        {"op": "view_my", "id": 7},
+    ])
+    assert [reply["ok"] for reply in replies] == [False, False, True, True]
+    assert replies[0]["error"] == "Please log in first"
+    assert replies[2]["result"] == {"username": "user1"}
+    assert replies[3]["id"] == 7
+    assert [task["task_id"] for task in replies[3]["result"]["tasks"]] == [
+        "1", "3"]
+
+
+def test_add_and_edit(tasks_file):
+    replies = exchange(tasks_file, [
+        login("admin", "adm1n"),
+        {"op": "add_task", "user": "user1", "task": "Plan",
+         "task_description": "Plan the week", "due_date": "5 nov 2031"},
+        login("user1", "password1"),
+        {"op": "edit", "task_id": 4, "changes": {"task_comp": "Yes"}},
+        {"op": "edit", "task_id": "4", "changes": {"due_date": "01 Jan 2032"}},
+        {"op": "edit", "task_id": 0, "changes": {"task_comp": "Yes"}},
+    ])
+    assert replies[1] == {"ok": True, "result": {"task_id": 4}}
+    assert replies[3]["result"]["task_comp"] == "Yes"
+    assert replies[3]["result"]["due_date"] == "5 Nov 2031"
+    assert replies[4] == {"ok": False,
+                          "error": "A completed task cannot be edited"}
+    assert replies[5]["error"] == "Only tasks assigned to you can be edited"
+    task = task_manager.get_storage(tasks_file).get(4)
+    assert (task.user, task.complete) == ("user1", True)
+
+
+def test_edit_keeps_changes_made_elsewhere(tasks_file):
+    # The due date is changed behind the back of the loaded store, as by
+    # another process, after the store was loaded by a first request
+    exchange(tasks_file, [login("user1", "password1"), {"op": "view_my"}])
+    task = task_manager.get_store(tasks_file).get(1)
+    task_manager.record_edit(tasks_file, task,
+                             dict(task.fields(), due_date="01 Jan 2031"))
+
+    replies = exchange(tasks_file, [
+        login("user1", "password1"),
+        {"op": "edit", "task_id": 1, "changes": {"task_comp": "Yes"}},
+    ])
+    assert replies[1]["ok"]
+    assert (replies[1]["result"]["due_date"],
+            replies[1]["result"]["task_comp"]) == ("01 Jan 2031", "Yes")
+
+
+@pytest.mark.parametrize("request_line", [
+    "not json",
+    "[1, 2]",
+    {"op": ["login"]},
+    {"op": "nothing"},
+    login(["user1"], "password1"),
+    login("user1", None),
+    {"op": "edit", "task_id": None, "changes": {}},
+    {"op": "edit", "task_id": [1], "changes": {}},
+    {"op": "edit", "task_id": True, "changes": {}},
+    {"op": "edit", "task_id": 1, "changes": 5},
+    {"op": "edit", "task_id": 1, "changes": ["task_comp"]},
+    {"op": "edit", "task_id": 1, "changes": {"user": ["user2"]}},
+    {"op": "edit", "task_id": 99, "changes": {}},
+    {"op": "edit", "task_id": 1},
+    {"op": "add_task", "user": ["user1"], "task": "T",
+     "task_description": "D", "due_date": "01 Jan 2031"},
+    {"op": "add_task", "user": "user1", "task": 5,
+     "task_description": "D", "due_date": "01 Jan 2031"},
+    {"op": "add_task", "user": "user1", "task": "T",
+     "task_description": "D", "due_date": "31 Feb 2031"},
+    {"op": "view_all", "user": {"name": "user1"}},
+    {"op": "view_all", "limit": "10"},
+])
+def test_malformed_requests(tasks_file, request_line):
+    # The user logged in is admin for add_task and user1 otherwise, and
+    # the connection is still served after the error
+    username = "admin" if "add_task" in str(request_line) else "user1"
+    password = "adm1n" if username == "admin" else "password1"
+    replies = exchange(tasks_file, [login(username, password), request_line,
+                                    {"op": "view_my"}])
+    assert replies[1]["ok"] is False
+    assert isinstance(replies[1]["error"], str)
+    assert replies[2]["ok"] is True
+    assert task_manager.get_storage(tasks_file).count() == 4
@@ -0,0 +1,144 @@
+"""
+Tests of moving tasks between the shards of the sharded storage, which
+appends the task to one shard and journals its removal from the other
+rather than rewriting either.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+from helpers import TASK_LINES, drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+
+@pytest.fixture
+def storage(tasks_file, monkeypatch):
+    """
+    Returns the sharded storage of the tasks file.
+    """
+    monkeypatch.setattr(task_manager, "BACKEND", "sharded")
+    return task_manager.get_storage(tasks_file)
+
+
+def shard_of(storage, user: str):
+    """
+    Returns the filename of the shard of user.
+    """
+    return storage.shards[storage._shard(user)].filename
+
+
+def read_bytes(filename: str):
+    """
+    Returns the content of filename.
+    """
+    with open(task_manager.path_directory(filename), "rb") as file:
+        return file.read()
+
+
+def task_lines(storage):
+    """
+    Returns the lines of the tasks of storage, in order of their ids.
+    """
+    return [task.line() for task in storage.tasks()]
+
+
+def reassign(storage, task_id: int, user: str):
+    """
+    Reassigns the task with task_id to user.
+    """
+    storage.edit(task_id, dict(storage.get(task_id).fields(), user=user))
+
+
+def test_move_appends_and_journals(tasks_file, storage):
+    source = shard_of(storage, "user2")
+    target = shard_of(storage, "user1")
+    assert source != target
+    source_content = read_bytes(source)
+    target_content = read_bytes(target)
+    reassign(storage, 2, "user1")
+
+    # The source shard only has its journal appended to, and the target
+    # shard has the task appended after its later task 3
+    assert read_bytes(source) == source_content
+    with open(task_manager.path_directory(
+            task_manager.journal_filename(source)), encoding="utf-8") as file:
+        assert file.read() == "remove, 2\n"
+    moved = TASK_LINES[2].replace("user2", "user1", 1)
+    assert read_bytes(target) == target_content + f"\n{moved}".encode()
+
+    expected = [*TASK_LINES[:2], moved, TASK_LINES[3]]
+    assert task_lines(storage) == expected
+    assert [task.task_id for task in storage.user_tasks("user1")] == [1, 2, 3]
+    assert storage.user_tasks("user2") == []
+    assert storage.report()["users"]["user1"][0] == 3
+
+    # The shards are read again from their files, with the moved task in
+    # the place of its id, and once more after they are compacted
+    drop_stores()
+    storage = task_manager.get_storage(tasks_file)
+    assert task_lines(storage) == expected
+    assert [task.task_id for task in storage.user_tasks("user1")] == [1, 2, 3]
+    storage.close()
+    drop_stores()
+    storage = task_manager.get_storage(tasks_file)
+    assert task_lines(storage) == expected
+    assert read_bytes(source).count(b"\n") == 0
+
+
+def test_move_back_before_compaction(tasks_file, storage):
+    reassign(storage, 2, "user1")
+    reassign(storage, 2, "user2")
+    assert task_lines(storage) == list(TASK_LINES)
+    drop_stores()
+    storage = task_manager.get_storage(tasks_file)
+    assert task_lines(storage) == list(TASK_LINES)
+    for user in ("user1", "user2"):
+        assert sum(line.endswith(", 2")
+                   for line in read_bytes(shard_of(storage, user)).decode(
+                       "utf-8").split("\n")) == (user == "user2")
+
+
+def test_other_process_catches_up(tasks_file, storage):
+    # Stores of the shards loaded before the move, as in another process,
+    # read what the move appended to the files
+    stores = {}
+    for user in ("user1", "user2"):
+        filename = shard_of(storage, user)
+        stores[filename] = task_manager.TaskStore(filename)
+        stores[filename].load()
+    reassign(storage, 2, "user1")
+    for filename, store in stores.items():
+        fresh = task_manager.TaskStore(filename)
+        fresh.load()
+        store.refresh()
+        assert ([task.line() for task in store.tasks]
+                == [task.line() for task in fresh.tasks])
+        assert store.by_id == fresh.by_id
+
+
+@pytest.mark.parametrize("user", ["user2", "user1"])
+def test_stale_edit_is_rebased_under_lock(tasks_file, storage, monkeypatch,
+                                          user):
+    # A stale edit is rebased while the shard of the task is locked, so
+    # that no other writer can change the task before the edit is made,
+    # whether it stays in its shard or moves to another
+    listed = storage.get(2).fields()
+    version = storage.version()
+    storage.edit(2, dict(listed, due_date="01 Jan 2031"))
+    rebase = task_manager.rebased_edit
+    locks = []
+
+    def locked_rebase(task, edit, listed):
+        locks.append([task_manager.held_lock(filename)["exclusive"]
+                      for filename in (storage.manifest,
+                                       shard_of(storage, "user2"))])
+        return rebase(task, edit, listed)
+
+    monkeypatch.setattr(task_manager, "rebased_edit", locked_rebase)
+    storage.edit(2, dict(listed, user=user, task_comp="Yes"), listed,
+                 version)
+    assert locks == [[True, True]]
+    task = storage.get(2)
+    assert (task.user, task.complete, task.get_field("due_date")) == (
+        user, True, "01 Jan 2031")
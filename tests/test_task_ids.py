@@ -0,0 +1,30 @@
+"""
+Tests of the stable task ids: an edit is applied to the task with its id
+only, even when other tasks have the same title and description.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+from helpers import TASK_LINES, drop_stores
+
+# --------------------------------- Tests --------------------------------- #
+
+
+@pytest.mark.parametrize("backend", ["text", "streaming", "sharded",
+                                     "sqlite"])
+def test_edit_changes_only_target(tasks_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    storage = task_manager.get_storage(tasks_file)
+    # Tasks 1 and 2 share their title and description
+    edit = storage.get(2).fields()
+    edit["task_comp"] = "Yes"
+    task_manager.edit_overwrite(tasks_file, edit)
+    expected = dict(enumerate(TASK_LINES))
+    expected[2] = expected[2].replace("No, 2", "Yes, 2")
+    assert {task.task_id: task.line() for task in storage.tasks()} == expected
+
+    # The edit is also kept in the files
+    drop_stores()
+    storage = task_manager.get_storage(tasks_file)
+    assert {task.task_id: task.line() for task in storage.tasks()} == expected
@@ -0,0 +1,137 @@
+"""
+Tests of the bulk import and export of tasks and users: tasks survive a
+round trip through every format, including titles and descriptions that
+hold ", " and line breaks, and a file with an invalid record is
+rejected before anything is written.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+# Tasks whose values need quoting in CSV or escaping in the tasks file
+EXTRA_TASKS = (
+    ("user1", "Plan, then build", "First line\nsecond, line", "5 Nov 2031"),
+    ("user2", "Paths", "C:\\temp\\, done\\", "01 Dec 2031"),
+    ("admin", "Windows", "one\r\ntwo \"quoted\"", "02 Dec 2031"),
+)
+
+
+def new_directory(tmp_path, name: str):
+    """
+    Creates a directory with an empty tasks.txt and user.txt, and returns
+    the path of the tasks file.
+    """
+    directory = tmp_path / name
+    directory.mkdir()
+    with open(directory / "tasks.txt", "w", encoding="utf-8") as file:
+        file.write(task_manager.FORMAT_HEADER)
+    (directory / "user.txt").touch()
+    return str(directory / "tasks.txt")
+
+
+def records(tasks_file: str):
+    """
+    Returns the values of every task of tasks_file but its id, in order.
+    """
+    return [[task.get_field(key) for key in task_manager.TASK_RECORD_FIELDS]
+            for task in task_manager.get_storage(tasks_file).tasks()]
+
+
+def read_text(filename: str):
+    """
+    Returns the content of filename.
+    """
+    with open(task_manager.path_directory(filename), encoding="utf-8",
+              newline="") as file:
+        return file.read()
+
+
+@pytest.fixture
+def source(tasks_file):
+    """
+    Adds EXTRA_TASKS to the tasks file and returns its path.
+    """
+    task_manager.get_storage(tasks_file).add_many(
+        task_manager.new_task_content(*task) for task in EXTRA_TASKS)
+    return tasks_file
+
+
+def test_round_trip(source, tmp_path):
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(source, "user.txt"))
+    expected = records(source)
+    assert [record[2] for record in expected[-3:]] == [
+        task[2] for task in EXTRA_TASKS]
+
+    # Each format is exported from the tasks imported from the previous
+    # one, starting with CSV from the tasks file
+    tasks_file = source
+    for extension in ("csv", "jsonl", "txt"):
+        exported = str(tmp_path / f"exported.{extension}")
+        assert task_manager.export_tasks(tasks_file, exported) == 7
+        tasks_file = new_directory(tmp_path, extension)
+        assert task_manager.import_tasks(tasks_file, exported, users) == 7
+        assert records(tasks_file) == expected
+
+    # CSV and JSON lines keep the ids of the tasks they were exported from
+    content = read_text(str(tmp_path / "exported.csv"))
+    assert content.startswith(",".join(task_manager.TASK_ATTRIBUTES))
+    assert '"Plan, then build"' in content and ",6\n" in content
+
+
+def test_users_round_trip(tasks_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(task_manager, "KDF_ITERATIONS", 1000)
+    users_file = task_manager.sibling_filename(tasks_file, "user.txt")
+    task_manager.get_user_store(users_file).register("user3", "password3")
+    expected = dict(task_manager.get_user_store(users_file).users)
+    for extension in ("csv", "jsonl", "txt"):
+        exported = str(tmp_path / f"users.{extension}")
+        assert task_manager.export_users(users_file, exported) == 4
+        imported = task_manager.sibling_filename(
+            new_directory(tmp_path, extension), "user.txt")
+        assert task_manager.import_users(imported, exported) == 4
+        users = task_manager.get_user_store(imported).users
+        # Plaintext passwords are hashed, and hashes kept as they are
+        assert list(users) == list(expected)
+        assert users["user3"] == expected["user3"]
+        assert task_manager.verify_password(users["user1"], "password1")
+        assert task_manager.is_password_hash(users["user1"])
+
+
+@pytest.mark.parametrize("bad_row", [
+    "user1,Late,Bad date,01 Jan 2030,31 Feb 2031,No",
+    "user1,Late,Bad date,01 Jan 2030,2031-01-01,No",
+    "user1,Done,Bad completion,01 Jan 2030,01 Jan 2031,yes",
+    "user1,Done,Bad completion,01 Jan 2030,01 Jan 2031,",
+    "nobody,Who,Unregistered user,01 Jan 2030,01 Jan 2031,No",
+    "user1,Short,Missing fields",
+])
+def test_invalid_record_writes_nothing(tasks_file, tmp_path, bad_row):
+    users = task_manager.user_authentication(
+        task_manager.sibling_filename(tasks_file, "user.txt"))
+    source = tmp_path / "tasks.csv"
+    source.write_text(
+        ",".join(task_manager.TASK_RECORD_FIELDS) + "\n"
+        "user1,Good,A valid task,01 Jan 2030,01 Jan 2031,No\n"
+        f"{bad_row}\n"
+        "user2,Good,Another valid task,01 Jan 2030,01 Jan 2031,No\n",
+        encoding="utf-8")
+    before = read_text(tasks_file)
+    with pytest.raises(ValueError, match="Line 3 of"):
+        task_manager.import_tasks(tasks_file, str(source), users)
+    assert read_text(tasks_file) == before
+    assert task_manager.get_storage(tasks_file).count() == 4
+
+
+def test_invalid_user_writes_nothing(tasks_file, tmp_path):
+    users_file = task_manager.sibling_filename(tasks_file, "user.txt")
+    source = tmp_path / "users.txt"
+    source.write_text("user3, password3\nuser1, password1\n",
+                      encoding="utf-8")
+    before = read_text(users_file)
+    with pytest.raises(ValueError, match="already registered"):
+        task_manager.import_users(users_file, str(source))
+    assert read_text(users_file) == before
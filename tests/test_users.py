@@ -0,0 +1,111 @@
+"""
+Tests of the stored passwords of the users: new passwords are hashed
+with pbkdf2, the plaintext passwords of older user.txt files are still
+checked until hash-passwords replaces them, and successful checks are
+cached without keeping the password.
+"""
+# -------------------------------- Imports -------------------------------- #
+import pytest
+
+import task_manager
+
+# --------------------------------- Tests --------------------------------- #
+
+# A low cost for the hashes of the tests, which only check their format
+ITERATIONS = 1000
+USERS = {"admin": "adm1n", "user1": "password1", "user2": "password2"}
+
+
+@pytest.fixture
+def users_file(tasks_file, monkeypatch):
+    """
+    Returns the path of the user.txt of the tasks file, with a low cost
+    for new hashes and an empty cache of verified passwords.
+    """
+    monkeypatch.setattr(task_manager, "KDF_ITERATIONS", ITERATIONS)
+    monkeypatch.setattr(task_manager, "verified_passwords", {})
+    return task_manager.sibling_filename(tasks_file, "user.txt")
+
+
+def test_hash_format():
+    stored = task_manager.hash_password("secret", ITERATIONS)
+    scheme, iterations, salt, digest = stored.split("$")
+    assert (scheme, int(iterations)) == ("pbkdf2_sha256", ITERATIONS)
+    assert len(bytes.fromhex(salt)) == task_manager.SALT_SIZE
+    assert len(bytes.fromhex(digest)) == 32
+    assert task_manager.is_password_hash(stored)
+    # A new salt is drawn for each hash
+    assert task_manager.hash_password("secret", ITERATIONS) != stored
+
+
+def test_verify(monkeypatch):
+    monkeypatch.setattr(task_manager, "verified_passwords", {})
+    stored = task_manager.hash_password("secret", ITERATIONS)
+    assert task_manager.verify_password(stored, "secret")
+    assert not task_manager.verify_password(stored, "Secret")
+    assert not task_manager.verify_password(None, "secret")
+
+
+def test_verify_plaintext():
+    # user.txt files written before passwords were hashed
+    assert not task_manager.is_password_hash("password1")
+    assert not task_manager.is_password_hash("pbkdf2_sha256$1$ab")
+    assert task_manager.verify_password("password1", "password1")
+    assert not task_manager.verify_password("password1", "password")
+    assert not task_manager.verify_password("password1", "")
+
+
+def test_verify_cache(monkeypatch):
+    monkeypatch.setattr(task_manager, "verified_passwords", {})
+    stored = task_manager.hash_password("secret", ITERATIONS)
+    assert task_manager.verify_password(stored, "secret")
+    cached = task_manager.verified_passwords[stored]
+    assert b"secret" not in cached
+
+    def no_hash(*args):
+        raise AssertionError("The password was hashed again")
+
+    # A cached password is not hashed again, while a wrong one still is
+    # and fails
+    monkeypatch.setattr(task_manager.hashlib, "pbkdf2_hmac", no_hash)
+    assert task_manager.verify_password(stored, "secret")
+    with pytest.raises(AssertionError):
+        task_manager.verify_password(stored, "wrong")
+
+
+def test_verify_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(task_manager, "verified_passwords", {})
+    monkeypatch.setattr(task_manager, "VERIFY_CACHE_SIZE", 2)
+    hashes = [task_manager.hash_password(f"secret{number}", ITERATIONS)
+              for number in range(3)]
+    for number, stored in enumerate(hashes):
+        assert task_manager.verify_password(stored, f"secret{number}")
+    assert list(task_manager.verified_passwords) == hashes[1:]
+
+
+@pytest.mark.parametrize("backend", ["text", "sqlite"])
+def test_hash_passwords(users_file, monkeypatch, backend):
+    monkeypatch.setattr(task_manager, "BACKEND", backend)
+    store = task_manager.get_user_store(users_file)
+    # Logging in with a plaintext password leaves it as it is
+    assert store.verify("user1", "password1")
+    assert store.users == USERS
+    store.register("user3", "password3")
+    registered = store.users["user3"]
+    assert task_manager.is_password_hash(registered)
+
+    assert task_manager.hash_passwords(users_file) == 3
+    assert task_manager.hash_passwords(users_file) == 0
+    task_manager.user_stores.clear()
+    store = task_manager.get_user_store(users_file)
+    assert list(store.users) == [*USERS, "user3"]
+    assert all(map(task_manager.is_password_hash, store.users.values()))
+    assert store.users["user3"] == registered
+    for username, password in {**USERS, "user3": "password3"}.items():
+        assert store.verify(username, password)
+        assert not store.verify(username, "wrong")
+    if backend == "text":
+        with open(task_manager.path_directory(users_file),
+                  encoding="utf-8") as file:
+            content = file.read()
+        assert "password1" not in content and "adm1n" not in content